@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Any
 
 from config import config
+from core.scheduler import CallContext, bind_call_context, scheduler, unbind_call_context
 
 from analysis.log_parser import parse_game_log, build_compact_context
 from analysis.report_template import write_report
@@ -124,8 +125,15 @@ async def run_analysis(
     psy_prompt = build_psychology_prompt(context, player_ids)
     net_prompt = build_network_prompt(context, player_ids)
 
-    psy_out_model = await ask_for_schema(psychology_agent, psy_prompt, PsychologyAgentOutputStrict)
-    net_out_model = await ask_for_schema(network_agent, net_prompt, NetworkAgentOutputStrict)
+    # 分析调用以最低优先级排队，不挤占进行中对局的端点名额
+    call_key = f"analysis_{parsed.game_id}"
+    call_token = bind_call_context(CallContext(call_key, priority="analysis"))
+    try:
+        psy_out_model = await ask_for_schema(psychology_agent, psy_prompt, PsychologyAgentOutputStrict)
+        net_out_model = await ask_for_schema(network_agent, net_prompt, NetworkAgentOutputStrict)
+    finally:
+        unbind_call_context(call_token)
+        scheduler.forget_game(call_key)
 
     analysis_data = _merge_analysis_data(
         parsed.game_id,
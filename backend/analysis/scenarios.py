@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""从对局日志导出对局场景：还原第 N 回合开始时的局面。
+
+python -m analysis.scenarios ../static/game_20251209_160624_glm-4.5-air.log --round 2 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+
+from config import config
+from core.scenario import Scenario
+from analysis.log_parser import parse_game_log
+
+
+_ROUND_RE = re.compile(r"^第\s*(\d+)\s*回合\s*$")
+_HEAL_RE = re.compile(r"使用解药救了\s*(Player\d+)")
+_POISON_RE = re.compile(r"使用毒药毒杀了\s*(Player\d+)")
+_CHECK_RE = re.compile(r"查验\s*(Player\d+)\s*,\s*结果\s*:\s*(\S+)")
+_SHOT_RE = re.compile(r"猎人\s*(Player\d+)\s*开枪击杀了\s*(Player\d+)")
+_DEATH_RE = re.compile(r"💀\s*(夜晚死亡|白天死亡)\s+(.+?)\s*$")
+_VOTE_RE = re.compile(
+    r"^\[\d{2}:\d{2}:\d{2}\]\s*\S+\s*(投票|PK投票#\d+)\s*\|\s*(Player\d+)\s*->\s*(.*?)\s*$")
+_ALIVE_RE = re.compile(r"📋\s*存活玩家\(第(\d+)回合结束\)\s*:\s*(.*?)\s*$")
+_REFLECTION_RE = re.compile(r"\[第(\d+)回合-反思\]\s*(Player\d+)\s*$")
+_IMPRESSION_RE = re.compile(r"^\s*(?:\(印象\)\s*)?(Player\d+)\s*[:：]\s*(.+?)\s*$")
+
+
+def _names(raw: str) -> list[str]:
+    return re.findall(r"Player\d+", raw)
+
+
+def scenario_from_log(log_path: str | Path, start_round: int, name: str | None = None) -> Scenario:
+    """还原日志中第 start_round 回合开始时的局面（只读取此前各回合的记录）。"""
+
+    path = Path(log_path)
+    parsed = parse_game_log(path)
+    if not parsed.players:
+        raise ValueError(f"日志中没有玩家列表: {path}")
+
+    alive = list(parsed.players)
+    potions = {"healing": True, "poison": True}
+    seer_checks: dict[str, str] = {}
+    vote_history: list[dict] = []
+    impressions: dict[str, dict[str, str]] = {}
+    history: list[str] = []
+    round_events: list[str] = []
+    shots: list[tuple[str, str]] = []  # 本回合的猎人开枪 (猎人, 目标)
+
+    round_num = 0
+    reflecting: str | None = None
+    in_impressions = False
+
+    def close_round() -> None:
+        if round_num >= 1 and round_events:
+            history.append(f"第{round_num}回合：" + "；".join(round_events))
+        round_events.clear()
+
+    for line in parsed.raw_text.splitlines():
+        m = _ROUND_RE.match(line)
+        if m:
+            close_round()
+            round_num = int(m.group(1))
+            if round_num >= start_round:
+                break
+            continue
+        if round_num < 1:
+            continue
+
+        # 反思块：(印象) 之后逐行为 PlayerX:印象，直到下一条记录
+        m = _REFLECTION_RE.search(line)
+        if m:
+            reflecting, in_impressions = m.group(2), False
+            continue
+        if reflecting and line.startswith("["):
+            reflecting, in_impressions = None, False
+        if reflecting:
+            if "(印象)" in line:
+                in_impressions = True
+            if in_impressions:
+                m = _IMPRESSION_RE.match(line)
+                if m:
+                    impressions.setdefault(reflecting, {})[m.group(1)] = m.group(2)
+            continue
+
+        if m := _HEAL_RE.search(line):
+            potions["healing"] = False
+        elif m := _POISON_RE.search(line):
+            potions["poison"] = False
+        elif m := _CHECK_RE.search(line):
+            result = m.group(2)
+            seer_checks[m.group(1)] = "狼人" if result in ("werewolf", "狼人") else "好人"
+        elif m := _SHOT_RE.search(line):
+            shots.append((m.group(1), m.group(2)))
+        elif m := _DEATH_RE.search(line):
+            dead = _names(m.group(2))
+            alive = [p for p in alive if p not in dead]
+            # 死亡名单包含被猎人带走的玩家，回顾中单独列出
+            shot = {target for _, target in shots}
+            primary = [p for p in dead if p not in shot]
+            if m.group(1) == "夜晚死亡":
+                round_events.append(
+                    f"夜晚 {', '.join(primary)} 被淘汰" if primary else "夜晚平安夜")
+            elif primary:
+                round_events.append(f"白天投票放逐 {', '.join(primary)}")
+            round_events.extend(f"{hunter} 开枪带走了 {target}" for hunter, target in shots)
+            shots.clear()
+        elif m := _VOTE_RE.match(line):
+            phase, voter, action = m.groups()
+            target = _names(action)
+            vote_history.append(
+                {
+                    "round": round_num,
+                    "phase": "白天投票" if phase == "投票" else phase,
+                    "voter": voter,
+                    "target": target[0] if action.startswith("投票给") and target else None,
+                },
+            )
+        elif m := _ALIVE_RE.search(line):
+            alive = _names(m.group(2))
+    else:
+        close_round()
+
+    if round_num < start_round:
+        raise ValueError(f"日志只记录到第{round_num}回合，无法还原第{start_round}回合的局面")
+
+    wolves = sum(1 for p in alive if parsed.players[p] == "werewolf")
+    return Scenario(
+        name=name or f"{path.stem.removeprefix('game_')}_r{start_round}",
+        round=start_round,
+        roles=dict(parsed.players),
+        alive=alive,
+        potions=potions,
+        seer_checks=seer_checks,
+        vote_history=vote_history,
+        impressions={p: imp for p, imp in impressions.items() if p in alive},
+        history=history,
+        description=f"第{start_round}回合开始，{len(alive)} 人存活，其中狼人 {wolves} 名",
+        source=f"{path.name} 第{start_round}回合开始时",
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Export game scenarios from WolfMind logs")
+    p.add_argument("log", help="Path to game_*.log")
+    p.add_argument("--round", type=int, nargs="+", required=True,
+                   help="Round(s) to start the scenario at")
+    p.add_argument("--name", default=None, help="Scenario name (single round only)")
+    p.add_argument("--out-dir", default=None, help="Output directory (default: SCENARIO_DIR)")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    out_dir = Path(args.out_dir or config.scenario_dir)
+    for start_round in args.round:
+        scenario = scenario_from_log(
+            args.log, start_round, args.name if len(args.round) == 1 else None)
+        path = scenario.save(out_dir / f"{scenario.name}.json")
+        print(f"{path}: {scenario.description}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,19 @@
 """WolfMind 的 FastAPI 服务端。
 
 提供：
-- POST /api/game/start  : 启动一局新游戏（以异步后台任务运行）
+- POST /api/game/start  : 启动一局新游戏（以异步后台任务运行，可按局覆盖配置）
+- POST /api/autoplay/start / stop : 连续对局（本局开始后即在后台准备下一局）
 - GET  /api/game/status : 获取当前运行状态
 - WS   /ws/game         : 实时推送结构化游戏事件
 
-说明：游戏本体（LLM 智能体 + 引擎）在同一进程内运行；前端通过 WebSocket 订阅事件流。
+说明：游戏本体（LLM 智能体 + 引擎）在同一进程内、一个长期运行的后台事件循环中运行；
+前端通过 WebSocket 订阅事件流。
 """
 
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 from collections import deque
 from dataclasses import dataclass
 from dataclasses import field
@@ -19,25 +22,45 @@ from datetime import datetime
 import json
 from pathlib import Path
 import re
+import sys
 import threading
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse, Response, FileResponse
 from pydantic import BaseModel
 
-from game_service import run_game_session
+from config import config
+from core.memprofile import current_usage, deep_size, history, register_probe
+from core.metrics import metrics
+from core.warmup import warmup_models, warmup_status
+
+# game_service（→ agentscope / dashscope / openai / numpy）、analysis 与 httpx 较重，
+# 在首次开局 / 首次分析时于对局线程内导入，服务启动后 /health 可立即应答
+# （导入耗时见 benchmarks/import_bench.py）
+
+
+_game_id_lock = threading.Lock()
+_last_game_id = ["", 0]  # [时间戳, 同一秒内的序号]
 
 
 def _new_game_id() -> str:
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 连续对局可能在同一秒内生成多个 ID，追加序号避免日志/存档文件重名
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with _game_id_lock:
+        if _last_game_id[0] == stamp:
+            _last_game_id[1] += 1
+            return f"{stamp}_{_last_game_id[1]}"
+        _last_game_id[0], _last_game_id[1] = stamp, 1
+        return stamp
 
 
 def _map_agent_id(agent_name: str | None) -> str | None:
     if not agent_name:
         return None
-    # 后端玩家名为 Player1..Player9；前端展示使用 player_1..player_9
+    # 后端玩家名为 Player1..PlayerN；前端展示使用 player_1..player_N
     if agent_name.lower().startswith("player"):
         suffix = agent_name[6:]
         if suffix.isdigit():
@@ -108,19 +131,101 @@ class EventBus:
     def unsubscribe(self, q: asyncio.Queue) -> None:
         self._subscribers.discard(q)
 
+    def memory_usage(self) -> dict[str, Any]:
+        # 估算缓冲区与各订阅队列（积压的推送）占用的字节数；可能在游戏线程中调用，先复制再统计
+        queues = list(self._subscribers)
+        return {
+            "buffer": deep_size(list(self._buffer)),
+            "bufferEvents": len(self._buffer),
+            "subscribers": [
+                {"pending": q.qsize(), "bytes": deep_size(q)} for q in queues
+            ],
+        }
+
+
+class WorkerLoop:
+    """长期运行的后台事件循环（独立线程），所有对局、赛后分析与启动预热都在其中运行。
+
+    游戏不阻塞 FastAPI 主事件循环；HTTP 连接池按事件循环分区，
+    共用同一个循环才能让预热建立的连接、各局与分析之间真正共享客户端。
+    """
+
+    def __init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wolfmind-worker", daemon=True)
+                self._thread.start()
+        self._ready.wait()
+        assert self.loop is not None
+        return self.loop
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        """在后台循环中执行 callback（先于之后提交的回调，按提交顺序执行）。"""
+        self.start().call_soon_threadsafe(callback)
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+
+    async def _drain(self) -> None:
+        # 取消剩余任务，并关闭本循环内共享的 HTTP 客户端，避免连接随循环关闭而泄漏
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # 未开过局时不必为此导入 httpx
+        http_pool = sys.modules.get("core.http_pool")
+        if http_pool is not None:
+            await http_pool.aclose_clients()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """收尾后停止后台循环（服务关闭时调用）。"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None or self.loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), self.loop).result(timeout)
+        except Exception:  # noqa: BLE001
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join(timeout)
+        self._ready.clear()
+        self.loop = None
+
 
 @dataclass
 class GameRuntime:
     status: str = "idle"  # idle|running|error（空闲|运行中|异常）
     game_id: str | None = None
-    # 游戏在独立线程内运行，避免阻塞 FastAPI 主事件循环
-    thread: threading.Thread | None = None
-    thread_loop: asyncio.AbstractEventLoop | None = None
-    thread_task: asyncio.Task | None = None
+    # 当前对局（或连续对局）在后台事件循环中的任务；busy 在提交时即置位，任务结束后复位
+    busy: bool = False
+    task: asyncio.Task | None = None
+    finished: threading.Event | None = None
     stop_event: threading.Event | None = None
     log_path: str | None = None
     experience_path: str | None = None
     last_error: str | None = None
+    # 连续对局：autoplay_stop 置位后在当前对局结束时停止
+    autoplay: bool = False
+    autoplay_stop: threading.Event | None = None
+    games_played: int = 0
     lock: threading.Lock = field(default_factory=threading.Lock)
 
 
@@ -142,6 +247,21 @@ class StatusResponse(BaseModel):
     logPath: str | None = None
     experiencePath: str | None = None
     lastError: str | None = None
+    autoplay: bool = False
+    gamesPlayed: int = 0
+
+
+# 按局覆盖的配置项：.env 键名 -> 值，如 {"GAME_PROFILE": "fast", "OPENAI_MODEL_NAME": "m2"}
+ConfigOverrides = dict[str, str | int | float | bool]
+
+
+class StartGameRequest(BaseModel):
+    overrides: ConfigOverrides = {}
+
+
+class AutoplayRequest(BaseModel):
+    games: int = 0  # 0 表示一直运行直到停止
+    overrides: ConfigOverrides = {}  # 对每一局生效
 
 
 class PlayerInsight(BaseModel):
@@ -319,13 +439,36 @@ def create_app() -> FastAPI:
 
     bus = EventBus()
     runtime = GameRuntime()
+    worker = WorkerLoop()
+    register_probe("event_bus_buffer", lambda: bus.memory_usage()["buffer"])
+    register_probe(
+        "event_bus_queues",
+        lambda: sum(sub["bytes"] for sub in bus.memory_usage()["subscribers"]),
+    )
 
     @app.on_event("startup")
     async def _startup() -> None:
         # 绑定主事件循环，以便支持跨线程事件推送
         bus.bind_loop(asyncio.get_running_loop())
-
-    async def _run_game_async(game_id: str, stop_event: threading.Event | None) -> None:
+        worker.start()
+        # 在对局所用的后台事件循环中预热所有模型端点（连接池按事件循环分区，
+        # 这样建立的连接才会被对局复用），不阻塞服务启动；结果通过 /health 查询
+        if config.warmup_on_startup:
+            app.state.warmup_task = worker.submit(warmup_models())
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        await asyncio.to_thread(worker.stop)
+        # 主事件循环内若也创建过共享客户端，一并关闭
+        http_pool = sys.modules.get("core.http_pool")
+        if http_pool is not None:
+            await http_pool.aclose_clients()
+
+    async def _run_game_async(
+        game_id: str,
+        stop_event: threading.Event | None,
+        overrides: ConfigOverrides | None = None,
+    ) -> None:
         with runtime.lock:
             runtime.status = "running"
             runtime.game_id = game_id
@@ -337,7 +480,14 @@ def create_app() -> FastAPI:
             {"type": "system", "content": f"游戏启动中… (game_id={game_id})"})
 
         try:
-            log_path, experience_path = await run_game_session(game_id=game_id, event_sink=bus.publish, stop_event=stop_event)
+            from game_service import run_game_session
+
+            log_path, experience_path = await run_game_session(
+                game_id=game_id,
+                event_sink=bus.publish,
+                stop_event=stop_event,
+                overrides=overrides,
+            )
             with runtime.lock:
                 runtime.log_path = log_path
                 runtime.experience_path = experience_path
@@ -362,43 +512,154 @@ def create_app() -> FastAPI:
                 runtime.last_error = str(exc)
             bus.publish({"type": "day_error", "content": f"游戏异常终止: {exc}"})
 
-    def _thread_entry(game_id: str, stop_event: threading.Event) -> None:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        task: asyncio.Task | None = None
+    async def _analyze_in_background(log_path: str, experience_path: str) -> None:
+        # 赛后分析与下一局并发运行（调度器中为 analysis 优先级），失败只推送提示
         try:
-            task = loop.create_task(_run_game_async(game_id, stop_event))
-            with runtime.lock:
-                runtime.thread_loop = loop
-                runtime.thread_task = task
-            loop.run_until_complete(task)
-        except BaseException as exc:  # noqa: BLE001
-            # 若为取消则不当作异常；其它异常已在 _run_game_async 里记录并推送
-            if isinstance(exc, asyncio.CancelledError):
+            from analysis.pipeline import run_analysis
+
+            report_path = await run_analysis(log_path=log_path, experience_path=experience_path)
+            bus.publish({"type": "system", "content": f"分析报告已生成: {report_path}"})
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            bus.publish({"type": "system", "content": f"分析报告生成失败: {exc}"})
+
+    async def _run_autoplay_async(
+        first_game_id: str,
+        stop_event: threading.Event,
+        autoplay_stop: threading.Event,
+        games: int,
+        overrides: ConfigOverrides | None = None,
+    ) -> None:
+        """连续对局：第 N 局开始后即在后台准备第 N+1 局，结束后立即开始。
+
+        只在第一局准备时预热端点：同一系列共用一份配置覆盖，后续各局的端点已被上一局用过。
+        """
+
+        from game_service import prepare_game_session, run_prepared_game
+
+        def _more(played: int) -> bool:
+            return not autoplay_stop.is_set() and not stop_event.is_set() and (
+                games <= 0 or played < games)
+
+        async def _discard(task: asyncio.Task) -> None:
+            """取消未使用的下一局准备，并删除其已落盘的空经验存档。"""
+
+            task.cancel()
+            try:
+                prepared = await task
+            except (asyncio.CancelledError, Exception):
+                # 准备中途被取消或失败时，prepare_game_session 已自行删除存档
                 return
+            Path(prepared.knowledge_store.path).unlink(missing_ok=True)
+
+        analyses: set[asyncio.Task] = set()
+        played = 0
+        ended_at: float | None = None
+        next_prep: asyncio.Task | None = asyncio.create_task(prepare_game_session(
+            game_id=first_game_id, warm=config.autoplay_warmup, overrides=overrides))
+        try:
+            while next_prep is not None:
+                prepared = await next_prep
+                next_prep = None
+                with runtime.lock:
+                    runtime.status = "running"
+                    runtime.game_id = prepared.game_id
+                    runtime.last_error = None
+                if ended_at is not None:
+                    gap = time.perf_counter() - ended_at
+                    metrics.observe("autoplay_gap_seconds", gap)
+                bus.publish({
+                    "type": "system",
+                    "content": (
+                        f"自动对局第 {played + 1} 局开始 (game_id={prepared.game_id}，"
+                        f"准备耗时 {prepared.prepare_seconds:.1f}s"
+                        + (f"，局间间隔 {gap:.2f}s" if ended_at is not None else "")
+                        + ")"
+                    ),
+                })
+
+                if _more(played + 1):
+                    next_prep = asyncio.create_task(prepare_game_session(
+                        game_id=_new_game_id(), overrides=overrides))
+                log_path, experience_path = await run_prepared_game(
+                    prepared,
+                    event_sink=bus.publish,
+                    stop_event=stop_event,
+                )
+                ended_at = time.perf_counter()
+                played += 1
+                with runtime.lock:
+                    runtime.log_path = log_path
+                    runtime.experience_path = experience_path
+                    runtime.games_played = played
+                bus.publish({
+                    "type": "system",
+                    "content": f"第 {played} 局结束。日志: {log_path}，经验: {experience_path}",
+                    "logPath": log_path,
+                    "experiencePath": experience_path,
+                })
+                if config.auto_analyze:
+                    task = asyncio.create_task(_analyze_in_background(log_path, experience_path))
+                    analyses.add(task)
+                    task.add_done_callback(analyses.discard)
+                if next_prep is not None and not _more(played):
+                    # 本局期间收到了停止请求，不再开始已准备好的下一局
+                    await _discard(next_prep)
+                    next_prep = None
+
+            if analyses:
+                bus.publish({"type": "system", "content": f"等待 {len(analyses)} 份分析报告完成…"})
+                await asyncio.gather(*analyses, return_exceptions=True)
+            with runtime.lock:
+                runtime.status = "idle"
+            bus.publish({"type": "system", "content": f"自动对局结束，共 {played} 局"})
+        except asyncio.CancelledError:
+            for task in analyses:
+                task.cancel()
+            with runtime.lock:
+                runtime.status = "idle"
+            bus.publish({"type": "system", "content": "自动对局已终止"})
+            raise
+        except Exception as exc:  # noqa: BLE001
+            with runtime.lock:
+                runtime.status = "error"
+                runtime.last_error = str(exc)
+            bus.publish({"type": "day_error", "content": f"自动对局异常终止: {exc}"})
         finally:
-            try:
-                if task and not task.done():
-                    task.cancel()
-            except Exception:
-                pass
-            try:
-                loop.stop()
-            except Exception:
-                pass
-            try:
-                loop.close()
-            except Exception:
-                pass
+            if next_prep is not None:
+                await _discard(next_prep)
+
+    def _launch(runner: Callable[[], Awaitable[None]]) -> None:
+        """在后台事件循环中以任务形式运行对局；调用方已在加锁时置位 runtime.busy。"""
+
+        finished = threading.Event()
+
+        def _finished(task: asyncio.Task) -> None:
+            # 任务在开始执行前就被取消时 runner 内的收尾不会运行，统一在这里复位
             with runtime.lock:
-                runtime.thread_loop = None
-                runtime.thread_task = None
-                runtime.thread = None
+                if runtime.status == "running":
+                    runtime.status = "idle"
+                runtime.busy = False
+                runtime.task = None
                 runtime.stop_event = None
+                runtime.autoplay = False
+                runtime.autoplay_stop = None
+            finished.set()
+
+        def _spawn() -> None:
+            task = asyncio.ensure_future(runner())
+            task.add_done_callback(_finished)
+            with runtime.lock:
+                runtime.task = task
+
+        with runtime.lock:
+            runtime.finished = finished
+        worker.call_soon(_spawn)
 
     @app.get("/health")
-    async def health() -> dict[str, str]:
-        return {"status": "ok"}
+    async def health() -> dict[str, Any]:
+        return {"status": "ok", "warmup": warmup_status.snapshot()}
 
     @app.get("/", response_class=PlainTextResponse)
     async def root() -> str:
@@ -417,8 +678,25 @@ def create_app() -> FastAPI:
             logPath=runtime.log_path,
             experiencePath=runtime.experience_path,
             lastError=runtime.last_error,
+            autoplay=runtime.autoplay,
+            gamesPlayed=runtime.games_played,
         )
 
+    @app.get("/api/metrics")
+    async def get_metrics() -> dict[str, Any]:
+        # 运行指标快照：阶段超时次数等
+        return metrics.snapshot()
+
+    @app.get("/api/memory")
+    async def get_memory() -> dict[str, Any]:
+        # 进程内存概况 + 最近若干局的阶段采样（需 MEMORY_PROFILE=true 才有采样）
+        return {
+            "enabled": config.memory_profile,
+            "current": current_usage(),
+            "eventBus": bus.memory_usage(),
+            "games": history.snapshot(),
+        }
+
     @app.get("/api/exports/log")
     async def export_latest_log() -> FileResponse:
         with runtime.lock:
@@ -479,81 +757,125 @@ def create_app() -> FastAPI:
             players=players,
         )
 
-    @app.post("/api/game/start", response_model=StartGameResponse)
-    async def start_game() -> StartGameResponse:
-        with runtime.lock:
-            running = runtime.thread is not None and runtime.thread.is_alive()
-        if running:
-            raise HTTPException(
-                status_code=409, detail="A game is already running")
+    def _check_overrides(overrides: ConfigOverrides) -> None:
+        # 覆盖项有误时直接返回 400；.env 本身的配置错误仍在开局后通过状态与事件报告
+        if not overrides:
+            return
+        try:
+            is_valid, error_msg = config.snapshot(overrides).validate()
+        except ValueError as exc:
+            is_valid, error_msg = False, str(exc)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=f"配置错误: {error_msg}")
 
+    @app.post("/api/game/start", response_model=StartGameResponse)
+    async def start_game(req: StartGameRequest | None = None) -> StartGameResponse:
+        overrides = req.overrides if req is not None else {}
+        _check_overrides(overrides)
         game_id = _new_game_id()
         stop_event = threading.Event()
-        t = threading.Thread(target=_thread_entry, args=(
-            game_id, stop_event), daemon=True)
         with runtime.lock:
+            if runtime.busy:
+                raise HTTPException(
+                    status_code=409, detail="A game is already running")
+            runtime.busy = True
             runtime.stop_event = stop_event
-            runtime.thread = t
             runtime.status = "running"
             runtime.game_id = game_id
             runtime.last_error = None
             runtime.log_path = None
             runtime.experience_path = None
-        t.start()
+        _launch(lambda: _run_game_async(game_id, stop_event, overrides))
 
         # 通知已连接的 WS 客户端
         bus.publish({"type": "system", "content": "已收到开始游戏请求"})
 
         return StartGameResponse(gameId=game_id, status="running", wsUrl="/ws/game")
 
+    @app.post("/api/autoplay/start", response_model=StartGameResponse)
+    async def start_autoplay(req: AutoplayRequest | None = None) -> StartGameResponse:
+        games = req.games if req is not None else 0
+        overrides = req.overrides if req is not None else {}
+        _check_overrides(overrides)
+        game_id = _new_game_id()
+        stop_event = threading.Event()
+        autoplay_stop = threading.Event()
+        with runtime.lock:
+            if runtime.busy:
+                raise HTTPException(
+                    status_code=409, detail="A game is already running")
+            runtime.busy = True
+            runtime.stop_event = stop_event
+            runtime.autoplay_stop = autoplay_stop
+            runtime.autoplay = True
+            runtime.games_played = 0
+            runtime.status = "running"
+            runtime.game_id = game_id
+            runtime.last_error = None
+            runtime.log_path = None
+            runtime.experience_path = None
+        _launch(lambda: _run_autoplay_async(
+            game_id, stop_event, autoplay_stop, games, overrides))
+
+        bus.publish({
+            "type": "system",
+            "content": f"已开始自动对局（{f'共 {games} 局' if games > 0 else '直到停止'}）",
+        })
+        return StartGameResponse(gameId=game_id, status="running", wsUrl="/ws/game")
+
+    @app.post("/api/autoplay/stop", response_model=StopGameResponse)
+    async def stop_autoplay() -> StopGameResponse:
+        # 温和停止：当前对局正常打完（含赛后总结）后不再开始下一局；立即终止请用 /api/game/stop
+        with runtime.lock:
+            autoplay_stop = runtime.autoplay_stop
+            game_id = runtime.game_id
+        if autoplay_stop is None:
+            return StopGameResponse(status=runtime.status, gameId=game_id, message="当前没有自动对局")
+        autoplay_stop.set()
+        bus.publish({"type": "system", "content": "已收到停止自动对局请求，当前对局结束后停止"})
+        return StopGameResponse(status="running", gameId=game_id, message="当前对局结束后停止自动对局")
+
     @app.post("/api/game/stop", response_model=StopGameResponse)
     async def stop_game() -> StopGameResponse:
         with runtime.lock:
-            thread = runtime.thread
-            loop = runtime.thread_loop
-            task = runtime.thread_task
+            busy = runtime.busy
+            finished = runtime.finished
             stop_event = runtime.stop_event
             status = runtime.status
             game_id = runtime.game_id
 
         # 无运行任务时直接返回
-        if not thread or not thread.is_alive() or status != "running":
+        if not busy or status != "running":
             with runtime.lock:
                 runtime.status = "idle"
             return StopGameResponse(status="idle", gameId=game_id, message="当前没有运行中的游戏")
 
-        # 请求取消：同时设置 stop_event + 取消线程内任务（若已可用）
+        # 请求取消：同时设置 stop_event + 取消后台循环中的对局任务
+        # （只取消本局任务，同一循环中的其它任务如预热不受影响）
         bus.publish({"type": "system", "content": "已收到终止游戏请求"})
         if stop_event:
             stop_event.set()
-        if loop:
+
+        def _cancel() -> None:
+            # 排在 _spawn 之后执行，此时任务已创建
+            with runtime.lock:
+                task = runtime.task
+            if task is not None:
+                task.cancel()
+
+        worker.call_soon(_cancel)
+
+        # 尝试等待对局快速收尾（避免状态长时间卡住）
+        if finished is not None:
             try:
-                # cancel main task (if known)
-                if task:
-                    loop.call_soon_threadsafe(task.cancel)
-                # cancel any other tasks spawned in the game loop
-
-                def _cancel_all() -> None:
-                    try:
-                        for t in asyncio.all_tasks(loop):
-                            t.cancel()
-                    except Exception:
-                        return
-                loop.call_soon_threadsafe(_cancel_all)
+                await asyncio.to_thread(finished.wait, 2.0)
             except Exception:
                 pass
 
-        # 尝试等待线程快速收尾（避免状态长时间卡住）
-        try:
-            await asyncio.to_thread(thread.join, 2.0)
-        except Exception:
-            pass
-
         with runtime.lock:
-            # 若线程仍在跑，保持 running；否则置 idle
-            if runtime.thread is None or (runtime.thread and not runtime.thread.is_alive()):
-                if runtime.status == "running":
-                    runtime.status = "idle"
+            # 若任务仍在收尾，保持 running；否则置 idle
+            if not runtime.busy and runtime.status == "running":
+                runtime.status = "idle"
             status = runtime.status
             game_id = runtime.game_id
 
@@ -0,0 +1 @@
+"""不依赖大模型的性能基准脚本（python -m benchmarks.<name>）。"""
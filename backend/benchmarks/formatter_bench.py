@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""增量格式化基准：在模拟的长对局记忆上对比完整格式化与增量格式化。
+
+python -m benchmarks.formatter_bench --turns 300 --provider openai
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+
+def _ensure_backend_on_syspath() -> None:
+    backend_dir = Path(__file__).resolve().parent.parent
+    backend_str = str(backend_dir)
+    if backend_str not in sys.path:
+        sys.path.insert(0, backend_str)
+
+
+_ensure_backend_on_syspath()
+
+from agentscope.formatter import (  # noqa: E402
+    DashScopeMultiAgentFormatter,
+    OllamaMultiAgentFormatter,
+    OpenAIMultiAgentFormatter,
+)
+from agentscope.message import Msg, TextBlock, ToolResultBlock, ToolUseBlock  # noqa: E402
+
+from core.formatting import IncrementalFormatter  # noqa: E402
+
+FORMATTERS = {
+    "openai": OpenAIMultiAgentFormatter,
+    "dashscope": DashScopeMultiAgentFormatter,
+    "ollama": OllamaMultiAgentFormatter,
+}
+
+SPEECH = "我是好人，昨晚没有信息。Player3 的发言前后矛盾，我更倾向于把票投给他。" * 3
+
+
+def _turn_messages(turn: int, n_players: int) -> list[Msg]:
+    """一次发言回合新增的记忆：其他玩家的公开发言 + 主持人提示 + 结构化输出的工具调用与回复。"""
+
+    msgs = [
+        Msg(f"Player{(turn + i) % n_players + 1}", f"[表现] 语气平静\n{SPEECH}", "assistant")
+        for i in range(3)
+    ]
+    msgs.append(Msg("Moderator", f"第{turn}轮，请发言。", "assistant"))
+    call_id = f"call_{turn}"
+    msgs.append(
+        Msg(
+            "Player1",
+            [ToolUseBlock(type="tool_use", id=call_id, name="generate_response",
+                          input={"speech": SPEECH, "behavior": "点头", "thought": "..."})],
+            "assistant",
+        ),
+    )
+    msgs.append(
+        Msg(
+            "system",
+            [ToolResultBlock(type="tool_result", id=call_id, name="generate_response",
+                             output=[TextBlock(type="text", text="Successfully generated response.")])],
+            "system",
+        ),
+    )
+    msgs.append(Msg("Player1", SPEECH, "assistant"))
+    return msgs
+
+
+async def _run(provider: str, turns: int, n_players: int) -> None:
+    full = FORMATTERS[provider]()
+    incremental = IncrementalFormatter(FORMATTERS[provider]())
+    memory: list[Msg] = []
+    full_seconds = incremental_seconds = 0.0
+
+    for turn in range(1, turns + 1):
+        memory.extend(_turn_messages(turn, n_players))
+        # 与 ReActAgent 一致：每次推理新建系统提示消息，末尾附带本次提示
+        msgs = [
+            Msg("system", "你是狼人杀玩家 Player1。", "system"),
+            *memory,
+            Msg("user", "<system-hint>请调用 generate_response</system-hint>", "user"),
+        ]
+
+        start = time.perf_counter()
+        expected = await full.format(msgs)
+        full_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = await incremental.format(msgs)
+        incremental_seconds += time.perf_counter() - start
+
+        if actual != expected:
+            raise AssertionError(f"第 {turn} 轮增量格式化结果与完整格式化不一致")
+
+    # 记忆被编辑（删除中间一条）后应从变化处重建且结果一致
+    del memory[len(memory) // 2]
+    msgs = [Msg("system", "你是狼人杀玩家 Player1。", "system"), *memory]
+    if await incremental.format(msgs) != await full.format(msgs):
+        raise AssertionError("删除记忆后增量格式化结果与完整格式化不一致")
+
+    print(f"提供商: {provider}  回合: {turns}  最终记忆条数: {len(memory)}")
+    print(f"完整格式化累计耗时: {full_seconds * 1000:.1f} ms")
+    print(f"增量格式化累计耗时: {incremental_seconds * 1000:.1f} ms")
+    if incremental_seconds > 0:
+        print(f"加速比: {full_seconds / incremental_seconds:.1f}x")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Incremental formatter microbenchmark")
+    p.add_argument("--turns", type=int, default=300, help="Number of simulated speaking turns")
+    p.add_argument("--players", type=int, default=9)
+    p.add_argument("--provider", default="openai", choices=sorted(FORMATTERS))
+    args = p.parse_args()
+    asyncio.run(_run(args.provider, args.turns, args.players))
+
+
+if __name__ == "__main__":
+    main()
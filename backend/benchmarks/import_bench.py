@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""导入耗时基准：在全新解释器中用 -X importtime 测量 import api_server 的耗时。
+
+服务重启后 /health 要等 api_server 导入完成才能应答；模型 SDK（agentscope、
+dashscope、openai）、numpy 与分析模块应在首次开局 / 首次分析时才导入。
+超出预算或启动时导入了重模块时以非零状态退出，便于在 CI 中跟踪。
+
+python -m benchmarks.import_bench --runs 5 --budget-ms 800
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 服务启动时不应导入的模块（首次开局 / 首次分析时才加载）
+HEAVY_MODULES = (
+    "agentscope",
+    "dashscope",
+    "openai",
+    "numpy",
+    "httpx",
+    "game_service",
+    "analysis.pipeline",
+)
+
+_PROBE = (
+    "import sys, {module}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def _parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """解析 -X importtime 输出：模块 -> (自身 μs, 累计 μs)。"""
+
+    timings: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        timings[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def measure(module: str) -> tuple[int, dict[str, tuple[int, int]], list[str]]:
+    """导入一次 module，返回 (累计 μs, 各模块耗时, 已加载的重模块)。"""
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH", "")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"导入 {module} 失败:\n{tail}")
+    timings = _parse_importtime(proc.stderr)
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return timings.get(module, (0, 0))[1], timings, loaded
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="API server import-time benchmark")
+    p.add_argument("--module", default="api_server")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--budget-ms", type=float, default=800.0,
+                   help="导入耗时中位数预算（毫秒），超出时退出码为 1")
+    p.add_argument("--top", type=int, default=10, help="列出累计耗时最高的模块个数")
+    args = p.parse_args()
+
+    totals = []
+    timings: dict[str, tuple[int, int]] = {}
+    loaded: list[str] = []
+    for _ in range(max(1, args.runs)):
+        total, timings, loaded = measure(args.module)
+        totals.append(total / 1000)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: 中位数 {median:.0f}ms，"
+          f"最快 {min(totals):.0f}ms，最慢 {max(totals):.0f}ms（{len(totals)} 次）")
+
+    # 只列顶层包（不含 args.module 自身），按累计耗时排序
+    top_level = {
+        name: cumulative for name, (_, cumulative) in timings.items()
+        if "." not in name and name != args.module
+    }
+    print(f"{'模块':<28} {'累计ms':>8}")
+    for name, cumulative in sorted(top_level.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{name:<28} {cumulative / 1000:>8.1f}")
+
+    failed = False
+    if loaded:
+        print(f"✗ 启动时导入了重模块: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"✗ 超出预算 {args.budget_ms:.0f}ms")
+        failed = True
+    if not failed:
+        print(f"✓ 在预算 {args.budget_ms:.0f}ms 内，未导入重模块")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
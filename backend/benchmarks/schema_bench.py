@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""精简 schema 基准：对比每种结构化输出模型随每次调用发送的 schema 大小。
+
+python -m benchmarks.schema_bench --players 9
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def _ensure_backend_on_syspath() -> None:
+    backend_dir = Path(__file__).resolve().parent.parent
+    backend_str = str(backend_dir)
+    if backend_str not in sys.path:
+        sys.path.insert(0, backend_str)
+
+
+_ensure_backend_on_syspath()
+
+from models.schemas import (  # noqa: E402
+    BaseDecision,
+    DiscussionModel,
+    KnowledgeUpdateModel,
+    ReflectionModel,
+    compact_model,
+    get_hunter_model,
+    get_seer_model,
+    get_vote_model,
+    get_witch_model,
+    schema_chars,
+)
+from prompts.role_prompts import RolePrompts  # noqa: E402
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compact structured-output schema benchmark")
+    p.add_argument("--players", type=int, default=9)
+    p.add_argument("--chars-per-token", type=float, default=1.5)
+    args = p.parse_args()
+
+    agents = [SimpleNamespace(name=f"Player{i}") for i in range(1, args.players + 1)]
+    models = {
+        "发言/遗言": BaseDecision,
+        "狼人讨论": DiscussionModel,
+        "投票": get_vote_model(agents),
+        "女巫": get_witch_model(agents),
+        "预言家": get_seer_model(agents),
+        "猎人": get_hunter_model(agents),
+        "回合反思": ReflectionModel,
+        "经验更新": KnowledgeUpdateModel,
+    }
+
+    guide = len(RolePrompts.schema_guide)
+    cpt = args.chars_per_token
+    header = f"{'调用':<8} {'完整':>6} {'精简':>6} {'减少':>6} {'≈tokens':>8} {'净≈tokens':>9}"
+    print(header)
+    print("-" * len(header))
+    for label, model in models.items():
+        full = schema_chars(model)
+        compact = schema_chars(compact_model(model))
+        saved = full - compact
+        print(
+            f"{label:<8} {full:>6} {compact:>6} {saved:>6} "
+            f"{saved / cpt:>8.0f} {(saved - guide) / cpt:>9.0f}"
+        )
+    print(f"\n角色指令中的字段说明: {guide} 字符（随记忆进入每次调用，净值已扣除）")
+
+
+if __name__ == "__main__":
+    main()
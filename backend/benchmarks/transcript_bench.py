@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""共享公开记录基准：模拟一局 30 回合对局，对比逐个写入记忆与共享公开记录的内存与耗时。
+
+python -m benchmarks.transcript_bench --rounds 30 --players 9
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def _ensure_backend_on_syspath() -> None:
+    backend_dir = Path(__file__).resolve().parent.parent
+    backend_str = str(backend_dir)
+    if backend_str not in sys.path:
+        sys.path.insert(0, backend_str)
+
+
+_ensure_backend_on_syspath()
+
+from agentscope.agent import AgentBase  # noqa: E402
+from agentscope.memory import InMemoryMemory  # noqa: E402
+from agentscope.message import Msg  # noqa: E402
+from agentscope.pipeline import MsgHub  # noqa: E402
+
+from core.transcript import PublicHub, PublicTranscript, TranscriptMemory  # noqa: E402
+
+SPEECH = "我是好人，昨晚没有信息。Player3 的发言前后矛盾，我更倾向于把票投给他。" * 3
+
+
+class _Player(AgentBase):
+    """只维护记忆的玩家，模拟 ReActAgent 的 observe 与一次结构化调用写入的私有消息。"""
+
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+        self.memory = InMemoryMemory()
+
+    async def observe(self, msg: Msg | list[Msg] | None) -> None:
+        await self.memory.add(msg)
+
+    async def act(self, prompt: Msg) -> Msg:
+        reply = Msg(self.name, SPEECH, "assistant", metadata={"speech": SPEECH})
+        await self.memory.add([prompt, reply])
+        return reply
+
+
+async def _play(players: list[_Player], rounds: int, transcript: PublicTranscript | None) -> None:
+    for round_num in range(1, rounds + 1):
+        hub = (
+            PublicHub(transcript, players, enable_auto_broadcast=False)
+            if transcript is not None
+            else MsgHub(players, enable_auto_broadcast=False)
+        )
+        await hub.broadcast(Msg("Moderator", f"第{round_num}轮，天亮了。", "assistant"))
+        # 白天讨论 + 投票：每人一次私有调用，发言公开广播
+        for phase in ("讨论", "投票"):
+            for player in players:
+                prompt = Msg("Moderator", f"[{player.name} ONLY] 请{phase}。", "user")
+                reply = await player.act(prompt)
+                await hub.broadcast(Msg(player.name, reply.content, "assistant"))
+
+
+async def _run(rounds: int, n_players: int, shared: bool) -> tuple[float, int, int, list[list[str]]]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    players = [_Player(f"Player{i + 1}") for i in range(n_players)]
+    transcript = None
+    if shared:
+        transcript = PublicTranscript()
+        for player in players:
+            TranscriptMemory.replace(player, transcript)
+    await _play(players, rounds, transcript)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    views = [[msg.id for msg in await p.memory.get_memory()] for p in players]
+    return elapsed, current, peak, views
+
+
+async def _main(rounds: int, n_players: int) -> None:
+    base = await _run(rounds, n_players, shared=False)
+    shared = await _run(rounds, n_players, shared=True)
+    # 两种方式下每名玩家看到的消息数必须一致（id 不同，比较长度与顺序结构）
+    if [len(v) for v in base[3]] != [len(v) for v in shared[3]]:
+        raise AssertionError("共享公开记录的记忆视图与逐个写入不一致")
+
+    print(f"{n_players} 人 × {rounds} 回合，每名玩家记忆 {len(base[3][0])} 条")
+    print(f"{'方式':<10}{'耗时':>10}{'当前内存':>14}{'峰值内存':>14}")
+    for label, (elapsed, current, peak, _) in (("逐个写入", base), ("共享记录", shared)):
+        print(f"{label:<10}{elapsed * 1000:>8.1f}ms{current / 1024:>12.1f}KB{peak / 1024:>12.1f}KB")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Shared public transcript benchmark")
+    p.add_argument("--rounds", type=int, default=30)
+    p.add_argument("--players", type=int, default=9)
+    args = p.parse_args()
+    asyncio.run(_main(args.rounds, args.players))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,176 @@
 # -*- coding: utf-8 -*-
-"""配置管理模块 - 从 .env 文件读取配置"""
+"""配置管理模块 - 从 .env 文件读取配置
+
+全局 ``config`` 按上下文取值：
+- 对局内（game_service / 引擎绑定了本局快照）读 ConfigSnapshot：创建时的 .env
+  加上本局覆盖项，只读，各属性首次读取后缓存；
+- 对局外读实时配置。CONFIG_HOT_RELOAD=true 时，每次创建快照前检查 .env 的
+  修改时间，有变化则重新加载，因此修改 .env 只影响之后开始的对局。
+"""
+import functools
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Iterator, Mapping, Optional, TypeVar
+
+
+# 对局规模预设：为各开关/上限设置封顶值，只会收紧 .env 中的配置、不会放宽。
+# full 不设封顶（即 .env 原值）；0 表示关闭该项。
+GAME_PROFILES: dict[str, dict[str, int]] = {
+    "fast": {
+        "max_game_round": 3,
+        "max_discussion_round": 1,
+        "max_pk_round": 1,
+        "reflection_interval": 0,
+        "knowledge_updates": 0,
+        "game_summary": 0,
+    },
+    "standard": {
+        "max_game_round": 12,
+        "max_discussion_round": 2,
+        "max_pk_round": 2,
+        "reflection_interval": 2,
+        "knowledge_updates": 1,
+        "game_summary": 0,
+    },
+    "full": {},
+}
+
+# 进程级配置（连接池、并发上限、熔断、服务启动行为等），不能按局覆盖
+PROCESS_KEYS = frozenset({
+    "CONFIG_HOT_RELOAD",
+    "MODEL_ENDPOINT_CONCURRENCY",
+    "MODEL_MAX_RETRIES",
+    "MODEL_RETRY_BASE_DELAY",
+    "MODEL_RETRY_MAX_DELAY",
+    "CIRCUIT_FAILURE_THRESHOLD",
+    "CIRCUIT_RESET_SECONDS",
+    "HTTP_POOL",
+    "HTTP_POOL_MAX_CONNECTIONS",
+    "HTTP_POOL_MAX_KEEPALIVE",
+    "HTTP_POOL_KEEPALIVE_EXPIRY",
+    "HTTP2",
+    "WARMUP_ON_STARTUP",
+    "WARMUP_TIMEOUT",
+    "AUTOPLAY_WARMUP",
+    "MEMORY_PROFILE_GAMES",
+    "ENABLE_STUDIO",
+    "STUDIO_URL",
+    "STUDIO_PROJECT",
+})
+
+# 可按局覆盖的配置（新增 Config 属性读取的键时需同步登记在这里或 PROCESS_KEYS 中）
+GAME_KEYS = frozenset({
+    # 模型
+    "MODEL_PROVIDER",
+    "DASHSCOPE_API_KEY",
+    "DASHSCOPE_MODEL_NAME",
+    "OPENAI_API_KEY",
+    "OPENAI_BASE_URL",
+    "OPENAI_MODEL_NAME",
+    "OPENAI_PLAYER_MODE",
+    "OLLAMA_MODEL_NAME",
+    "OLLAMA_KEEP_ALIVE",
+    "ANALYSIS_OPENAI_API_KEY",
+    "ANALYSIS_OPENAI_BASE_URL",
+    "ANALYSIS_OPENAI_MODEL_NAME",
+    # 对局规则与规模
+    "PLAYER_COUNT",
+    "ROLE_COMPOSITION",
+    "GAME_PROFILE",
+    "MAX_GAME_ROUND",
+    "MAX_DISCUSSION_ROUND",
+    "MAX_PK_ROUND",
+    "REFLECTION_INTERVAL",
+    "KNOWLEDGE_UPDATES",
+    "GAME_SUMMARY",
+    "WOLF_DISCUSSION_MODE",
+    "SCENARIO",
+    "SCENARIO_DIR",
+    "PHASE_TIMEOUT",
+    # 机器人玩家
+    "BOT_SEATS",
+    "BOT_SEED",
+    "BOT_VOTE_STRATEGY",
+    "BOT_WITCH_SAVE",
+    "BOT_WITCH_POISON",
+    "BOT_HUNTER_STRATEGY",
+    "BOT_SEER_CLAIM",
+    # 提示与推测
+    "SHARED_TRANSCRIPT",
+    "INCREMENTAL_FORMATTER",
+    "COMPACT_SCHEMA",
+    "SPECULATIVE_DISCUSSION",
+    "SPECULATION_CLAIM_MARKERS",
+    # 预算与调度
+    "GAME_TOKEN_BUDGET",
+    "BUDGET_CHARS_PER_TOKEN",
+    "BUDGET_DEGRADE_THRESHOLDS",
+    "BUDGET_FALLBACK_MODEL",
+    "GAME_PRIORITY",
+    "GAME_SCHEDULER_WEIGHT",
+    # 存档、分析与剖析
+    "LOG_DIR",
+    "EXPERIENCE_DIR",
+    "EXPERIENCE_ID",
+    "AUTO_ANALYZE",
+    "MEMORY_PROFILE",
+    "MEMORY_PROFILE_TOP",
+})
+
+# Config 读取的全部 .env 键名；按局覆盖只接受这些键，拼写错误的键不会被静默忽略
+KNOWN_KEYS = GAME_KEYS | PROCESS_KEYS
+
+# 动态拼接的键名：玩家级 OpenAI 配置（KEY_Pn）与阶段级截止时间（PHASE_TIMEOUT_<阶段>）
+_DYNAMIC_KEY_PATTERN = re.compile(
+    r"^(?:OPENAI_(?:API_KEY|BASE_URL|MODEL_NAME)_P[1-9][0-9]*|PHASE_TIMEOUT_[A-Z_]+)$")
+
+T = TypeVar("T")
+
+_KEY_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
+
+def _read_env_file(env_path: Path) -> dict[str, str]:
+    """解析 .env 文件，文件不存在时返回空字典。"""
+    env: dict[str, str] = {}
+    if not env_path.exists():
+        return env
+    with open(env_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            # 跳过注释和空行
+            if not line or line.startswith("#"):
+                continue
+            # 解析键值对
+            if "=" in line:
+                key, value = line.split("=", 1)
+                key = key.strip()
+                value = value.strip()
+                if key:
+                    env[key] = value
+    return env
+
+
+def normalize_overrides(overrides: Mapping[str, Any] | None) -> dict[str, str]:
+    """把按局覆盖项规范为 .env 形式的字符串；键名非法、未知或为进程级配置时抛出 ValueError。"""
+    result: dict[str, str] = {}
+    for key, value in (overrides or {}).items():
+        key = str(key).strip()
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"配置项名称不合法: {key!r}（应为大写 .env 键名，如 GAME_PROFILE）")
+        if key in PROCESS_KEYS:
+            raise ValueError(f"{key} 是进程级配置，不能按局覆盖")
+        if key not in KNOWN_KEYS and not _DYNAMIC_KEY_PATTERN.match(key):
+            raise ValueError(f"未知的配置项: {key}（不是本项目读取的 .env 键名，检查拼写）")
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif value is None:
+            value = ""
+        result[key] = str(value).strip()
+    return result
 
 
 class Config:
@@ -11,34 +180,51 @@ class Config:
         """初始化配置，从 .env 文件加载"""
         self.backend_dir = Path(__file__).resolve().parent
         self.root_dir = self.backend_dir.parent
+        self.env_path = self.root_dir / ".env"
         self._env: dict[str, str] = {}
+        self._env_stamp: tuple[int, int] | None = None
+        self._reload_lock = threading.Lock()
         self._load_env()
 
+    def _stat_env(self) -> tuple[int, int] | None:
+        try:
+            stat = self.env_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def _load_env(self):
-        """加载 .env 文件"""
-        env_path = self.root_dir / ".env"
-        if env_path.exists():
-            with open(env_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    # 跳过注释和空行
-                    if not line or line.startswith("#"):
-                        continue
-                    # 解析键值对
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key:
-                            self._env[key] = value
-        else:
-            # 未找到 .env 文件时保持空配置，后续使用默认值
-            self._env = {}
+        """加载 .env 文件（未找到时保持空配置，后续使用默认值）"""
+        stamp = self._stat_env()
+        # 整体替换而非原地修改，正在读取旧字典的线程不受影响
+        self._env = _read_env_file(self.env_path)
+        self._env_stamp = stamp
+
+    def reload_if_changed(self) -> bool:
+        """.env 的修改时间或大小变化时重新加载，返回是否重新加载。"""
+        if not self.config_hot_reload:
+            return False
+        with self._reload_lock:
+            if self._stat_env() == self._env_stamp:
+                return False
+            self._load_env()
+            return True
+
+    def snapshot(self, overrides: Mapping[str, Any] | None = None) -> "ConfigSnapshot":
+        """取当前 .env（必要时先重新加载）加上覆盖项的只读快照，供一局游戏使用。"""
+        normalized = normalize_overrides(overrides)
+        self.reload_if_changed()
+        return ConfigSnapshot(self, {**self._env, **normalized}, normalized)
 
     def _get(self, key: str, default: str | None = None) -> Optional[str]:
         """从 .env 数据中获取配置，优先 .env 而非系统环境变量"""
         return self._env.get(key, default)
 
+    @property
+    def config_hot_reload(self) -> bool:
+        """.env 修改后是否在下一局开始前自动重新加载"""
+        return self._get("CONFIG_HOT_RELOAD", "true").lower() == "true"
+
     # ==================== API 配置 ====================
 
     @property
@@ -63,7 +249,7 @@ class Config:
         return (self._get("OPENAI_PLAYER_MODE", "single") or "single").lower()
 
     def _get_player_override(self, key_prefix: str, idx: int) -> Optional[str]:
-        """读取形如 KEY_P1..P9 的配置。"""
+        """读取形如 KEY_P1..Pn 的配置。"""
 
         return self._get(f"{key_prefix}_P{idx}")
 
@@ -108,30 +294,30 @@ class Config:
 
     @property
     def openai_player_api_keys(self) -> list[str]:
-        """每个玩家的 OpenAI API Key 列表（从 OPENAI_API_KEY_P1..P9 读取）。"""
+        """每个玩家的 OpenAI API Key 列表（从 OPENAI_API_KEY_P1..Pn 读取）。"""
 
-        return [self._get_player_override("OPENAI_API_KEY", i) or "" for i in range(1, 10)]
+        return [self._get_player_override("OPENAI_API_KEY", i) or "" for i in range(1, self.player_count + 1)]
 
     @property
     def openai_player_base_urls(self) -> list[str]:
-        """每个玩家的 OpenAI Base URL 列表（从 OPENAI_BASE_URL_P1..P9 读取）。"""
+        """每个玩家的 OpenAI Base URL 列表（从 OPENAI_BASE_URL_P1..Pn 读取）。"""
 
-        return [self._get_player_override("OPENAI_BASE_URL", i) or "" for i in range(1, 10)]
+        return [self._get_player_override("OPENAI_BASE_URL", i) or "" for i in range(1, self.player_count + 1)]
 
     @property
     def openai_player_models(self) -> list[str]:
-        """OpenAI 模型列表（从 OPENAI_MODEL_NAME_P1..P9 读取，按 Player1-Player9 顺序）。"""
+        """OpenAI 模型列表（从 OPENAI_MODEL_NAME_P1..Pn 读取，按 Player1-PlayerN 顺序）。"""
 
-        return [self._get_player_override("OPENAI_MODEL_NAME", i) or "" for i in range(1, 10)]
+        return [self._get_player_override("OPENAI_MODEL_NAME", i) or "" for i in range(1, self.player_count + 1)]
 
     @property
     def openai_player_configs(self) -> list[dict[str, str]]:
         """组合每位玩家的 OpenAI 配置。
 
         逻辑：
-        - 若 OPENAI_PLAYER_MODE=single，则忽略玩家级字段，9 人共用全局 OPENAI_*。
+        - 若 OPENAI_PLAYER_MODE=single，则忽略玩家级字段，所有玩家共用全局 OPENAI_*。
         - 若 OPENAI_PLAYER_MODE=per-player：
-            * 需为 9 个玩家全部提供 API_KEY/Base_URL/Model 的独立字段；缺失即报错。
+            * 需为 PLAYER_COUNT 个玩家全部提供 API_KEY/Base_URL/Model 的独立字段；缺失即报错。
         """
 
         keys = self.openai_player_api_keys
@@ -150,11 +336,11 @@ class Config:
                 "base_url": self.openai_base_url,
                 "model_name": self.openai_model_name,
             }
-            return [shared] * 9
+            return [shared] * self.player_count
 
         # per-player: 每人必须有完整三元组
         configs: list[dict[str, str]] = []
-        for idx in range(9):
+        for idx in range(self.player_count):
             per_key = keys[idx]
             per_base = bases[idx]
             per_model = models[idx]
@@ -178,6 +364,11 @@ class Config:
         """Ollama Model Name"""
         return self._get("OLLAMA_MODEL_NAME", "qwen2.5:1.5b")
 
+    @property
+    def ollama_keep_alive(self) -> str:
+        """Ollama 模型在显存中的保留时长（如 30m、2h，-1 表示常驻）"""
+        return self._get("OLLAMA_KEEP_ALIVE", "30m")
+
     # ==================== 模型选择 ====================
 
     @property
@@ -187,15 +378,304 @@ class Config:
 
     # ==================== 游戏配置 ====================
 
+    @property
+    def player_count(self) -> int:
+        """玩家人数（内置 9/12/15/18 人板子）"""
+        return int(self._get("PLAYER_COUNT", "9"))
+
+    @property
+    def role_composition(self) -> dict[str, int]:
+        """当前人数的角色配置；ROLE_COMPOSITION 形如 werewolf:4,villager:5,seer:1,witch:1,hunter:1"""
+        from core.rules import get_composition, parse_composition
+
+        raw = self._get("ROLE_COMPOSITION")
+        override = parse_composition(raw) if raw else None
+        return get_composition(self.player_count, override)
+
+    @property
+    def incremental_formatter(self) -> bool:
+        """玩家智能体是否使用增量格式化（缓存已格式化的记忆前缀）"""
+        return self._get("INCREMENTAL_FORMATTER", "true").lower() == "true"
+
+    @property
+    def compact_schema(self) -> bool:
+        """结构化输出 schema 是否只保留短字段说明（完整说明写入角色指令一次）"""
+        return self._get("COMPACT_SCHEMA", "false").lower() == "true"
+
+    @property
+    def shared_transcript(self) -> bool:
+        """公开广播是否写入每局共享的公开记录（而非逐个写入玩家记忆）"""
+        return self._get("SHARED_TRANSCRIPT", "true").lower() == "true"
+
+    # ==================== 对局规模预设 ====================
+
+    @property
+    def game_profile(self) -> str:
+        """对局规模预设: fast / standard / full（默认 full，即不额外限制）"""
+        return self._get("GAME_PROFILE", "full").strip().lower()
+
+    def _profile_cap(self, key: str) -> Optional[int]:
+        """当前预设对某项的封顶值，未封顶返回 None。"""
+        return GAME_PROFILES.get(self.game_profile, {}).get(key)
+
+    def _capped(self, key: str, value: int) -> int:
+        cap = self._profile_cap(key)
+        return value if cap is None else min(value, cap)
+
     @property
     def max_game_round(self) -> int:
         """最大游戏轮数"""
-        return int(self._get("MAX_GAME_ROUND", "30"))
+        return self._capped("max_game_round", int(self._get("MAX_GAME_ROUND", "30")))
 
     @property
     def max_discussion_round(self) -> int:
         """每个狼人的最大讨论轮数"""
-        return int(self._get("MAX_DISCUSSION_ROUND", "3"))
+        return self._capped(
+            "max_discussion_round", int(self._get("MAX_DISCUSSION_ROUND", "3")))
+
+    @property
+    def max_pk_round(self) -> int:
+        """白天平票 PK 的最大轮数，超过后按姓名顺位淘汰"""
+        return max(1, self._capped("max_pk_round", int(self._get("MAX_PK_ROUND", "3"))))
+
+    @property
+    def reflection_interval(self) -> int:
+        """每隔几个回合进行一次回合反思，0 表示不反思"""
+        interval = int(self._get("REFLECTION_INTERVAL", "1"))
+        cap = self._profile_cap("reflection_interval")
+        if cap is None or interval <= 0:
+            return max(0, interval)
+        # 预设限制的是反思频率：间隔取较大者，预设为 0 时关闭
+        return max(interval, cap) if cap > 0 else 0
+
+    @property
+    def knowledge_updates(self) -> bool:
+        """回合反思时是否更新经验库"""
+        enabled = self._get("KNOWLEDGE_UPDATES", "true").lower() == "true"
+        return enabled and self._profile_cap("knowledge_updates") != 0
+
+    @property
+    def game_summary(self) -> bool:
+        """游戏结束后是否让每位玩家发表总结"""
+        enabled = self._get("GAME_SUMMARY", "true").lower() == "true"
+        return enabled and self._profile_cap("game_summary") != 0
+
+    def game_profile_settings(self) -> dict[str, object]:
+        """当前预设下实际生效的对局规模设置（写入日志与经验文件）。"""
+        return {
+            "profile": self.game_profile,
+            "max_game_round": self.max_game_round,
+            "max_discussion_round": self.max_discussion_round,
+            "max_pk_round": self.max_pk_round,
+            "reflection_interval": self.reflection_interval,
+            "knowledge_updates": self.knowledge_updates,
+            "game_summary": self.game_summary,
+        }
+
+    def game_profile_summary(self) -> str:
+        """如 ``fast：最多3回合，狼人讨论1轮，PK最多1轮，不反思，不更新经验，跳过总结``。"""
+        interval = self.reflection_interval
+        reflection = (
+            "不反思" if interval <= 0
+            else "每回合反思" if interval == 1
+            else f"每{interval}回合反思"
+        )
+        return (
+            f"{self.game_profile}：最多{self.max_game_round}回合，"
+            f"狼人讨论{self.max_discussion_round}轮，PK最多{self.max_pk_round}轮，{reflection}，"
+            f"{'更新经验' if self.knowledge_updates else '不更新经验'}，"
+            f"{'赛后总结' if self.game_summary else '跳过总结'}"
+        )
+
+    @property
+    def wolf_discussion_mode(self) -> str:
+        """狼人夜间讨论方式：sequential 轮流发言；parallel 并行提案 + 并行确认"""
+        mode = self._get("WOLF_DISCUSSION_MODE", "sequential").strip().lower()
+        return mode if mode in ("sequential", "parallel") else "sequential"
+
+    @property
+    def speculative_discussion(self) -> bool:
+        """白天顺序发言时是否为下一位玩家提前生成发言草稿"""
+        return self._get("SPECULATIVE_DISCUSSION", "false").lower() == "true"
+
+    @property
+    def speculation_claim_markers(self) -> tuple[str, ...]:
+        """与玩家名同句出现时使草稿作废的声明标记（逗号分隔）"""
+        raw = self._get("SPECULATION_CLAIM_MARKERS", "查杀,金水,银水,验了,查验,毒了,救了,归票,投")
+        return tuple(item.strip() for item in raw.split(",") if item.strip())
+
+    @property
+    def phase_timeout(self) -> float:
+        """单次玩家动作的默认截止时间（秒），0 表示不限时"""
+        return float(self._get("PHASE_TIMEOUT", "180"))
+
+    def get_phase_timeout(self, phase: str) -> float:
+        """读取形如 PHASE_TIMEOUT_DAY_VOTE 的阶段级截止时间，未设置则使用默认值。"""
+
+        raw = self._get(f"PHASE_TIMEOUT_{phase.upper()}")
+        return float(raw) if raw else self.phase_timeout
+
+    # ==================== 机器人玩家 ====================
+
+    @property
+    def bot_seats(self) -> set[int]:
+        """由规则型机器人控制的座位号（从 1 开始）；BOT_SEATS=all 表示全部座位"""
+        raw = (self._get("BOT_SEATS", "") or "").strip().lower()
+        if raw == "all":
+            return set(range(1, self.player_count + 1))
+        return {int(part) for part in raw.split(",") if part.strip()}
+
+    @property
+    def bot_vote_strategy(self) -> str:
+        """机器人投票策略: random 或 majority"""
+        return self._get("BOT_VOTE_STRATEGY", "majority").lower()
+
+    @property
+    def bot_witch_save(self) -> str:
+        """机器人女巫解药策略: always / never / random"""
+        return self._get("BOT_WITCH_SAVE", "always").lower()
+
+    @property
+    def bot_witch_poison(self) -> str:
+        """机器人女巫毒药策略: suspect / random / never"""
+        return self._get("BOT_WITCH_POISON", "suspect").lower()
+
+    @property
+    def bot_hunter_strategy(self) -> str:
+        """机器人猎人开枪策略: suspect / random / never"""
+        return self._get("BOT_HUNTER_STRATEGY", "suspect").lower()
+
+    @property
+    def bot_seer_claim(self) -> bool:
+        """机器人预言家是否在白天跳身份并报查验"""
+        return self._get("BOT_SEER_CLAIM", "true").lower() == "true"
+
+    @property
+    def bot_seed(self) -> Optional[int]:
+        """机器人随机种子（可选，便于复现）"""
+        raw = self._get("BOT_SEED")
+        return int(raw) if raw else None
+
+    # ==================== 模型调用容错 ====================
+
+    @property
+    def model_max_retries(self) -> int:
+        """单次模型调用的最大重试次数"""
+        return int(self._get("MODEL_MAX_RETRIES", "3"))
+
+    @property
+    def model_retry_base_delay(self) -> float:
+        """重试退避的基准等待时间（秒）"""
+        return float(self._get("MODEL_RETRY_BASE_DELAY", "1.0"))
+
+    @property
+    def model_retry_max_delay(self) -> float:
+        """重试退避的最长等待时间（秒）"""
+        return float(self._get("MODEL_RETRY_MAX_DELAY", "30"))
+
+    @property
+    def circuit_failure_threshold(self) -> int:
+        """同一端点连续失败多少次后熔断"""
+        return int(self._get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+
+    @property
+    def circuit_reset_seconds(self) -> float:
+        """熔断后多久放行试探请求（秒）"""
+        return float(self._get("CIRCUIT_RESET_SECONDS", "30"))
+
+    # ==================== HTTP 连接池 ====================
+
+    @property
+    def http_pool(self) -> bool:
+        """同一端点的模型是否共用 HTTP 连接池"""
+        return self._get("HTTP_POOL", "true").lower() == "true"
+
+    @property
+    def http_pool_max_connections(self) -> int:
+        """每个共享客户端的最大连接数"""
+        return int(self._get("HTTP_POOL_MAX_CONNECTIONS", "100"))
+
+    @property
+    def http_pool_max_keepalive(self) -> int:
+        """每个共享客户端保持的空闲 keep-alive 连接数"""
+        return int(self._get("HTTP_POOL_MAX_KEEPALIVE", "20"))
+
+    @property
+    def http_pool_keepalive_expiry(self) -> float:
+        """空闲连接的保活时长（秒）"""
+        return float(self._get("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+
+    @property
+    def http2(self) -> bool:
+        """是否启用 HTTP/2（需安装 h2，未安装时自动使用 HTTP/1.1）"""
+        return self._get("HTTP2", "true").lower() == "true"
+
+    # ==================== 模型调用调度 ====================
+
+    @property
+    def model_endpoint_concurrency(self) -> int:
+        """每个模型端点同时在途的调用上限，0 表示不限"""
+        return int(self._get("MODEL_ENDPOINT_CONCURRENCY", "0"))
+
+    @property
+    def game_priority(self) -> str:
+        """对局模型调用的默认调度优先级: interactive / batch / analysis"""
+        return self._get("GAME_PRIORITY", "interactive").lower()
+
+    @property
+    def game_scheduler_weight(self) -> float:
+        """同一优先级内，本进程对局分配调用名额的权重"""
+        return float(self._get("GAME_SCHEDULER_WEIGHT", "1"))
+
+    @property
+    def warmup_on_startup(self) -> bool:
+        """服务启动时是否预热所有已配置的模型端点"""
+        return self._get("WARMUP_ON_STARTUP", "true").lower() == "true"
+
+    @property
+    def warmup_timeout(self) -> float:
+        """单个端点预热的超时时间（秒）"""
+        return float(self._get("WARMUP_TIMEOUT", "60"))
+
+    # ==================== 内存剖析 ====================
+
+    @property
+    def memory_profile(self) -> bool:
+        """是否在每个阶段边界采样 RSS、tracemalloc 与玩家记忆大小"""
+        return self._get("MEMORY_PROFILE", "false").lower() == "true"
+
+    @property
+    def memory_profile_top(self) -> int:
+        """每次采样记录的 tracemalloc 最大分配点个数"""
+        return int(self._get("MEMORY_PROFILE_TOP", "5"))
+
+    @property
+    def memory_profile_games(self) -> int:
+        """进程内保留最近多少局的内存采样（/api/memory）"""
+        return int(self._get("MEMORY_PROFILE_GAMES", "10"))
+
+    # ==================== 单局预算 ====================
+
+    @property
+    def game_token_budget(self) -> int:
+        """单局估算 token 上限，0 表示不限"""
+        return int(self._get("GAME_TOKEN_BUDGET", "0"))
+
+    @property
+    def budget_degrade_thresholds(self) -> tuple[float, ...]:
+        """依次进入四个降级阶段的用量比例"""
+        raw = self._get("BUDGET_DEGRADE_THRESHOLDS", "0.5,0.7,0.85,0.95")
+        return tuple(float(part) for part in raw.split(",") if part.strip())
+
+    @property
+    def budget_chars_per_token(self) -> float:
+        """估算 token 时每个 token 对应的字符数"""
+        return float(self._get("BUDGET_CHARS_PER_TOKEN", "1.5"))
+
+    @property
+    def budget_fallback_model(self) -> Optional[str]:
+        """预算降级时切换到的低价模型名（同一提供商），未设置则不切换"""
+        return self._get("BUDGET_FALLBACK_MODEL") or None
 
     # ==================== AgentScope Studio 配置 ====================
 
@@ -216,6 +696,11 @@ class Config:
 
     # ==================== 经验分析配置 ====================
 
+    @property
+    def autoplay_warmup(self) -> bool:
+        """连续对局开始前是否预热模型端点（只在第一局前预热）"""
+        return self._get("AUTOPLAY_WARMUP", "true").lower() == "true"
+
     @property
     def auto_analyze(self) -> bool:
         """是否在游戏结束后自动进行数据分析"""
@@ -241,6 +726,17 @@ class Config:
         raw_path = self._get("LOG_DIR", "data/game_logs")
         return str(self._resolve_path(raw_path))
 
+    @property
+    def scenario(self) -> str:
+        """起始场景（SCENARIO_DIR 下的场景名或 JSON 路径），为空时从第 1 回合正常开局"""
+        return self._get("SCENARIO", "") or ""
+
+    @property
+    def scenario_dir(self) -> str:
+        """对局场景目录。"""
+        raw_path = self._get("SCENARIO_DIR", "data/scenarios")
+        return str(self._resolve_path(raw_path))
+
     def _resolve_path(self, raw_path: str) -> Path:
         """将相对路径解析为仓库根目录下的绝对路径。"""
         path = Path(raw_path)
@@ -256,6 +752,37 @@ class Config:
         Returns:
             (is_valid, error_message)
         """
+        try:
+            self.role_composition
+        except ValueError as exc:
+            return False, str(exc)
+
+        # 逐个读取全部属性，无法解析的取值（如 MAX_GAME_ROUND=abc）在开局前就报错；
+        # 玩家级 OpenAI 配置只在 openai 提供商下校验（见下文）
+        for name in sorted(_CACHED_PROPERTIES - {"openai_player_configs"}):
+            try:
+                getattr(self, name)
+            except Exception as exc:  # noqa: BLE001
+                return False, f"配置项 {name} 无法解析: {exc}"
+        for key in self._env:
+            if key.startswith("PHASE_TIMEOUT_"):
+                try:
+                    self.get_phase_timeout(key[len("PHASE_TIMEOUT_"):])
+                except ValueError as exc:
+                    return False, f"配置项 {key} 无法解析: {exc}"
+
+        if self.game_profile not in GAME_PROFILES:
+            return False, f"GAME_PROFILE 只能是 {' / '.join(GAME_PROFILES)}"
+
+        thresholds = self.budget_degrade_thresholds
+        if len(thresholds) != 4 or list(thresholds) != sorted(thresholds):
+            return False, "BUDGET_DEGRADE_THRESHOLDS 需要 4 个递增的比例"
+
+        if self.game_priority not in ("interactive", "batch", "analysis"):
+            return False, "GAME_PRIORITY 只能是 interactive / batch / analysis"
+        if self.game_scheduler_weight <= 0:
+            return False, "GAME_SCHEDULER_WEIGHT 必须为正数"
+
         if self.model_provider == "dashscope":
             if not self.dashscope_api_key:
                 return False, "DASHSCOPE_API_KEY 未设置"
@@ -312,6 +839,8 @@ class Config:
             print(f"Ollama Model: {self.ollama_model_name}")
 
         # print(f"游戏语言: {self.game_language}")
+        print(f"玩家人数: {self.player_count}")
+        print(f"对局规模预设: {self.game_profile_summary()}")
         print(f"最大游戏轮数: {self.max_game_round}")
         print(f"最大讨论轮数: {self.max_discussion_round}")
         print(f"启用 Studio: {self.enable_studio}")
@@ -320,5 +849,128 @@ class Config:
         print("=" * 50)
 
 
+# 快照中首次读取后缓存的属性
+_CACHED_PROPERTIES = frozenset(
+    name for name, attr in vars(Config).items() if isinstance(attr, property))
+
+
+class ConfigSnapshot(Config):
+    """某一时刻的只读配置：.env 加上本局覆盖项，属性值首次读取后缓存。
+
+    Args:
+        base: 实时配置（新快照总是基于它创建）
+        env: 合并后的配置项
+        overrides: 本局覆盖项（已规范化）
+    """
+
+    def __init__(self, base: Config, env: Mapping[str, str], overrides: Mapping[str, str]):
+        for name, value in (
+            ("backend_dir", base.backend_dir),
+            ("root_dir", base.root_dir),
+            ("env_path", base.env_path),
+            ("overrides", MappingProxyType(dict(overrides))),
+            ("_base", base),
+            ("_env", MappingProxyType(dict(env))),
+            ("_cache", {}),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"配置快照只读，不能设置 {name}")
+
+    def __getattribute__(self, name: str) -> Any:
+        if name not in _CACHED_PROPERTIES:
+            return object.__getattribute__(self, name)
+        cache = object.__getattribute__(self, "_cache")
+        try:
+            return cache[name]
+        except KeyError:
+            # 抛出异常（如玩家级配置不完整）时不缓存，每次读取都会重新报错
+            value = cache[name] = object.__getattribute__(self, name)
+            return value
+
+    def reload_if_changed(self) -> bool:
+        return False
+
+    def snapshot(self, overrides: Mapping[str, Any] | None = None) -> "ConfigSnapshot":
+        """基于最新的 .env 创建新快照，沿用本快照的覆盖项（可再追加）。"""
+        return self._base.snapshot({**self.overrides, **(overrides or {})})
+
+    def validate(self) -> tuple[bool, str]:
+        cache = self._cache
+        if "validate" not in cache:
+            cache["validate"] = Config.validate(self)
+        return cache["validate"]
+
+    def describe_overrides(self) -> str:
+        """覆盖项的一行说明（密钥打码），写入对局日志。"""
+        return ", ".join(
+            f"{key}={'***' if 'KEY' in key else value}" for key, value in self.overrides.items())
+
+
+_current: ContextVar[ConfigSnapshot | None] = ContextVar("config_snapshot", default=None)
+
+
+def bind_config(snapshot: ConfigSnapshot) -> Token:
+    return _current.set(snapshot)
+
+
+def unbind_config(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_snapshot() -> ConfigSnapshot | None:
+    return _current.get()
+
+
+@contextmanager
+def config_scope(snapshot: ConfigSnapshot | None = None) -> Iterator[ConfigSnapshot]:
+    """在 with 块内绑定配置快照；未给定时沿用已绑定的快照，没有则新取一份。"""
+    current = _current.get()
+    if snapshot is None and current is not None:
+        yield current
+        return
+    snapshot = snapshot or config.snapshot()
+    token = bind_config(snapshot)
+    try:
+        yield snapshot
+    finally:
+        unbind_config(token)
+
+
+def with_config_scope(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """协程装饰器：调用期间绑定配置快照（规则同 config_scope）。"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        with config_scope():
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+class _ConfigProxy:
+    """全局配置入口：当前上下文绑定了快照时读快照，否则读实时配置。"""
+
+    __slots__ = ("_live",)
+
+    def __init__(self, live: Config) -> None:
+        object.__setattr__(self, "_live", live)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_current.get() or self._live, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(_current.get() or self._live, name, value)
+
+    def __dir__(self) -> list[str]:
+        return dir(_current.get() or self._live)
+
+    @property
+    def live(self) -> Config:
+        """实时配置（不受当前上下文绑定的快照影响）。"""
+        return self._live
+
+
 # 全局配置实例
-config = Config()
+config = _ConfigProxy(Config())
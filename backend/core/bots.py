@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""规则型机器人玩家：不调用任何大模型，按可配置策略给出与结构化模型一致的输出。
+
+机器人可以与 LLM 玩家混坐，走同一套 werewolves_game 流程；
+常用于只研究一两个 LLM 座位、其余座位用低成本对手填充的场景。
+"""
+from __future__ import annotations
+
+import random
+import re
+import typing
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+from config import config
+
+
+_ABSTAIN = {"abstain", "弃权"}
+_SEER_CLAIM = re.compile(r"我是预言家|我是真预言家|我的查验")
+
+
+@dataclass
+class BotStrategy:
+    """机器人策略参数。
+
+    Attributes:
+        vote: random 随机投票；majority 跟随场上指认最多的玩家
+        witch_save: always 有人被刀就救；never 从不救；random 随机
+        witch_poison: suspect 仅毒被预言家查杀的玩家；random 随机毒；never 从不毒
+        hunter: suspect 带走最可疑的玩家；random 随机；never 不开枪
+        seer_claim: 预言家是否在白天跳身份并报查验
+    """
+
+    vote: str = "majority"
+    witch_save: str = "always"
+    witch_poison: str = "suspect"
+    hunter: str = "suspect"
+    seer_claim: bool = True
+
+    @classmethod
+    def from_config(cls) -> "BotStrategy":
+        return cls(
+            vote=config.bot_vote_strategy,
+            witch_save=config.bot_witch_save,
+            witch_poison=config.bot_witch_poison,
+            hunter=config.bot_hunter_strategy,
+            seer_claim=config.bot_seer_claim,
+        )
+
+    def label(self) -> str:
+        return f"bot: heuristic(vote={self.vote})"
+
+
+def is_bot(agent: Any) -> bool:
+    """判断座位是否由机器人控制。"""
+    return isinstance(agent, HeuristicAgent)
+
+
+def _mentions(name: str, text: str) -> bool:
+    """文本是否提到该玩家（避免 Player1 误匹配 Player12）。"""
+    return re.search(re.escape(name) + r"(?!\d)", text) is not None
+
+
+def _literal_names(structured_model: Any, field: str) -> list[str]:
+    """从结构化模型字段的 Literal 注解中取出可选玩家名。"""
+
+    fields = getattr(structured_model, "model_fields", {}) or {}
+    info = fields.get(field)
+    if info is None:
+        return []
+
+    names: list[str] = []
+
+    def _walk(annotation: Any) -> None:
+        for arg in typing.get_args(annotation):
+            if isinstance(arg, str):
+                if arg not in _ABSTAIN and arg not in names:
+                    names.append(arg)
+            else:
+                _walk(arg)
+
+    _walk(info.annotation)
+    return names
+
+
+class HeuristicAgent(AgentBase):
+    """规则型机器人玩家。
+
+    角色对象由 RoleFactory 通过 bind_role 绑定，玩家容器由 Players.add_player
+    通过 bind_players 绑定；机器人只读取自己有权知道的信息（存活名单、
+    狼人队友、自己的查验结果），其余判断来自观察到的公开发言。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        strategy: BotStrategy | None = None,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self.strategy = strategy or BotStrategy()
+        self.rng = random.Random(seed)
+        self.role_obj: Any = None
+        self.players: Any = None
+        self.accusations: Counter[str] = Counter()  # 公开发言中被指认为狼的次数
+        self.seer_claims: set[str] = set()  # 公开跳预言家的玩家
+        self.reported: dict[str, str] = {}  # 公开报出的查验结果 {player: 狼人/好人}
+
+    # ---------- 绑定 ----------
+
+    def bind_role(self, role_obj: Any) -> None:
+        self.role_obj = role_obj
+
+    def bind_players(self, players: Any) -> None:
+        self.players = players
+
+    @property
+    def role_name(self) -> str:
+        return getattr(self.role_obj, "role_name", "")
+
+    def _teammates(self) -> set[str]:
+        if self.role_name != "werewolf" or self.players is None:
+            return set()
+        return set(self.players.role_to_names.get("werewolf", []))
+
+    def _known(self) -> dict[str, str]:
+        """预言家自己的查验结果。"""
+        return dict(getattr(self.role_obj, "known_identities", {}) or {})
+
+    # ---------- 观察 ----------
+
+    async def observe(self, msg: Msg | list[Msg] | None) -> None:
+        if msg is None:
+            return
+        for item in msg if isinstance(msg, list) else [msg]:
+            self._observe_one(item)
+
+    def _observe_one(self, msg: Msg) -> None:
+        speaker = getattr(msg, "name", "")
+        if speaker in ("Moderator", self.name) or self.players is None:
+            return
+        text = msg.get_text_content() or ""
+        names = [
+            name for name in self.players.seat_of if name != speaker and _mentions(name, text)
+        ]
+        if not names:
+            return
+
+        claims_seer = bool(_SEER_CLAIM.search(text))
+        if claims_seer:
+            self.seer_claims.add(speaker)
+        for sentence in re.split(r"[。！？!?\n；;，,]", text):
+            for name in names:
+                if not _mentions(name, sentence):
+                    continue
+                if "狼" in sentence and "不是狼" not in sentence:
+                    self.accusations[name] += 1
+                    if claims_seer:
+                        self.reported[name] = "狼人"
+                elif claims_seer and ("好人" in sentence or "金水" in sentence):
+                    self.reported[name] = "好人"
+
+    # ---------- 决策 ----------
+
+    def _suspicion(self, name: str) -> float:
+        known = self._known().get(name)
+        if known == "狼人":
+            return 100.0
+        if known == "好人":
+            return -100.0
+        score = float(self.accusations.get(name, 0))
+        if self.reported.get(name) == "狼人":
+            score += 3
+        elif self.reported.get(name) == "好人":
+            score -= 3
+        return score
+
+    def _pick_target(self, candidates: list[str], strategy: str) -> str | None:
+        """在候选中按策略选人；狼人永远不选队友。"""
+
+        teammates = self._teammates()
+        pool = [n for n in candidates if n != self.name and n not in teammates]
+        if not pool:
+            return None
+        if strategy == "random":
+            return self.rng.choice(pool)
+        if teammates:
+            # 狼人优先处理跳预言家的玩家，其次跟随场上风向
+            claimers = [n for n in pool if n in self.seer_claims]
+            if claimers:
+                return self.rng.choice(claimers)
+            scores = {n: float(self.accusations.get(n, 0)) for n in pool}
+        else:
+            scores = {n: self._suspicion(n) for n in pool}
+        best = max(scores.values())
+        return self.rng.choice([n for n, s in scores.items() if s == best])
+
+    def _speech(self) -> str:
+        if self.role_name == "seer" and self.strategy.seer_claim:
+            known = self._known()
+            if known:
+                reports = "，".join(f"{n} 是{r}" for n, r in known.items())
+                return f"我是预言家，我的查验结果：{reports}。"
+        alive = [p.name for p in self.players.current_alive] if self.players else []
+        suspect = self._pick_target(alive, self.strategy.vote) if alive else None
+        if suspect and (self._teammates() or self._suspicion(suspect) > 0):
+            return f"我是好人。目前我觉得 {suspect} 是狼的可能性大。"
+        return "我是好人，没有更多信息，先听听大家的发言。"
+
+    def _decide(self, structured_model: Any) -> dict[str, Any]:
+        fields = set(getattr(structured_model, "model_fields", {}) or {})
+        data: dict[str, Any] = {"thought": "", "behavior": "", "speech": ""}
+
+        if "vote" in fields:
+            candidates = _literal_names(structured_model, "vote")
+            target = self._pick_target(candidates, self.strategy.vote)
+            if target is None and structured_model.model_fields["vote"].is_required():
+                # 不允许弃权时只能在候选中选一人
+                target = self.rng.choice([n for n in candidates if n != self.name] or candidates)
+            data["vote"] = target
+            data["speech"] = f"我投 {target}。" if target else "我弃权。"
+        elif "reach_agreement" in fields:
+            alive = [p.name for p in self.players.current_alive] if self.players else []
+            target = self._pick_target(alive, self.strategy.vote)
+            data["speech"] = f"今晚刀 {target}。" if target else "听队友的。"
+            data["reach_agreement"] = True
+        elif "resurrect" in fields or "poison" in fields:
+            if "resurrect" in fields:
+                policy = self.strategy.witch_save
+                data["resurrect"] = policy == "always" or (policy == "random" and self.rng.random() < 0.5)
+            if "poison" in fields:
+                # 同一晚不能同时使用两种药
+                policy = "never" if data.get("resurrect") else self.strategy.witch_poison
+                candidates = _literal_names(structured_model, "name")
+                target = None
+                if policy == "suspect":
+                    target = next((n for n in candidates if self.reported.get(n) == "狼人"), None)
+                elif policy == "random" and self.rng.random() < 0.5:
+                    target = self._pick_target(candidates, "random")
+                data["poison"] = target is not None
+                data["name"] = target
+        elif "shoot" in fields:
+            policy = self.strategy.hunter
+            target = None
+            if policy != "never":
+                target = self._pick_target(_literal_names(structured_model, "name"), policy)
+                if policy == "suspect" and target and self._suspicion(target) <= 0:
+                    target = None
+            data["shoot"] = target is not None
+            data["name"] = target
+        elif "impression_updates" in fields:
+            data.pop("behavior")
+            data.pop("speech")
+            data["impression_updates"] = {
+                name: "被多次指认为狼" for name, count in self.accusations.items() if count >= 2
+            }
+        elif "knowledge" in fields:
+            data.pop("behavior")
+            data.pop("speech")
+            # 机器人不积累经验，原样保留已有知识，避免覆盖为空
+            data["knowledge"] = self.players.get_knowledge(self.name) if self.players else ""
+        elif "name" in fields:
+            candidates = _literal_names(structured_model, "name")
+            checked = set(getattr(self.role_obj, "checked_players", []) or [])
+            pool = [n for n in candidates if n != self.name and n not in checked]
+            data["name"] = self.rng.choice(pool or [n for n in candidates if n != self.name] or candidates)
+        else:
+            data["speech"] = self._speech()
+
+        return structured_model.model_validate(data).model_dump()
+
+    async def reply(self, msg: Msg | None = None, structured_model: Any = None) -> Msg:
+        if msg is not None:
+            await self.observe(msg)
+        if structured_model is None:
+            return Msg(self.name, self._speech(), role="assistant")
+        metadata = self._decide(structured_model)
+        return Msg(self.name, metadata.get("speech") or "", role="assistant", metadata=metadata)
+
+    async def handle_interrupt(self, *args: Any, **kwargs: Any) -> Msg:
+        return Msg(self.name, "", role="assistant", metadata={"_is_interrupted": True})
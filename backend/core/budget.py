@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""单局 token 预算：按估算消耗分级降级，预算耗尽时提前结束对局。
+
+降级阶段依次为：
+1. short_discussion：狼人夜聊压缩为一轮（并行模式跳过确认轮）
+2. compact_context：缩短注入的印象/发言/投票上下文
+3. cheap_model：切换到 BUDGET_FALLBACK_MODEL 指定的低价模型
+4. skip_knowledge：回合反思时跳过经验库更新
+5. exhausted：在下一个阶段边界结束对局
+
+当前对局的预算通过 ContextVar 绑定，BaseRole.ask 在每次调用后记账；
+同一进程内并发的多局游戏各自运行在独立的上下文中，互不干扰。
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar, Token
+from typing import Any, Callable
+
+from config import config
+from core.metrics import metrics
+
+
+BUDGET_STAGES = (
+    "normal",
+    "short_discussion",
+    "compact_context",
+    "cheap_model",
+    "skip_knowledge",
+    "exhausted",
+)
+
+STAGE_LABELS = {
+    "normal": "正常",
+    "short_discussion": "缩短狼人夜聊",
+    "compact_context": "精简上下文",
+    "cheap_model": "切换低价模型",
+    "skip_knowledge": "跳过经验更新",
+    "exhausted": "预算耗尽",
+}
+
+# 进入各阶段时写入日志的措施说明（cheap_model 由引擎按实际切换结果填写）
+STAGE_MEASURES = {
+    "short_discussion": "狼人夜聊压缩为一轮",
+    "compact_context": "注入的印象/发言/投票上下文改为精简版",
+    "cheap_model": "切换低价模型",
+    "skip_knowledge": "回合反思不再更新经验库",
+    "exhausted": "将在下一个阶段边界结束对局",
+}
+
+_current: ContextVar["GameBudget | None"] = ContextVar("game_budget", default=None)
+
+
+class GameBudget:
+    """单局 token 预算（估算值：字符数 / BUDGET_CHARS_PER_TOKEN）。
+
+    Args:
+        limit_tokens: 预算上限，0 表示不限（始终处于 normal 阶段）
+        thresholds: 进入降级阶段 1~4 的用量比例，须递增
+        chars_per_token: 字符与 token 的换算比例
+        on_stage_change: 阶段上升时的回调，参数为新阶段名
+    """
+
+    def __init__(
+        self,
+        limit_tokens: int = 0,
+        thresholds: tuple[float, ...] = (0.5, 0.7, 0.85, 0.95),
+        chars_per_token: float = 1.5,
+        on_stage_change: Callable[[str], None] | None = None,
+    ) -> None:
+        if len(thresholds) != len(BUDGET_STAGES) - 2:
+            raise ValueError(f"需要 {len(BUDGET_STAGES) - 2} 个降级阈值，实际为 {len(thresholds)}")
+        if list(thresholds) != sorted(thresholds):
+            raise ValueError(f"降级阈值必须递增: {thresholds}")
+        self.limit_tokens = max(0, int(limit_tokens))
+        self.thresholds = tuple(thresholds)
+        self.chars_per_token = chars_per_token
+        self.on_stage_change = on_stage_change
+        self.used_tokens = 0.0
+        self.calls = 0
+        self.stage_index = 0
+
+    @classmethod
+    def from_config(cls, on_stage_change: Callable[[str], None] | None = None) -> "GameBudget":
+        return cls(
+            limit_tokens=config.game_token_budget,
+            thresholds=config.budget_degrade_thresholds,
+            chars_per_token=config.budget_chars_per_token,
+            on_stage_change=on_stage_change,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit_tokens > 0
+
+    @property
+    def stage(self) -> str:
+        return BUDGET_STAGES[self.stage_index]
+
+    @property
+    def fraction(self) -> float:
+        return self.used_tokens / self.limit_tokens if self.enabled else 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.stage == "exhausted"
+
+    def reached(self, stage: str) -> bool:
+        """当前阶段是否已达到（或超过）指定降级阶段。"""
+        return self.stage_index >= BUDGET_STAGES.index(stage)
+
+    def charge(self, prompt_chars: int, completion_chars: int = 0) -> None:
+        """记录一次模型调用的估算消耗，必要时推进降级阶段。"""
+
+        tokens = (prompt_chars + completion_chars) / self.chars_per_token
+        self.used_tokens += tokens
+        self.calls += 1
+        metrics.incr("budget_tokens_estimated", tokens)
+        if not self.enabled:
+            return
+
+        fraction = self.fraction
+        target = 0
+        for idx, threshold in enumerate(self.thresholds, start=1):
+            if fraction >= threshold:
+                target = idx
+        if fraction >= 1.0:
+            target = len(BUDGET_STAGES) - 1
+
+        # 阶段只升不降；跨越多个阶段时逐级触发回调，保证每级措施都被执行
+        while self.stage_index < target:
+            self.stage_index += 1
+            metrics.incr("budget_stage_entered", stage=self.stage)
+            if self.on_stage_change is not None:
+                self.on_stage_change(self.stage)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return f"未设上限，估算消耗约 {self.used_tokens:.0f} tokens（{self.calls} 次调用）"
+        return (
+            f"估算消耗约 {self.used_tokens:.0f}/{self.limit_tokens} tokens"
+            f"（{self.fraction:.0%}，{self.calls} 次调用），最终阶段: {STAGE_LABELS[self.stage]}"
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "stageLabel": STAGE_LABELS[self.stage],
+            "usedTokens": round(self.used_tokens),
+            "limitTokens": self.limit_tokens,
+            "fraction": round(self.fraction, 4),
+            "calls": self.calls,
+        }
+
+
+def current_budget() -> GameBudget | None:
+    """当前对局的预算（未在对局上下文中时为 None）。"""
+    return _current.get()
+
+
+def bind_budget(budget: GameBudget | None) -> Token:
+    """把预算绑定到当前上下文，返回值用于 unbind_budget 还原。"""
+    return _current.set(budget)
+
+
+def unbind_budget(token: Token) -> None:
+    _current.reset(token)
+
+
+def _reply_chars(reply: Any) -> int:
+    metadata = getattr(reply, "metadata", None)
+    if metadata:
+        return len(str(metadata))
+    get_text = getattr(reply, "get_text_content", None)
+    return len(get_text() or "") if callable(get_text) else 0
+
+
+def charge_call(prompt_chars: int, reply: Any) -> None:
+    """为当前对局记一次模型调用（提示字符 + 回复字符）。"""
+
+    budget = _current.get()
+    if budget is not None:
+        budget.charge(prompt_chars, _reply_chars(reply))
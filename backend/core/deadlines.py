@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""阶段截止时间：模型调用超时或失败后回落到确定性的默认动作，保证回合延迟有上限。"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable
+
+from agentscope.message import Msg
+
+from core.metrics import metrics
+
+
+# 阶段键 -> 日志中展示的阶段名
+PHASES: dict[str, str] = {
+    "wolf_discussion": "狼人讨论",
+    "wolf_vote": "狼人投票",
+    "witch": "女巫行动",
+    "seer": "预言家行动",
+    "hunter": "猎人开枪",
+    "last_words": "遗言",
+    "day_discussion": "白天讨论",
+    "day_vote": "投票",
+    "pk_speech": "PK发言",
+    "pk_vote": "PK投票",
+    "reflection": "回合反思",
+    "summary": "游戏总结",
+}
+
+TIMEOUT_SPEECH = "(超时未发言)"
+
+
+def timeout_speech_msg(name: str, **extra: Any) -> Msg:
+    """超时后代替玩家发言的默认消息。"""
+    return Msg(
+        name,
+        TIMEOUT_SPEECH,
+        role="assistant",
+        metadata={
+            "thought": "",
+            "behavior": "",
+            "speech": TIMEOUT_SPEECH,
+            "timed_out": True,
+            **extra,
+        },
+    )
+
+
+def _is_interrupted(result: Any) -> bool:
+    """ReActAgent 被取消时会吞掉 CancelledError 并返回带 _is_interrupted 的消息。"""
+    metadata = getattr(result, "metadata", None)
+    return isinstance(metadata, dict) and bool(metadata.get("_is_interrupted"))
+
+
+async def call_with_deadline(
+    awaitable: Awaitable[Any],
+    timeout: float | None,
+) -> tuple[Any, bool]:
+    """在截止时间内等待结果，返回 (result, timed_out)。
+
+    只有真正超时（TimeoutError 或耗时达到截止时间）才算超时；调用被外部取消
+    （如丢弃推测草稿、终止对局）时继续抛出 CancelledError，不回落为默认动作。
+    """
+
+    if not timeout or timeout <= 0:
+        result = await awaitable
+        if _is_interrupted(result):
+            raise asyncio.CancelledError("玩家动作被取消")
+        return result, False
+
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        return None, True
+    if time.perf_counter() - start >= timeout:
+        # 超时取消被智能体吞掉后，wait_for 会正常返回被中断的消息
+        return None, True
+    if _is_interrupted(result):
+        raise asyncio.CancelledError("玩家动作被取消")
+    return result, False
+
+
+class PhaseDeadlines:
+    """按阶段读取截止时间，并在超时或调用失败后记录日志/指标、返回回落动作。"""
+
+    def __init__(self, timeouts: dict[str, float], logger: Any | None = None) -> None:
+        self.timeouts = timeouts
+        self.logger = logger
+
+    def timeout_for(self, phase: str) -> float | None:
+        """返回指定阶段的截止时间（秒），0 或缺省表示不限时。"""
+        value = self.timeouts.get(phase)
+        return value if value and value > 0 else None
+
+    async def run(
+        self,
+        phase: str,
+        player_name: str,
+        awaitable: Awaitable[Any],
+        fallback: Any,
+        fallback_desc: str,
+    ) -> Any:
+        """执行一次玩家动作；超时或调用失败（重试耗尽、熔断等）则返回 fallback 并记录事件。
+
+        取消（CancelledError）照常抛出，不回落为默认动作。
+        """
+
+        timeout = self.timeout_for(phase)
+        try:
+            result, timed_out = await call_with_deadline(awaitable, timeout)
+        except Exception as exc:  # noqa: BLE001
+            metrics.incr("phase_failures", phase=phase)
+            if self.logger is not None:
+                self.logger.log_failure(
+                    PHASES.get(phase, phase),
+                    player_name,
+                    exc,
+                    fallback_desc,
+                )
+            return fallback
+        if not timed_out:
+            return result
+
+        metrics.incr("phase_timeouts", phase=phase)
+        if self.logger is not None:
+            self.logger.log_timeout(
+                PHASES.get(phase, phase),
+                player_name,
+                timeout or 0.0,
+                fallback_desc,
+            )
+        return fallback
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""一次性上下文：只在本次调用中发送给模型、不写入智能体长期记忆的附加文本。
+
+ReActAgent 会把收到的提示消息原样存入记忆，之后每次调用都重新发送。
+若把印象/经验/投票记录等上下文直接拼进提示，这些文本会在记忆中逐轮累积，
+提示长度随对局近似二次增长。这里把上下文放在消息的 metadata 中，
+调用期间临时拼接到 content，调用结束后立即还原，记忆中只保留原始提示。
+"""
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from agentscope.message import Msg
+
+
+EPHEMERAL_KEY = "_ephemeral_context"
+
+
+def with_ephemeral_context(prompt: Msg, context: str | None) -> Msg:
+    """复制提示消息，并把 context 标记为一次性上下文。"""
+
+    metadata = dict(getattr(prompt, "metadata", None) or {})
+    if context:
+        metadata[EPHEMERAL_KEY] = context
+    return Msg(prompt.name, prompt.content, role=prompt.role, metadata=metadata or None)
+
+
+def _ephemeral_text(msg: Any) -> str:
+    metadata = getattr(msg, "metadata", None)
+    if isinstance(metadata, dict):
+        return metadata.get(EPHEMERAL_KEY) or ""
+    return ""
+
+
+@asynccontextmanager
+async def ephemeral_context(msg: Msg | None) -> AsyncIterator[None]:
+    """调用期间把一次性上下文拼入 content，退出时还原（记忆中保存的是同一对象）。"""
+
+    context = _ephemeral_text(msg)
+    if not context:
+        yield
+        return
+
+    original = msg.content
+    msg.content = f"{original}\n\n{context}"
+    try:
+        yield
+    finally:
+        msg.content = original
+        msg.metadata.pop(EPHEMERAL_KEY, None)
+
+
+def _text_len(msg: Any) -> int:
+    content = getattr(msg, "content", "")
+    if isinstance(content, str):
+        return len(content)
+    return len(str(content))
+
+
+def prompt_chars(agent: Any, prompt: Msg | None) -> int:
+    """估算本次调用发送给模型的字符数：系统提示 + 记忆 + 提示（含一次性上下文）。"""
+
+    total = len(getattr(agent, "sys_prompt", "") or "")
+    memory = getattr(agent, "memory", None)
+    # TranscriptMemory 的 content 只含私有消息，完整视图由 messages() 合并
+    messages = getattr(memory, "messages", None)
+    content = messages() if callable(messages) else getattr(memory, "content", None)
+    if isinstance(content, list):
+        for item in content:
+            if item is not prompt:
+                total += _text_len(item)
+    if prompt is not None:
+        total += _text_len(prompt)
+        context = _ephemeral_text(prompt)
+        if context:
+            total += len(context) + 2
+    return total
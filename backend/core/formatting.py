@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""增量格式化：缓存已格式化的记忆前缀，每次调用只格式化新增的消息。
+
+agentscope 的多智能体格式化器每次调用都会深拷贝并重新格式化整段记忆，
+而玩家记忆在整局游戏中持续增长。多智能体格式化器的输出由若干“消息组”
+（连续的普通消息 / 连续的工具调用消息）依次拼接而成，且每组的格式化结果
+只取决于组内消息以及它是否为第一个普通消息组；因此只要前缀消息未变，
+已闭合的消息组即可直接复用，只需重新格式化最后一组及之后的新消息。
+"""
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+from agentscope.formatter import FormatterBase
+from agentscope.message import Msg
+
+from core.metrics import metrics
+
+
+def _fingerprint(msg: Msg) -> Hashable:
+    """消息指纹：格式化结果只取决于 name/role/content，三者任一变化即缓存失效。
+
+    不使用消息 id：ReActAgent 每次推理都会新建系统提示消息，id 不同但内容相同。
+    """
+
+    content = msg.content
+    key = content if isinstance(content, str) else repr(content)
+    # str 的哈希值会缓存在对象上，长记忆重复计算指纹的开销很小
+    return (msg.name, msg.role, hash(key))
+
+
+@dataclass
+class _Group:
+    """一个已格式化的消息组，覆盖输入消息的 [start, end) 区间。"""
+
+    start: int
+    end: int
+    kind: str  # system / agent_message / tool_sequence
+    formatted: list[dict[str, Any]] = field(default_factory=list)
+
+
+class IncrementalFormatter(FormatterBase):
+    """多智能体格式化器的增量缓存包装。
+
+    每个智能体持有独立的格式化器实例，因此缓存天然按智能体隔离。
+    以下情况退回到完整格式化（结果与原格式化器一致）：
+
+    - 内部格式化器配置了 token 截断（截断会改变前缀）；
+    - 记忆被编辑（删除、替换或改写了已缓存的消息）：从第一条变化的消息起重建。
+    """
+
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self._fingerprints: list[Hashable] = []
+        self._groups: list[_Group] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # support_tools_api 等能力声明沿用内部格式化器
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def reset(self) -> None:
+        """清空缓存。"""
+        self._fingerprints = []
+        self._groups = []
+
+    async def format(self, msgs: list[Msg], **kwargs: Any) -> list[dict[str, Any]]:
+        if getattr(self.inner, "max_tokens", None) is not None:
+            return await self.inner.format(msgs, **kwargs)
+
+        self.assert_list_of_msgs(msgs)
+        fingerprints = [_fingerprint(msg) for msg in msgs]
+
+        common = 0
+        limit = min(len(fingerprints), len(self._fingerprints))
+        while common < limit and fingerprints[common] == self._fingerprints[common]:
+            common += 1
+
+        # 只复用“已闭合”的组：组后的第一条消息也在公共前缀内，说明分组边界不变
+        kept: list[_Group] = []
+        for group in self._groups:
+            if group.kind == "system" and common >= group.end:
+                kept.append(group)
+            elif group.end < common:
+                kept.append(group)
+            else:
+                break
+
+        if self._groups:
+            metrics.incr("formatter_cache_reused_msgs", kept[-1].end if kept else 0)
+            if common < len(self._fingerprints):
+                metrics.incr("formatter_cache_rebuilds")
+
+        start = kept[-1].end if kept else 0
+        is_first_agent_message = not any(g.kind == "agent_message" for g in kept)
+        tail = deepcopy(msgs[start:])
+        groups = list(kept)
+
+        if start == 0 and tail and tail[0].role == "system":
+            groups.append(
+                _Group(0, 1, "system", [await self.inner._format_system_message(tail[0])]),
+            )
+            tail = tail[1:]
+            start = 1
+
+        async for kind, group_msgs in self.inner._group_messages(tail):
+            end = start + len(group_msgs)
+            if kind == "tool_sequence":
+                formatted = await self.inner._format_tool_sequence(group_msgs)
+            else:
+                formatted = await self.inner._format_agent_message(
+                    group_msgs,
+                    is_first_agent_message,
+                )
+                is_first_agent_message = False
+            groups.append(_Group(start, end, kind, formatted))
+            start = end
+
+        self._fingerprints = fingerprints
+        self._groups = groups
+        metrics.incr("formatter_calls")
+
+        # 浅拷贝顶层字典，避免模型端改写 content 时污染缓存
+        return [dict(item) for group in groups for item in group.formatted]
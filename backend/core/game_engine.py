@@ -8,19 +8,45 @@ from datetime import datetime
 from agentscope.message._message_base import Msg
 import numpy as np
 
-from config import config
+from config import config, with_config_scope
 from core.utils import (
     majority_vote,
     names_to_str,
     EchoAgent,
-    MAX_GAME_ROUND,
-    MAX_DISCUSSION_ROUND,
     Players,
     is_abstain_vote,
     Prompts,
 )
 from core.knowledge_base import PlayerKnowledgeStore
 from core.game_logger import GameLogger
+from core.budget import (
+    STAGE_MEASURES,
+    GameBudget,
+    bind_budget,
+    current_budget,
+    unbind_budget,
+)
+from core.ephemeral import with_ephemeral_context
+from core.memprofile import MemoryProfiler, describe_sample
+from core.metrics import PhaseClock, metrics
+from core.rules import build_role_list, hunter_can_shoot
+from core.scenario import Scenario
+from core.scheduler import (
+    CallContext,
+    bind_call_context,
+    scheduler,
+    unbind_call_context,
+)
+from prompts.role_prompts import RolePrompts
+from core.bots import is_bot
+from core.deadlines import PHASES, PhaseDeadlines, timeout_speech_msg
+from core.transcript import PublicHub, PublicTranscript, TranscriptMemory
+from core.speculation import (
+    SpeculationStats,
+    SpeculativeDraft,
+    resolve_draft,
+    start_draft,
+)
 from models.schemas import (
     DiscussionModel,
     get_vote_model,
@@ -37,6 +63,7 @@ from models.roles import (
 )
 
 from agentscope.agent import ReActAgent
+from agentscope.memory import InMemoryMemory
 from agentscope.pipeline import MsgHub
 
 
@@ -53,6 +80,11 @@ def _format_impression_context(
 ) -> str:
     """为当前玩家构建私有上下文以供使用。"""
 
+    # 预算进入精简阶段后缩短发言/投票记录与经验文本
+    budget = current_budget()
+    compact = budget is not None and budget.reached("compact_context")
+    max_votes = 4 if compact else 8
+
     impressions = players.get_impressions(player_name, alive_only=True)
     impression_lines = [f"{name}: {imp}" for name, imp in impressions.items()]
 
@@ -72,7 +104,12 @@ def _format_impression_context(
         if seg:
             record_lines.append(seg)
 
+    if compact:
+        record_lines = record_lines[-12:]
+
     knowledge = players.get_knowledge(player_name)
+    if compact and len(knowledge) > 300:
+        knowledge = knowledge[:300] + "…"
 
     # 仅向狼人提供的队友身份确认，避免出现“如果是狼人”等不确定描述
     wolf_team_lines: list[str] = []
@@ -83,7 +120,7 @@ def _format_impression_context(
 
     recent_votes = [
         f"第{item.get('round')}轮{item.get('phase')}: {item.get('voter')} -> {item.get('target') or '弃权/无效'}"
-        for item in vote_history[-8:]
+        for item in vote_history[-max_votes:]
     ]
 
     parts = [
@@ -101,7 +138,7 @@ def _format_impression_context(
         ),
         "本轮公开发言与动作:",
         "\n".join(record_lines) if record_lines else "(当前尚无公开发言)",
-        "历史公开投票记录 (最多显示近8条):",
+        f"历史公开投票记录 (最多显示近{max_votes}条):",
         "\n".join(recent_votes) if recent_votes else "(暂无记录)",
         "注意: 你的思考过程 thought 不会被其他玩家看到。",
     ]
@@ -109,8 +146,8 @@ def _format_impression_context(
 
 
 def _attach_context(prompt: Msg, context: str) -> Msg:
-    """创建一个带有附加上下文的主持人消息。"""
-    return Msg(prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
+    """创建一个带有一次性上下文的主持人消息（上下文不会留在玩家记忆中）。"""
+    return with_ephemeral_context(prompt, context)
 
 
 def _strip_dsml_payload(text: str, field: str | None = None) -> str:
@@ -210,9 +247,11 @@ async def _process_last_words(
     hub: MsgHub,
     logger: GameLogger,
     moderator_agent: EchoAgent,
+    deadlines: PhaseDeadlines | None = None,
 ) -> None:
     """让具备资格的出局玩家依次发表遗言。"""
 
+    deadlines = deadlines or PhaseDeadlines({})
     seen: set[str] = set()
     for name in player_names:
         if not name or name in seen:
@@ -238,8 +277,12 @@ async def _process_last_words(
         )
 
         logger.log_agent_typing(name, "发表遗言")
-        last_msg = await role_obj.leave_last_words(
-            _attach_context(prompt_msg, context),
+        last_msg = await deadlines.run(
+            "last_words",
+            name,
+            role_obj.leave_last_words(_attach_context(prompt_msg, context)),
+            timeout_speech_msg(name),
+            "以“(超时未发言)”代替遗言",
         )
         speech, behavior, thought, content_raw = _extract_msg_fields(last_msg)
         logger.log_message_detail(
@@ -271,8 +314,12 @@ async def _reflection_phase(
     logger: GameLogger,
     knowledge_store: PlayerKnowledgeStore,
     stop_event: Any | None = None,
+    deadlines: PhaseDeadlines | None = None,
+    skip_knowledge: bool = False,
 ) -> None:
-    """让每位存活玩家在回合结束后更新印象。"""
+    """让每位存活玩家在回合结束后更新印象（skip_knowledge 时不更新经验库）。"""
+
+    deadlines = deadlines or PhaseDeadlines({})
 
     def _check_stop_local() -> None:
         """检查是否收到终止信号。"""
@@ -303,29 +350,47 @@ async def _reflection_phase(
             "只填写需要更新的玩家，未提及的保持不变。思考过程 thought 仅自己可见。"
             f"{' 你作为狼人，清楚知道所有狼人队友（含已出局）。' if getattr(role_obj, 'role_name', '') == 'werewolf' else ''}",
         )
-        msg_reflect = await role_obj.agent(
+        msg_reflect = await role_obj.ask(
             _attach_context(prompt, context),
             structured_model=ReflectionModel,
         )
 
-        knowledge_prompt = await moderator_agent(
-            f"[{role_obj.name} ONLY] 在不泄露本局具体发言/投票细节的前提下，总结可复用的游戏理解。"
-            "输出到 knowledge 字段，它会被保存为你的专属经验库并在未来行动时提供给你。",
-        )
-        msg_knowledge = await role_obj.agent(
-            _attach_context(knowledge_prompt, context),
-            structured_model=KnowledgeUpdateModel,
-        )
+        if skip_knowledge:
+            knowledge = players.get_knowledge(role_obj.name)
+        else:
+            knowledge_prompt = await moderator_agent(
+                f"[{role_obj.name} ONLY] 在不泄露本局具体发言/投票细节的前提下，总结可复用的游戏理解。"
+                "输出到 knowledge 字段，它会被保存为你的专属经验库并在未来行动时提供给你。",
+            )
+            msg_knowledge = await role_obj.ask(
+                _attach_context(knowledge_prompt, context),
+                structured_model=KnowledgeUpdateModel,
+            )
+            knowledge = msg_knowledge.metadata.get("knowledge", "")
 
         return {
             "role": role_obj,
             "updates": msg_reflect.metadata.get("impression_updates") or {},
             "thought": msg_reflect.metadata.get("thought", ""),
-            "knowledge": msg_knowledge.metadata.get("knowledge", ""),
+            "knowledge": knowledge,
         }
 
+    async def _guarded_reflection_task(role_obj: Any) -> dict[str, Any]:
+        return await deadlines.run(
+            "reflection",
+            role_obj.name,
+            _run_reflection_task(role_obj),
+            {
+                "role": role_obj,
+                "updates": {},
+                "thought": "",
+                "knowledge": players.get_knowledge(role_obj.name),
+            },
+            "保持原有印象与经验",
+        )
+
     reflection_results = await asyncio.gather(
-        *(_run_reflection_task(role) for role in players.current_alive),
+        *(_guarded_reflection_task(role) for role in players.current_alive),
     )
 
     for res in reflection_results:
@@ -345,6 +410,38 @@ async def _reflection_phase(
     knowledge_store.save()
 
 
+def _switch_to_fallback_model(players: Players, model_name: str | None) -> str:
+    """预算降级：把所有 LLM 玩家的模型名切换为低价模型，返回日志说明。"""
+
+    if not model_name:
+        return "未设置 BUDGET_FALLBACK_MODEL，保持原模型"
+    switched = 0
+    for role in players.all_roles:
+        model = getattr(role.agent, "model", None)
+        if model is not None and hasattr(model, "model_name"):
+            model.model_name = model_name
+            switched += 1
+    return f"{switched} 名玩家切换为 {model_name}"
+
+
+def _schema_savings_summary(players: Players) -> str:
+    """精简 schema 模式的节省统计（字段说明写入角色指令后随记忆发送，需从节省中扣除）。"""
+
+    calls = sum(role.schema_calls for role in players.all_roles)
+    if not calls:
+        return "精简 schema：本局没有发往模型的结构化调用"
+    per_call = sum(role.schema_chars_saved for role in players.all_roles) / calls
+    guide = len(RolePrompts.schema_guide)
+    chars_per_token = config.budget_chars_per_token
+    return (
+        f"精简 schema：{calls} 次结构化调用，schema 平均每次减少 {per_call:.0f} 字符"
+        f"（约 {per_call / chars_per_token:.0f} tokens）；角色指令中的字段说明 {guide} 字符，"
+        f"扣除后每次净节省约 {(per_call - guide) / chars_per_token:.0f} tokens"
+    )
+
+
+# 未绑定配置快照时（如 CLI 直接调用）为本局取一份，保证对局内配置不变
+@with_config_scope
 async def werewolves_game(
     agents: list[ReActAgent],
     knowledge_store: PlayerKnowledgeStore | None = None,
@@ -352,17 +449,28 @@ async def werewolves_game(
     game_id: str | None = None,
     event_sink: Any | None = None,
     stop_event: Any | None = None,
+    scenario: Scenario | None = None,
+    priority: str | None = None,
 ) -> tuple[str, str]:
     """狼人杀游戏的主入口
 
     Args:
         agents (`list[ReActAgent]`):
-            9个智能体的列表。
+            智能体列表，人数需与角色配置（PLAYER_COUNT / ROLE_COMPOSITION）一致。
+        scenario (`Scenario | None`):
+            起始场景；给定时按场景分配身份、恢复局面，并从场景的起始回合开始。
+        priority (`str | None`):
+            模型调用的调度优先级（interactive/batch/analysis），默认 GAME_PRIORITY。
 
     Returns:
         tuple[str, str]: (log_file_path, experience_file_path)
     """
-    assert len(agents) == 9, "The werewolf game needs exactly 9 players."
+    composition = config.role_composition
+    if len(agents) != sum(composition.values()):
+        raise ValueError(
+            f"玩家人数 {len(agents)} 与角色配置 {composition} 不一致")
+    if scenario is not None:
+        scenario.validate([agent.name for agent in agents], composition)
 
     # 知识库初始化：首次加载，以确保后续回合/局可以复用经验
     knowledge_store = knowledge_store or PlayerKnowledgeStore(
@@ -374,6 +482,10 @@ async def werewolves_game(
     # 初始化游戏日志
     gid = game_id or datetime.now().strftime("%Y%m%d_%H%M%S")
     logger = GameLogger(gid, event_sink=event_sink)
+    deadlines = PhaseDeadlines(
+        {phase: config.get_phase_timeout(phase) for phase in PHASES},
+        logger,
+    )
 
     # 记录可公开的投票历史，供后续回合参考
     vote_history: list[dict[str, Any]] = []
@@ -381,18 +493,30 @@ async def werewolves_game(
     # 初始化玩家状态
     players = Players()
 
+    # 公开广播写入每局共享的公开记录，玩家记忆只保存私有消息
+    transcript = PublicTranscript() if config.shared_transcript else None
+    if transcript is not None:
+        for agent in agents:
+            if isinstance(getattr(agent, "memory", None), InMemoryMemory):
+                TranscriptMemory.replace(agent, transcript)
+
     # 广播游戏开始消息
-    async with MsgHub(participants=agents) as greeting_hub:
+    async with PublicHub(transcript, agents) as greeting_hub:
         await greeting_hub.broadcast(
             await moderator(
                 Prompts.to_all_new_game.format(names_to_str(agents)),
             ),
         )
 
-    # 给智能体分配角色
-    roles = ["werewolf"] * 3 + ["villager"] * 3 + ["seer", "witch", "hunter"]
-    np.random.shuffle(agents)
-    np.random.shuffle(roles)
+    # 给智能体分配角色（场景开局时按场景的座位顺序与身份）
+    if scenario is not None:
+        by_name = {agent.name: agent for agent in agents}
+        agents[:] = [by_name[name] for name in scenario.roles]
+        roles = list(scenario.roles.values())
+    else:
+        roles = build_role_list(composition)
+        np.random.shuffle(agents)
+        np.random.shuffle(roles)
 
     for agent, role_name in zip(agents, roles):
         # 创建角色对象
@@ -423,8 +547,78 @@ async def werewolves_game(
     players_info = [(name, role)
                     for name, role in players.name_to_role.items()]
     logger.log_players(players_info, model_map=player_model_map)
+    logger.log_action("对局规模", config.game_profile_summary())
+    if config.overrides:
+        logger.log_action("配置覆盖", config.describe_overrides())
+    knowledge_store.set_game_profile(config.game_profile_settings())
+
+    start_round = 1
+    if scenario is not None and scenario.fresh:
+        # 只固定身份分配的开局（如锦标赛轮换座位），无需回顾
+        logger.log_announcement(scenario.describe())
+    elif scenario is not None:
+        scenario.apply(players, vote_history)
+        if players.check_winning():
+            raise ValueError(f"场景 {scenario.name} 的局面已分出胜负")
+        start_round = scenario.round
+        logger.log_announcement(scenario.describe())
+        async with PublicHub(transcript, agents) as recap_hub:
+            await recap_hub.broadcast(await moderator(scenario.public_recap()))
+        for role_obj in players.all_roles:
+            note = scenario.private_note(role_obj.role_name)
+            if note and role_obj.is_alive:
+                await role_obj.agent.observe(
+                    await moderator(f"[{role_obj.name} ONLY] {note}"),
+                )
 
     game_status = "正常结束"
+    speculative_discussion = config.speculative_discussion
+    wolf_discussion_mode = config.wolf_discussion_mode
+    reflection_interval = config.reflection_interval
+    speculation_stats = SpeculationStats()
+    profiler = None
+    if config.memory_profile:
+        profiler = MemoryProfiler(
+            gid,
+            agents,
+            top=config.memory_profile_top,
+            on_sample=lambda sample: logger.log_action("内存", describe_sample(sample)),
+        )
+        if transcript is not None:
+            profiler.track("public_transcript", lambda: transcript)
+        profiler.sample("开局")
+    phase_clock = PhaseClock(
+        on_enter=profiler.sample if profiler is not None else None,
+        players=len(agents),
+    )
+
+    def _on_budget_stage(stage: str) -> None:
+        measure = STAGE_MEASURES.get(stage, "")
+        if stage == "cheap_model":
+            measure = _switch_to_fallback_model(
+                players, config.budget_fallback_model)
+        snapshot = budget.snapshot()
+        metrics.set_gauge("game_budget", snapshot, game=gid)
+        logger.log_budget(snapshot, measure)
+
+    budget = GameBudget.from_config(on_stage_change=_on_budget_stage)
+    budget_token = bind_budget(budget)
+    call_ctx = CallContext(
+        gid,
+        priority=priority or config.game_priority,
+        weight=config.game_scheduler_weight,
+    )
+    call_ctx_token = bind_call_context(call_ctx)
+
+    def _budget_exhausted() -> bool:
+        """预算耗尽时记录一次公告，调用方在阶段边界结束对局。"""
+        nonlocal game_status
+        if not budget.exhausted:
+            return False
+        if game_status != "预算耗尽":
+            game_status = "预算耗尽"
+            logger.log_announcement("本局预算耗尽，游戏提前结束")
+        return True
 
     def _check_stop() -> None:
         """检查是否收到终止信号，若收到则抛出 CancelledError 以中断游戏。"""
@@ -444,21 +638,26 @@ async def werewolves_game(
 
     try:
         # 游戏开始！
-        for round_num in range(1, MAX_GAME_ROUND + 1):
+        for round_num in range(start_round, config.max_game_round + 1):
             _check_stop()
+            if _budget_exhausted():
+                break
             is_first_night = round_num == 1
             round_public_records: list[dict[str, Any]] = []
+            round_prompt_start = sum(r.prompt_chars for r in players.all_roles)
             # 开始新回合
             logger.start_round(round_num)
             # 为所有玩家创建 MsgHub 以广播消息
             alive_agents = [role.agent for role in players.current_alive]
-            async with MsgHub(
+            async with PublicHub(
+                transcript,
                 participants=alive_agents,
                 enable_auto_broadcast=False,  # 仅手动广播
                 name="alive_players",
             ) as alive_players_hub:
                 # 夜晚阶段
                 logger.start_night()
+                phase_clock.enter("夜晚")
                 _check_stop()
                 await alive_players_hub.broadcast(
                     await moderator(Prompts.to_all_night),
@@ -478,11 +677,8 @@ async def werewolves_game(
                     ),
                     name="werewolves",
                 ) as werewolves_hub:
-                    # 讨论
-                    n_werewolves = len(players.werewolves)
-                    for _ in range(1, MAX_DISCUSSION_ROUND * n_werewolves + 1):
+                    async def _wolf_discuss(werewolf: Werewolf, text: str) -> Msg:
                         _check_stop()
-                        werewolf = players.werewolves[_ % n_werewolves]
                         context = _format_impression_context(
                             werewolf.name,
                             players,
@@ -491,18 +687,19 @@ async def werewolves_game(
                             round_num,
                             "夜晚讨论",
                         )
-
                         logger.log_agent_typing(werewolf.name, "夜晚讨论")
-                        res = await werewolf.discuss_with_team(
-                            _attach_context(
-                                await moderator(
-                                    f"""当前处于夜晚狼人讨论阶段（狼人讨论第{_}轮）。
-                                    狼人讨论结束后，是女巫做出决策阶段和预言家预言，之后才会结束夜晚阶段并公布夜间信息。
-                                    """,
-                                ),
-                                context,
+                        return await deadlines.run(
+                            "wolf_discussion",
+                            werewolf.name,
+                            werewolf.discuss_with_team(
+                                _attach_context(await moderator(text), context),
                             ),
+                            timeout_speech_msg(
+                                werewolf.name, reach_agreement=False),
+                            "以“(超时未发言)”代替发言",
                         )
+
+                    async def _publish_wolf_msg(werewolf: Werewolf, res: Msg) -> None:
                         # 记录狼人讨论
                         speech, behavior, thought, content_raw = _extract_msg_fields(
                             res)
@@ -528,17 +725,81 @@ async def werewolves_game(
                             behavior=behavior,
                             thought=thought,
                         )
-                        if _ % n_werewolves == 0 and res.metadata.get(
-                            "reach_agreement",
+
+                    # 讨论
+                    n_werewolves = len(players.werewolves)
+                    if wolf_discussion_mode == "parallel":
+                        # 第一轮：所有狼人同时提出提案，彼此不可见
+                        proposals = await asyncio.gather(
+                            *(
+                                _wolf_discuss(
+                                    werewolf,
+                                    """当前处于夜晚狼人讨论阶段（提案轮）。
+                                    请直接提出你今晚想淘汰的目标及理由，队友会在同一时间各自提案。
+                                    狼人讨论结束后，是女巫做出决策阶段和预言家预言，之后才会结束夜晚阶段并公布夜间信息。
+                                    """,
+                                )
+                                for werewolf in players.werewolves
+                            ),
+                        )
+                        # 按座位顺序广播，保证日志与记忆顺序确定
+                        for werewolf, res in zip(players.werewolves, proposals):
+                            await _publish_wolf_msg(werewolf, res)
+
+                        # 第二轮：每名狼人看到全部提案后同时确认或提出异议
+                        if (
+                            n_werewolves > 1
+                            and config.max_discussion_round > 1
+                            and not budget.reached("short_discussion")
                         ):
-                            break
+                            confirmations = await asyncio.gather(
+                                *(
+                                    _wolf_discuss(
+                                        werewolf,
+                                        """当前处于夜晚狼人讨论阶段（确认轮）。
+                                        你已看到所有队友的提案。若同意某个目标，请说明目标并将 `reach_agreement` 设为 True；
+                                        若有异议，请简要说明并将 `reach_agreement` 设为 False。随后将直接进入狼人投票。
+                                        """,
+                                    )
+                                    for werewolf in players.werewolves
+                                ),
+                            )
+                            for werewolf, res in zip(players.werewolves, confirmations):
+                                await _publish_wolf_msg(werewolf, res)
+                            agreed = sum(
+                                1 for res in confirmations
+                                if (res.metadata or {}).get("reach_agreement")
+                            )
+                            logger.log_action(
+                                "狼人讨论",
+                                f"并行讨论结束，{agreed}/{n_werewolves} 名狼人确认目标",
+                            )
+                    else:
+                        discussion_rounds = (
+                            1 if budget.reached("short_discussion")
+                            else config.max_discussion_round
+                        )
+                        for _ in range(1, discussion_rounds * n_werewolves + 1):
+                            werewolf = players.werewolves[_ % n_werewolves]
+                            res = await _wolf_discuss(
+                                werewolf,
+                                f"""当前处于夜晚狼人讨论阶段（狼人讨论第{_}轮）。
+                                狼人讨论结束后，是女巫做出决策阶段和预言家预言，之后才会结束夜晚阶段并公布夜间信息。
+                                """,
+                            )
+                            await _publish_wolf_msg(werewolf, res)
+                            if _ % n_werewolves == 0 and res.metadata.get(
+                                "reach_agreement",
+                            ):
+                                break
 
                 # 狼人投票
                 # 禁用自动广播以避免跟票
                 werewolves_hub.set_auto_broadcast(False)
                 vote_prompt = await moderator(content=Prompts.to_wolves_vote)
                 wolf_votes_for_majority: list[str | None] = []
-                for werewolf in players.werewolves:
+
+                async def _wolf_vote_task(werewolf: Werewolf) -> tuple[Werewolf, Msg | None]:
                     _check_stop()
                     context = _format_impression_context(
                         werewolf.name,
@@ -549,10 +810,24 @@ async def werewolves_game(
                         "夜晚投票",
                     )
                     logger.log_agent_typing(werewolf.name, "夜晚投票")
-                    msg = await werewolf.team_vote(
-                        _attach_context(vote_prompt, context),
-                        players.current_alive,
+                    msg = await deadlines.run(
+                        "wolf_vote",
+                        werewolf.name,
+                        werewolf.team_vote(
+                            _attach_context(vote_prompt, context),
+                            players.current_alive,
+                        ),
+                        None,
+                        "计为空票",
                     )
+                    return werewolf, msg
+
+                # 自动广播已关闭，狼人之间互不可见投票，可并行发起；按座位顺序记录结果
+                wolf_vote_results = await asyncio.gather(
+                    *(_wolf_vote_task(werewolf) for werewolf in players.werewolves),
+                )
+
+                for werewolf, msg in wolf_vote_results:
                     if not msg:
                         wolf_votes_for_majority.append(None)
                         logger.log_message_detail(
@@ -636,7 +911,13 @@ async def werewolves_game(
                 }
 
                 logger.log_agent_typing(witch.name, "女巫行动")
-                result = await witch.night_action(game_state)
+                result = await deadlines.run(
+                    "witch",
+                    witch.name,
+                    witch.night_action(game_state),
+                    {},
+                    "本夜不使用药水",
+                )
 
                 # 记录女巫“解药”阶段的结构化输出
                 r_speech = result.get("resurrect_speech")
@@ -675,7 +956,8 @@ async def werewolves_game(
             # 夜晚若有猎人被狼刀（且未被毒/未被解药救活），记录到候选列表
             night_hunter_candidates: list[Hunter] = [
                 hunter for hunter in players.hunter
-                if killed_player == hunter.name and poisoned_player != hunter.name
+                if hunter_can_shoot(
+                    killed_player == hunter.name, False, poisoned_player == hunter.name)
             ]
 
             # 预言家回合
@@ -699,7 +981,13 @@ async def werewolves_game(
                 }
 
                 logger.log_agent_typing(seer.name, "预言家行动")
-                result = await seer.night_action(game_state)
+                result = await deadlines.run(
+                    "seer",
+                    seer.name,
+                    seer.night_action(game_state),
+                    {},
+                    "本夜不查验",
+                )
 
                 # 记录预言家行动的结构化输出（心声/表现/发言）
                 logger.log_message_detail(
@@ -720,6 +1008,7 @@ async def werewolves_game(
 
             # 白天阶段
             logger.start_day()
+            phase_clock.enter("白天公告")
 
             # 天亮后、公布夜间淘汰前，处理夜晚被狼人击杀的猎人开枪（仅狼刀且未被毒）
             night_hunter_shots: list[str] = []
@@ -741,10 +1030,12 @@ async def werewolves_game(
                         "猎人开枪",
                     )
                     logger.log_agent_typing(hunter.name, "猎人开枪")
-                    shoot_res = await hunter.shoot(
-                        alive_for_hunter,
-                        moderator,
-                        context,
+                    shoot_res = await deadlines.run(
+                        "hunter",
+                        hunter.name,
+                        hunter.shoot(alive_for_hunter, moderator, context),
+                        None,
+                        "放弃开枪",
                     )
                     if not shoot_res:
                         continue
@@ -804,6 +1095,7 @@ async def werewolves_game(
                         alive_players_hub,
                         logger,
                         moderator,
+                        deadlines,
                     )
 
             else:
@@ -821,6 +1113,9 @@ async def werewolves_game(
 
             # 讨论
             _check_stop()
+            if _budget_exhausted():
+                break
+            phase_clock.enter("白天讨论")
             await alive_players_hub.broadcast(
                 await moderator(
                     Prompts.to_all_discuss.format(
@@ -832,47 +1127,99 @@ async def werewolves_game(
             current_alive_agents = [
                 role.agent for role in players.current_alive]
 
-            # 使用 sequential_pipeline 进行讨论，并记录每个玩家的发言
-            discussion_msgs = []
-            for role in players.current_alive:
-                _check_stop()
+            async def _generate_speech(role_obj: Any) -> Msg:
                 context = _format_impression_context(
-                    role.name,
+                    role_obj.name,
                     players,
                     vote_history,
                     round_public_records,
                     round_num,
                     "白天讨论",
                 )
-                logger.log_agent_typing(role.name, "白天讨论")
-                msg = await role.day_discussion(
+                return await role_obj.day_discussion(
                     _attach_context(await moderator(""), context),
                 )
-                speech, behavior, thought, content_raw = _extract_msg_fields(
-                    msg)
-                # 手动广播去隐私的消息，避免 thought 外泄
-                await alive_players_hub.broadcast(
-                    _make_public_msg(msg, speech, behavior, content_raw),
-                )
-                discussion_msgs.append(msg)
-                logger.log_message_detail(
-                    "白天讨论",
-                    role.name,
-                    speech=speech or content_raw,
-                    behavior=behavior,
-                    thought=thought,
-                )
-                round_public_records.append(
-                    {
-                        "player": role.name,
-                        "speech": speech or content_raw,
-                        "behavior": behavior,
-                        "phase": "白天讨论",
-                    },
+
+            def _with_speech_deadline(role_obj: Any, awaitable: Any) -> Any:
+                return deadlines.run(
+                    "day_discussion",
+                    role_obj.name,
+                    awaitable,
+                    timeout_speech_msg(role_obj.name),
+                    "以“(超时未发言)”代替发言",
                 )
 
+            async def _day_speech(role_obj: Any) -> Msg:
+                return await _with_speech_deadline(role_obj, _generate_speech(role_obj))
+
+            # 顺序发言；开启推测模式时，当前玩家发言期间提前为下一位生成草稿
+            discussion_msgs = []
+            discussion_order = list(players.current_alive)
+            round_spec_stats = SpeculationStats()
+            pending_draft: SpeculativeDraft | None = None
+            prior_speech = ""
+            try:
+                for idx, role in enumerate(discussion_order):
+                    _check_stop()
+                    logger.log_agent_typing(role.name, "白天讨论")
+                    draft, pending_draft = pending_draft, None
+                    # 机器人即时作答，无需提前生成草稿
+                    if (
+                        speculative_discussion
+                        and idx + 1 < len(discussion_order)
+                        and not is_bot(discussion_order[idx + 1].agent)
+                    ):
+                        # 草稿不计截止时间，轮到该玩家时再从头计时
+                        pending_draft = await start_draft(
+                            discussion_order[idx + 1],
+                            lambda r=discussion_order[idx + 1]: _generate_speech(r),
+                        )
+                    if draft is not None:
+                        msg = await resolve_draft(
+                            draft,
+                            prior_speech,
+                            round_spec_stats,
+                            lambda r=role: _day_speech(r),
+                            lambda task, r=role: _with_speech_deadline(r, task),
+                        )
+                    else:
+                        msg = await _day_speech(role)
+                    speech, behavior, thought, content_raw = _extract_msg_fields(
+                        msg)
+                    # 手动广播去隐私的消息，避免 thought 外泄
+                    public_msg = _make_public_msg(
+                        msg, speech, behavior, content_raw)
+                    await alive_players_hub.broadcast(public_msg)
+                    if pending_draft is not None:
+                        pending_draft.observe(public_msg)
+                    prior_speech = speech or content_raw
+                    discussion_msgs.append(msg)
+                    logger.log_message_detail(
+                        "白天讨论",
+                        role.name,
+                        speech=speech or content_raw,
+                        behavior=behavior,
+                        thought=thought,
+                    )
+                    round_public_records.append(
+                        {
+                            "player": role.name,
+                            "speech": speech or content_raw,
+                            "behavior": behavior,
+                            "phase": "白天讨论",
+                        },
+                    )
+            finally:
+                if pending_draft is not None:
+                    await pending_draft.cancel()
+
+            if round_spec_stats.attempts:
+                speculation_stats.merge(round_spec_stats)
+                logger.log_action("推测发言", round_spec_stats.summary())
+
             # 投票
             _check_stop()
+            phase_clock.enter("投票")
             vote_prompt = await moderator(
                 Prompts.to_all_vote.format(
                     names_to_str(players.current_alive),
@@ -893,9 +1240,15 @@ async def werewolves_game(
                     "白天投票",
                 )
                 logger.log_agent_typing(role_obj.name, "投票思考中")
-                msg = await role_obj.vote(
-                    _attach_context(vote_prompt, context),
-                    players.current_alive,
+                msg = await deadlines.run(
+                    "day_vote",
+                    role_obj.name,
+                    role_obj.vote(
+                        _attach_context(vote_prompt, context),
+                        players.current_alive,
+                    ),
+                    None,
+                    "按弃权处理",
                 )
                 return role_obj, msg
 
@@ -950,7 +1303,7 @@ async def werewolves_game(
             )
             pk_round = 0
             pk_vote_records: list[dict[str, Any]] = []
-            pk_max_rounds = 3  # 安全上限，避免极端情况下无限循环
+            pk_max_rounds = config.max_pk_round  # 安全上限，避免极端情况下无限循环
 
             while top_candidates and len(top_candidates) > 1:
                 pk_round += 1
@@ -980,8 +1333,14 @@ async def werewolves_game(
                         f"PK发言#{pk_round}",
                     )
                     logger.log_agent_typing(candidate_name, f"PK发言#{pk_round}")
-                    msg = await role_obj.day_discussion(
-                        _attach_context(await moderator(""), context),
+                    msg = await deadlines.run(
+                        "pk_speech",
+                        candidate_name,
+                        role_obj.day_discussion(
+                            _attach_context(await moderator(""), context),
+                        ),
+                        timeout_speech_msg(candidate_name),
+                        "以“(超时未发言)”代替发言",
                     )
                     if msg:
                         speech, behavior, thought, content_raw = _extract_msg_fields(
@@ -1031,12 +1390,18 @@ async def werewolves_game(
                         round_num,
                         f"PK投票#{pk_round}",
                     )
-                    vote_msg = await role_obj.agent(
-                        _attach_context(pk_vote_prompt, context),
-                        structured_model=get_vote_model(
-                            pk_vote_targets,
-                            allow_abstain=False,
+                    vote_msg = await deadlines.run(
+                        "pk_vote",
+                        role_obj.name,
+                        role_obj.ask(
+                            _attach_context(pk_vote_prompt, context),
+                            structured_model=get_vote_model(
+                                pk_vote_targets,
+                                allow_abstain=False,
+                            ),
                         ),
+                        None,
+                        "按弃权处理",
                     )
                     return role_obj, vote_msg
 
@@ -1183,12 +1548,13 @@ async def werewolves_game(
                     alive_players_hub,
                     logger,
                     moderator,
+                    deadlines,
                 )
 
             # 如果被投出的玩家是猎人，他可以开枪带走一人
             shot_player = None
             for hunter in players.hunter:
-                if voted_player == hunter.name:
+                if hunter_can_shoot(False, voted_player == hunter.name, False):
                     context = _format_impression_context(
                         hunter.name,
                         players,
@@ -1198,10 +1564,12 @@ async def werewolves_game(
                         "猎人开枪",
                     )
                     logger.log_agent_typing(hunter.name, "猎人开枪")
-                    shoot_res = await hunter.shoot(
-                        players.current_alive,
-                        moderator,
-                        context,
+                    shoot_res = await deadlines.run(
+                        "hunter",
+                        hunter.name,
+                        hunter.shoot(players.current_alive, moderator, context),
+                        None,
+                        "放弃开枪",
                     )
                     if not shoot_res:
                         continue
@@ -1233,18 +1601,37 @@ async def werewolves_game(
             logger.log_death("白天死亡", [p for p in dead_today if p])
             players.update_players(dead_today)
 
-            # 回合结束，存活玩家更新印象
+            # 回合结束，存活玩家更新印象（按 REFLECTION_INTERVAL 的间隔）
             _check_stop()
-            await _reflection_phase(
-                players,
-                vote_history,
-                round_public_records,
-                round_num,
-                moderator,
-                logger,
-                knowledge_store,
-                stop_event,
-            )
+            if _budget_exhausted():
+                break
+            if reflection_interval and round_num % reflection_interval == 0:
+                phase_clock.enter("回合反思")
+                await _reflection_phase(
+                    players,
+                    vote_history,
+                    round_public_records,
+                    round_num,
+                    moderator,
+                    logger,
+                    knowledge_store,
+                    stop_event,
+                    deadlines,
+                    skip_knowledge=(
+                        not config.knowledge_updates
+                        or budget.reached("skip_knowledge")
+                    ),
+                )
+                phase_clock.stop()
+
+            # 本轮发送给模型的提示规模：上下文不进入记忆后应随回合线性增长
+            round_prompt_chars = sum(
+                r.prompt_chars for r in players.all_roles) - round_prompt_start
+            metrics.observe("round_prompt_chars", round_prompt_chars)
+            metrics.set_gauge("round_prompt_chars",
+                              round_prompt_chars, game=gid, round=round_num)
+            logger.log_action(
+                "提示词规模", f"第{round_num}轮发送给模型的提示共 {round_prompt_chars} 字符")
 
             # 记录回合结束时的存活玩家名单，便于回溯局势
             logger.log_alive_players(
@@ -1256,14 +1643,17 @@ async def werewolves_game(
             res = players.check_winning()
             if res:
                 logger.log_announcement(f"游戏结束: {res}")
-                async with MsgHub(players.all_players) as all_players_hub:
+                async with PublicHub(transcript, players.all_players) as all_players_hub:
                     res_msg = await moderator(res)
                     await all_players_hub.broadcast(res_msg)
                 break
 
-        # 游戏结束，每位玩家发表感言
+        # 游戏结束，每位玩家发表感言（预算耗尽或 GAME_SUMMARY 关闭时跳过）
+        phase_clock.enter("游戏总结")
         final_prompt = await moderator(Prompts.to_all_reflect)
-        for role in players.all_roles:
+        summary_roles = (
+            players.all_roles if config.game_summary and not budget.exhausted else [])
+        for role in summary_roles:
             context = _format_impression_context(
                 role.name,
                 players,
@@ -1272,10 +1662,31 @@ async def werewolves_game(
                 round_num,
                 "游戏总结",
             )
-            await role.agent(
-                _attach_context(final_prompt, context),
+            await deadlines.run(
+                "summary",
+                role.name,
+                role.ask(_attach_context(final_prompt, context)),
+                None,
+                "跳过总结",
             )
 
+        phase_clock.stop()
+
+        if speculation_stats.attempts:
+            logger.log_action(
+                "推测发言", f"全局统计: {speculation_stats.summary()}")
+        logger.log_action(
+            "阶段耗时", f"{len(agents)}人局 {phase_clock.summary()}")
+        if budget.enabled:
+            logger.log_action("预算", budget.summary())
+        if config.compact_schema:
+            logger.log_action("结构化输出", _schema_savings_summary(players))
+        if call_ctx.calls:
+            logger.log_action("模型调度", call_ctx.summary())
+        if profiler is not None:
+            profiler.sample("结束")
+            logger.log_action("内存", f"本局 {profiler.summary()}")
+
         # 持久化本局累计的知识
         knowledge_store.bulk_update(players.export_all_knowledge())
         knowledge_store.save()
@@ -1287,5 +1698,8 @@ async def werewolves_game(
         logger.log_announcement(f"游戏异常终止: {exc}")
         raise
     finally:
+        unbind_budget(budget_token)
+        unbind_call_context(call_ctx_token)
+        scheduler.forget_game(gid)
         # 确保日志文件关闭并标记状态
-        logger.close(status=game_status)
+        logger.close(status=game_status, winner=players.winner())
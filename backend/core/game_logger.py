@@ -32,6 +32,8 @@ class GameLogger:
         self.start_time = datetime.now()
         self.closed = False  # 是否已关闭（避免重复 close）
         self._event_sink = event_sink
+        self.timeout_count = 0  # 本局阶段超时次数
+        self.failure_count = 0  # 本局调用失败后回落的次数
 
         # 确保日志目录存在
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -149,6 +151,9 @@ class GameLogger:
         "白天死亡": "💀 白天死亡",
         "投票结果": "📊 投票结果",
         "狼人投票结果": "📊 狼人投票结果",
+        "超时": "⏱️ 超时",
+        "调用失败": "❌ 调用失败",
+        "预算": "💰 预算",
     }
 
     def _get_category_display(self, category: str) -> str:
@@ -291,6 +296,83 @@ class GameLogger:
             }
         )
 
+    def log_timeout(
+        self,
+        phase: str,
+        player_name: str,
+        timeout: float,
+        fallback: str,
+    ):
+        """记录阶段超时及其回落动作。"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        cat_display = self._get_category_display("超时")
+        content = f"{phase} 超过 {timeout:g}s 未响应，{fallback}"
+        self.timeout_count += 1
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{timestamp}] {cat_display} | {player_name} -> {content}\n\n")
+
+        self._emit(
+            {
+                "type": "timeout",
+                "category": phase,
+                "categoryDisplay": cat_display,
+                "agentName": player_name,
+                "timeout": timeout,
+                "fallback": fallback,
+                "content": f"{cat_display} {player_name}: {content}",
+            }
+        )
+
+    def log_failure(
+        self,
+        phase: str,
+        player_name: str,
+        error: BaseException,
+        fallback: str,
+    ):
+        """记录阶段内模型调用失败（重试耗尽、熔断等）及其回落动作。"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        cat_display = self._get_category_display("调用失败")
+        reason = f"{type(error).__name__}: {error}"
+        content = f"{phase} 调用失败（{reason}），{fallback}"
+        self.failure_count += 1
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{timestamp}] {cat_display} | {player_name} -> {content}\n\n")
+
+        self._emit(
+            {
+                "type": "failure",
+                "category": phase,
+                "categoryDisplay": cat_display,
+                "agentName": player_name,
+                "error": reason,
+                "fallback": fallback,
+                "content": f"{cat_display} {player_name}: {content}",
+            }
+        )
+
+    def log_budget(self, snapshot: dict[str, Any], measure: str):
+        """记录预算阶段变化及对应的降级措施。"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        cat_display = self._get_category_display("预算")
+        content = (
+            f"进入「{snapshot['stageLabel']}」阶段，已用约 "
+            f"{snapshot['usedTokens']}/{snapshot['limitTokens']} tokens，{measure}"
+        )
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(f"[{timestamp}] {cat_display} {content}\n\n")
+
+        self._emit(
+            {
+                "type": "budget",
+                "category": "预算",
+                "categoryDisplay": cat_display,
+                "measure": measure,
+                **snapshot,
+                "content": f"{cat_display} {content}",
+            }
+        )
+
     def log_death(self, phase: str, players: list[str]):
         """记录死亡信息"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -380,8 +462,8 @@ class GameLogger:
             }
         )
 
-    def close(self, status: str = "正常结束"):
-        """关闭日志文件并写入最终状态。"""
+    def close(self, status: str = "正常结束", winner: str | None = None):
+        """关闭日志文件并写入最终状态与胜方（werewolf / village，未分胜负为 None）。"""
         if self.closed:
             return
         self.closed = True
@@ -390,6 +472,18 @@ class GameLogger:
             f.write(
                 f"游戏结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"游戏状态: {status}\n")
+            f.write(f"胜方: {winner or '未分胜负'}\n")
+            if self.timeout_count:
+                f.write(f"阶段超时次数: {self.timeout_count}\n")
+            if self.failure_count:
+                f.write(f"调用失败次数: {self.failure_count}\n")
             f.write("=" * 80 + "\n")
 
-        self._emit({"type": "system", "content": f"游戏结束: {status}"})
+        self._emit(
+            {
+                "type": "system",
+                "content": f"游戏结束: {status}",
+                "status": status,
+                "winner": winner,
+            }
+        )
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""进程级 HTTP 连接池：同一端点的模型共用一个 httpx.AsyncClient。
+
+每局 9 名玩家、每个分析智能体原本各自创建模型与连接池，并发对局时
+TLS 握手与套接字反复建立/关闭。这里按 (provider, base_url, api_key) 复用客户端，
+开启 keep-alive，安装了 h2 时使用 HTTP/2，连接上限可通过 HTTP_POOL_* 调整。
+
+httpx 的连接绑定在创建它们的事件循环上，因此池按事件循环分区，循环结束前由
+aclose_clients() 关闭；没有运行中的事件循环时不使用连接池。API 服务把所有对局、
+赛后分析与启动预热放在同一个长期运行的后台事件循环中（api_server.WorkerLoop），
+因此各局之间共享同一批客户端，服务关闭时统一关闭。
+
+目前只有 OpenAI 兼容后端支持注入 HTTP 客户端；DashScope SDK 自行管理连接，
+Ollama 客户端不接受外部连接池，只透传连接上限与 HTTP/2 设置。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import threading
+import weakref
+from typing import Any
+
+import httpx
+
+from config import config
+from core.metrics import metrics
+
+
+# 与 openai SDK 默认值一致：总超时 10 分钟，连接超时 5 秒
+DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+_lock = threading.Lock()
+# 事件循环 -> {(provider, base_url, api_key): 客户端}；循环被回收后条目自动消失
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, str, str], httpx.AsyncClient]] = (
+    weakref.WeakKeyDictionary())
+
+
+def http2_available() -> bool:
+    """HTTP/2 需要可选依赖 h2（pip install h2）。"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.http_pool_max_connections,
+        max_keepalive_connections=config.http_pool_max_keepalive,
+        keepalive_expiry=config.http_pool_keepalive_expiry,
+    )
+
+
+def client_options() -> dict[str, Any]:
+    """新建 httpx 客户端（或透传给 SDK）的连接参数。"""
+    return {
+        "limits": pool_limits(),
+        "http2": config.http2 and http2_available(),
+    }
+
+
+def _key_label(key: tuple[str, str, str]) -> str:
+    provider, base_url, api_key = key
+    # 指标标签中不出现明文密钥
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else "-"
+    return f"{provider}@{base_url}#{digest}"
+
+
+def get_http_client(provider: str, base_url: str | None, api_key: str | None) -> httpx.AsyncClient | None:
+    """返回当前事件循环内该端点共享的客户端；未启用连接池或不在事件循环中时返回 None。"""
+
+    if not config.http_pool:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+    key = (provider, str(base_url or ""), str(api_key or ""))
+    with _lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is not None and not client.is_closed:
+            metrics.incr("http_pool_reused", endpoint=_key_label(key))
+            return client
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+            **client_options(),
+        )
+        clients[key] = client
+        metrics.incr("http_pool_created", endpoint=_key_label(key))
+        return client
+
+
+async def aclose_clients() -> None:
+    """关闭当前事件循环创建的所有共享客户端（事件循环结束前调用）。"""
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = list(_clients.pop(loop, {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:  # noqa: BLE001
+            continue
+
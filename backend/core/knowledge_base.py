@@ -16,12 +16,18 @@ class PlayerKnowledgeStore:
     一局的具体发言或投票细节。
     """
 
-    def __init__(self, checkpoint_dir: str, base_filename: str) -> None:
+    def __init__(
+        self,
+        checkpoint_dir: str,
+        base_filename: str,
+        session_suffix: str | None = None,
+    ) -> None:
         self.dir_path = Path(checkpoint_dir)
         self.dir_path.mkdir(parents=True, exist_ok=True)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.session_id = f"{base_filename}_{timestamp}"
+        # 同一秒内创建多个存档（如连续对局提前准备下一局）时，用对局 ID 区分文件
+        suffix = session_suffix or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.session_id = f"{base_filename}_{suffix}"
         self.file_path = self.dir_path / f"{self.session_id}.json"
 
         # 以内存为主，保存时镜像到磁盘。
@@ -70,6 +76,13 @@ class PlayerKnowledgeStore:
             name: f"({model})" for name, model in model_map.items()
         }
 
+    def set_game_profile(self, settings: Dict[str, object]) -> None:
+        """记录本局生效的对局规模预设（GAME_PROFILE 及其封顶后的设置）。"""
+
+        if not isinstance(self._data, dict):
+            self._data = {"session_id": self.session_id, "players": {}}
+        self._data["game_profile"] = dict(settings)
+
     def bulk_update(self, knowledge_map: Dict[str, str]) -> None:
         """批量替换或合并多名玩家的知识条目。"""
         for name, knowledge in knowledge_map.items():
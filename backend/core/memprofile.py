@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""按阶段采样的内存剖析：定位服务进程 RSS 在多局之间持续上涨的来源。
+
+MEMORY_PROFILE=true 时，werewolves_game 在每个阶段边界采样一次：
+- 进程 RSS（Linux 读 /proc/self/statm，其它平台退回 ru_maxrss 峰值）
+- tracemalloc 当前/峰值分配量，以及按代码行聚合的最大分配点
+- 玩家记忆（含增量格式化缓存）、共享公开记录与已注册探针（如 API 的
+  EventBus 缓冲区与各订阅队列）的估算大小
+
+采样写入对局日志与进程级历史（最近 MEMORY_PROFILE_GAMES 局），
+通过 /api/memory 查看：同一局内的增长看该局的样本序列，
+局与局之间的泄漏看各局开局样本的 RSS 与 tracemalloc 是否逐局抬高。
+大小为 sys.getsizeof 递归累加的估算值，共享对象只计一次。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from typing import Any, Callable
+
+from config import config
+from core.metrics import metrics
+
+
+_SKIP_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    asyncio.AbstractEventLoop,
+    asyncio.Future,
+    threading.Thread,
+)
+_LEAF_TYPES = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def deep_size(obj: Any, seen: set[int] | None = None, max_objects: int = 200_000) -> int:
+    """递归估算对象占用的字节数；seen 跨多次调用共享时，共享对象只计一次。
+
+    不进入类、模块、函数、事件循环与线程；asyncio.Queue 只统计排队中的元素。
+    """
+
+    seen = set() if seen is None else seen
+    stack = [obj]
+    total = 0
+    visited = 0
+    while stack and visited < max_objects:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP_TYPES):
+            continue
+        seen.add(id(item))
+        visited += 1
+        if isinstance(item, asyncio.Queue):
+            stack.append(getattr(item, "_queue", ()))
+            continue
+        total += sys.getsizeof(item, 0)
+        if isinstance(item, _LEAF_TYPES):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        attrs = getattr(item, "__dict__", None)
+        if attrs is not None:
+            stack.append(attrs)
+        for cls in type(item).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if isinstance(slot, str) and hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+def rss_bytes() -> int | None:
+    """当前进程常驻内存（字节），无法获取时返回 None。"""
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节计，Linux 以 KB 计
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mb(value: int | float | None) -> str:
+    if value is None:
+        return "?"
+    if abs(value) < 1048576:
+        return f"{value / 1024:.0f}KB"
+    return f"{value / 1048576:.1f}MB"
+
+
+# 进程级探针：名称 -> 返回估算字节数的函数（如 API 服务的 EventBus）
+_probes: dict[str, Callable[[], int]] = {}
+_probes_lock = threading.Lock()
+
+
+def register_probe(name: str, probe: Callable[[], int]) -> None:
+    with _probes_lock:
+        _probes[name] = probe
+
+
+def _run_probes(probes: dict[str, Callable[[], int]]) -> dict[str, int]:
+    sizes = {}
+    for name, probe in probes.items():
+        try:
+            sizes[name] = int(probe())
+        except Exception:  # noqa: BLE001
+            # 探针失败不影响对局
+            continue
+    return sizes
+
+
+class _History:
+    """最近若干局的采样序列，按局保存，供 API 查询。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._games: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+
+    def append(self, game_id: str, sample: dict[str, Any]) -> None:
+        with self._lock:
+            self._games.setdefault(game_id, []).append(sample)
+            self._games.move_to_end(game_id)
+            while len(self._games) > max(1, config.memory_profile_games):
+                self._games.popitem(last=False)
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        with self._lock:
+            return {gid: list(samples) for gid, samples in self._games.items()}
+
+
+history = _History()
+
+_tracing_lock = threading.Lock()
+
+
+def _ensure_tracing() -> None:
+    """开启 tracemalloc；开启后保持到进程退出，以便比较各局之间的分配量。"""
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def current_usage() -> dict[str, Any]:
+    """不依赖对局的进程级内存概况（RSS、tracemalloc 与已注册探针）。"""
+
+    usage: dict[str, Any] = {"rss": rss_bytes(), "tracing": tracemalloc.is_tracing()}
+    if tracemalloc.is_tracing():
+        usage["traced"], usage["tracedPeak"] = tracemalloc.get_traced_memory()
+    with _probes_lock:
+        probes = dict(_probes)
+    usage["probes"] = _run_probes(probes)
+    return usage
+
+
+class MemoryProfiler:
+    """单局内存剖析：在每个阶段边界调用 sample()。
+
+    Args:
+        game_id: 对局 ID（历史记录的键）
+        agents: 本局玩家智能体，估算其记忆与格式化缓存大小
+        top: 每次采样记录的最大分配点个数
+        on_sample: 采样回调（引擎用于写入对局日志）
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        agents: list[Any],
+        top: int = 5,
+        on_sample: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        self.game_id = game_id
+        self.agents = agents
+        self.top = top
+        self.on_sample = on_sample
+        self.samples: list[dict[str, Any]] = []
+        self._tracked: dict[str, Callable[[], Any]] = {}
+        self._start = time.perf_counter()
+        _ensure_tracing()
+
+    def track(self, name: str, getter: Callable[[], Any]) -> None:
+        """额外统计本局的某个对象（如共享公开记录），先于玩家记忆计算，共享部分只计一次。"""
+        self._tracked[name] = getter
+
+    def _agent_sizes(self, seen: set[int]) -> dict[str, int]:
+        sizes = {}
+        for agent in self.agents:
+            memory = getattr(agent, "memory", None)
+            formatter = getattr(agent, "formatter", None)
+            size = deep_size(memory, seen) if memory is not None else 0
+            # 增量格式化缓存与记忆同步增长，一并计入
+            for attr in ("_fingerprints", "_groups"):
+                if formatter is not None and hasattr(formatter, attr):
+                    size += deep_size(getattr(formatter, attr), seen)
+            sizes[agent.name] = size
+        return sizes
+
+    def sample(self, phase: str) -> dict[str, Any]:
+        # 先取 tracemalloc 快照，再做大小估算，避免把剖析自身的临时分配计入
+        top: list[dict[str, Any]] = []
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ))
+            for stat in snapshot.statistics("lineno")[: self.top]:
+                frame = stat.traceback[0]
+                top.append({
+                    "where": f"{frame.filename}:{frame.lineno}",
+                    "size": stat.size,
+                    "count": stat.count,
+                })
+
+        usage = current_usage()
+        seen: set[int] = set()
+        tracked = {
+            name: deep_size(getter(), seen) for name, getter in self._tracked.items()
+        }
+        agent_sizes = self._agent_sizes(seen)
+
+        sample = {
+            "phase": phase,
+            "elapsed": round(time.perf_counter() - self._start, 3),
+            **usage,
+            "probes": {**usage["probes"], **tracked},
+            "agentMemory": sum(agent_sizes.values()),
+            "agentMemoryMax": max(agent_sizes.values(), default=0),
+            "agents": agent_sizes,
+            "top": top,
+        }
+        self.samples.append(sample)
+        history.append(self.game_id, sample)
+        if sample["rss"] is not None:
+            metrics.set_gauge("memory_rss_bytes", sample["rss"])
+        metrics.set_gauge("memory_agent_bytes", sample["agentMemory"], game=self.game_id)
+        if self.on_sample is not None:
+            self.on_sample(sample)
+        return sample
+
+    def summary(self) -> str:
+        """如 ``RSS 212.0MB → 236.5MB（+24.5MB），玩家记忆 0.3MB → 2.1MB，采样 14 次``。"""
+
+        if not self.samples:
+            return "无采样"
+        first, last = self.samples[0], self.samples[-1]
+        rss_delta = (
+            f"（{(last['rss'] - first['rss']) / 1048576:+.1f}MB）"
+            if first["rss"] is not None and last["rss"] is not None else ""
+        )
+        return (
+            f"RSS {_mb(first['rss'])} → {_mb(last['rss'])}{rss_delta}，"
+            f"玩家记忆 {_mb(first['agentMemory'])} → {_mb(last['agentMemory'])}，"
+            f"采样 {len(self.samples)} 次"
+        )
+
+
+def describe_sample(sample: dict[str, Any]) -> str:
+    """单次采样的一行说明，写入对局日志。"""
+
+    parts = [f"{sample['phase']}: RSS {_mb(sample['rss'])}"]
+    if "traced" in sample:
+        parts.append(f"tracemalloc {_mb(sample['traced'])}（峰值 {_mb(sample['tracedPeak'])}）")
+    parts.append(
+        f"玩家记忆 {_mb(sample['agentMemory'])}（最大 {_mb(sample['agentMemoryMax'])}）")
+    parts.extend(f"{name} {_mb(size)}" for name, size in sample["probes"].items())
+    if sample["top"]:
+        where = sample["top"][0]
+        parts.append(f"最大分配点 {where['where']} {_mb(where['size'])}")
+    return "，".join(parts)
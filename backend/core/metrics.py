@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""进程级运行指标（计数器 / 仪表 / 分布），供 API 查询与日志汇总。"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+def _metric_key(name: str, labels: dict[str, Any]) -> str:
+    """把指标名与标签拼成稳定的键，如 ``phase_timeouts{phase=day_vote}``。"""
+    if not labels:
+        return name
+    label_text = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{label_text}}}"
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表。
+
+    游戏在独立线程/事件循环中运行，API 在主循环中读取，因此所有写入都加锁。
+    分布类指标只保留最近 ``max_samples`` 个样本，避免长时间运行后无限增长。
+    """
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._max_samples = max_samples
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, Any] = {}
+        self._samples: dict[str, deque[float]] = {}
+
+    def incr(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """计数器累加。"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: Any, **labels: Any) -> None:
+        """设置仪表值（覆盖旧值）。"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """记录一个分布样本（如耗时、排队时间）。"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            bucket = self._samples.get(key)
+            if bucket is None:
+                bucket = deque(maxlen=self._max_samples)
+                self._samples[key] = bucket
+            bucket.append(float(value))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """读取计数器当前值。"""
+        with self._lock:
+            return self._counters.get(_metric_key(name, labels), 0.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回所有指标的只读快照。"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            samples = {key: list(values) for key, values in self._samples.items()}
+
+        summaries: dict[str, dict[str, float]] = {}
+        for key, values in samples.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            summaries[key] = {
+                "count": len(ordered),
+                "avg": sum(ordered) / len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+            }
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+
+# 全局指标实例
+metrics = MetricsRegistry()
+
+
+class PhaseClock:
+    """按阶段累计墙钟时间：enter() 结束上一阶段并开始新阶段，stop() 结束当前阶段。
+
+    on_enter 在每个阶段开始前调用（如内存采样），其耗时不计入阶段时间。
+    """
+
+    def __init__(self, on_enter: Callable[[str], Any] | None = None, **labels: Any) -> None:
+        self.on_enter = on_enter
+        self.labels = labels
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self._current: str | None = None
+        self._start = 0.0
+
+    def enter(self, phase: str) -> None:
+        self.stop()
+        if self.on_enter is not None:
+            self.on_enter(phase)
+        self._current = phase
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._current is None:
+            return
+        phase, self._current = self._current, None
+        elapsed = time.perf_counter() - self._start
+        self.totals[phase] = self.totals.get(phase, 0.0) + elapsed
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        metrics.observe("phase_seconds", elapsed, phase=phase, **self.labels)
+
+    def summary(self) -> str:
+        """如 ``夜晚 82.1s/3次(均27.4s), 白天讨论 ...``。"""
+        parts = []
+        for phase, total in self.totals.items():
+            count = self.counts[phase]
+            parts.append(f"{phase} {total:.1f}s/{count}次(均{total / count:.1f}s)")
+        return ", ".join(parts)
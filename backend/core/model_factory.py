@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""按 MODEL_PROVIDER 构造聊天模型与格式化器，供游戏玩家、分析智能体与启动预热共用。"""
+from __future__ import annotations
+
+from typing import Any
+
+from agentscope.formatter import (
+    DashScopeMultiAgentFormatter,
+    OllamaMultiAgentFormatter,
+    OpenAIMultiAgentFormatter,
+)
+from agentscope.model import DashScopeChatModel, OllamaChatModel, OpenAIChatModel
+
+from config import config
+from core.http_pool import client_options, get_http_client
+
+
+def build_chat_model(model_cfg: dict[str, str] | None = None, **kwargs: Any) -> Any:
+    """构造当前提供商的聊天模型。
+
+    Args:
+        model_cfg: OpenAI 模式下的 api_key/base_url/model_name 覆盖，缺省使用全局配置。
+        **kwargs: 透传给模型构造函数的额外参数（如 stream=False）。
+    """
+
+    provider = config.model_provider
+    if provider == "dashscope":
+        return DashScopeChatModel(
+            api_key=config.dashscope_api_key,
+            model_name=config.dashscope_model_name,
+            **kwargs,
+        )
+    if provider == "openai":
+        cfg = model_cfg or {
+            "api_key": config.openai_api_key,
+            "base_url": config.openai_base_url,
+            "model_name": config.openai_model_name,
+        }
+        client_kwargs: dict[str, Any] = {"base_url": cfg.get("base_url")}
+        # 同一端点的玩家、对局与分析共用一个带 keep-alive 的连接池
+        http_client = get_http_client("openai", cfg.get("base_url"), cfg.get("api_key"))
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
+        return OpenAIChatModel(
+            api_key=cfg.get("api_key"),
+            model_name=cfg.get("model_name"),
+            client_kwargs=client_kwargs,
+            **kwargs,
+        )
+    if provider == "ollama":
+        # keep_alive 让模型常驻显存，避免对局中途因空闲被卸载后重新加载
+        return OllamaChatModel(
+            model_name=config.ollama_model_name,
+            keep_alive=config.ollama_keep_alive,
+            client_kwargs=client_options() if config.http_pool else None,
+            **kwargs,
+        )
+    raise ValueError(f"不支持的模型提供商: {provider}")
+
+
+def build_formatter(incremental: bool = False) -> Any:
+    """构造与当前提供商匹配的多智能体格式化器。
+
+    Args:
+        incremental: 是否包装为增量格式化器（缓存已格式化的记忆前缀），
+            适用于记忆持续增长的长期智能体。
+    """
+
+    provider = config.model_provider
+    if provider == "dashscope":
+        formatter = DashScopeMultiAgentFormatter()
+    elif provider == "openai":
+        formatter = OpenAIMultiAgentFormatter()
+    elif provider == "ollama":
+        formatter = OllamaMultiAgentFormatter()
+    else:
+        raise ValueError(f"不支持的模型提供商: {provider}")
+    if incremental:
+        from core.formatting import IncrementalFormatter
+
+        formatter = IncrementalFormatter(formatter)
+    return formatter
+
+
+def endpoint_label(model_cfg: dict[str, str] | None = None) -> str:
+    """端点的可读标识：提供商 + 地址 + 模型名。"""
+
+    provider = config.model_provider
+    if provider == "openai" and model_cfg:
+        return f"openai: {model_cfg.get('base_url', '')} / {model_cfg.get('model_name', '')}"
+    if provider == "dashscope":
+        return f"dashscope: {config.dashscope_model_name}"
+    if provider == "ollama":
+        return f"ollama: {config.ollama_model_name}"
+    return provider
+
+
+def distinct_model_configs() -> list[dict[str, str] | None]:
+    """列出所有需要连通的端点配置（去重），包含分析模块的独立配置。"""
+
+    if config.model_provider != "openai":
+        return [None]
+
+    seen: set[tuple[str, str, str]] = set()
+    out: list[dict[str, str] | None] = []
+    candidates = list(config.openai_player_configs)
+    if config.openai_analysis_config:
+        candidates.append(config.openai_analysis_config)
+    for cfg in candidates:
+        key = (cfg.get("api_key", ""), cfg.get("base_url", ""), cfg.get("model_name", ""))
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(cfg)
+    return out
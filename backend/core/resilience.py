@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""模型调用容错层：错误分类、带抖动的指数退避重试与按端点熔断。
+
+每次尝试都先向进程级调度器（core.scheduler）申请端点名额，退避等待期间不占名额。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from agentscope.message import Msg
+
+from config import config
+from core.ephemeral import ephemeral_context
+from core.metrics import metrics
+from core.scheduler import scheduler
+
+
+# 可重试的错误类别；其余（鉴权失败、参数错误等）直接抛出
+RETRYABLE_KINDS = {"rate_limit", "timeout", "server", "validation"}
+# 计入熔断器的错误类别；结构化输出校验失败与端点健康无关
+BREAKER_KINDS = {"rate_limit", "timeout", "server"}
+
+
+class StructuredOutputError(Exception):
+    """模型回复缺少结构化输出所需字段。"""
+
+
+class CircuitOpenError(Exception):
+    """端点熔断中，暂不接受请求。"""
+
+
+def classify_error(exc: BaseException) -> str:
+    """把异常归类为 rate_limit / timeout / server / validation / fatal。"""
+
+    if isinstance(exc, StructuredOutputError):
+        return "validation"
+    if isinstance(exc, CircuitOpenError):
+        return "server"
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        if status == 429:
+            return "rate_limit"
+        if status in (408, 504):
+            return "timeout"
+        if status >= 500:
+            return "server"
+        return "fatal"
+
+    # 不直接依赖各 SDK 的异常类型，按类名判断
+    name = type(exc).__name__
+    if "RateLimit" in name:
+        return "rate_limit"
+    if "Timeout" in name:
+        return "timeout"
+    if "Connection" in name or "ServerError" in name or isinstance(exc, ConnectionError):
+        return "server"
+    if name == "ValidationError":
+        return "validation"
+    return "fatal"
+
+
+@dataclass
+class RetryPolicy:
+    """重试策略：full jitter 指数退避。"""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=config.model_max_retries,
+            base_delay=config.model_retry_base_delay,
+            max_delay=config.model_retry_max_delay,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（秒），attempt 从 0 开始。"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """单个端点的熔断器。
+
+    连续失败达到阈值后进入 open 状态，冷却期内所有游戏的请求都不再打到该端点；
+    冷却结束后放行一次试探请求（half_open），成功则恢复，失败则重新计时。
+    多个游戏运行在不同线程中，因此状态读写加锁。
+    """
+
+    def __init__(self, endpoint: str, failure_threshold: int, reset_seconds: float) -> None:
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.set_gauge("circuit_state", state, endpoint=self.endpoint)
+
+    def wait_time(self) -> float:
+        """返回需要等待的秒数；0 表示可以立即发起请求。"""
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self.state == "open" or not self._probing:
+                self._set_state("half_open")
+                self._probing = True
+                return 0.0
+            # 已有试探请求在途，其它请求稍后再试
+            return min(1.0, self.reset_seconds)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != "closed":
+                self._set_state("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    metrics.incr("circuit_opened", endpoint=self.endpoint)
+                self.opened_at = time.monotonic()
+                self._set_state("open")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """获取（或创建）端点对应的熔断器，进程内共享。"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=config.circuit_failure_threshold,
+                reset_seconds=config.circuit_reset_seconds,
+            )
+            _breakers[endpoint] = breaker
+        return breaker
+
+
+def endpoint_of(agent: Any) -> str:
+    """用模型类型 + Base URL（或模型名）标识一个端点。"""
+
+    model = getattr(agent, "model", None)
+    if model is None:
+        return "unknown"
+    client = getattr(model, "client", None)
+    base = getattr(client, "base_url", None) or getattr(
+        getattr(client, "_client", None), "base_url", None)
+    target = str(base) if base else getattr(model, "model_name", "")
+    return f"{type(model).__name__}@{target}"
+
+
+def _check_structured(msg: Any, structured_model: Any) -> None:
+    """确认回复包含结构化模型的全部必填字段。"""
+
+    metadata = getattr(msg, "metadata", None)
+    if isinstance(metadata, dict) and metadata.get("_is_interrupted"):
+        return
+    fields = getattr(structured_model, "model_fields", {}) or {}
+    required = [name for name, info in fields.items() if info.is_required()]
+    if not isinstance(metadata, dict):
+        raise StructuredOutputError("回复缺少结构化输出")
+    missing = [name for name in required if name not in metadata]
+    if missing:
+        raise StructuredOutputError(f"结构化输出缺少字段: {', '.join(missing)}")
+
+
+async def _forget_reply(agent: Any, msg: Any) -> None:
+    """校验失败重试前，从记忆中移除那条不合格的回复，避免模型照抄。"""
+
+    memory = getattr(agent, "memory", None)
+    content = getattr(memory, "content", None)
+    msg_id = getattr(msg, "id", None)
+    if not isinstance(content, list) or msg_id is None:
+        return
+    indices = [idx for idx, item in enumerate(content) if getattr(item, "id", None) == msg_id]
+    if indices:
+        await memory.delete(indices)
+
+
+def _slot(agent: Any, endpoint: str) -> Any:
+    """规则型机器人不调用模型，不占端点名额。"""
+
+    if getattr(agent, "model", None) is None:
+        return contextlib.nullcontext()
+    return scheduler.slot(endpoint)
+
+
+async def call_model(
+    agent: Any,
+    prompt: Msg | None,
+    structured_model: Any = None,
+    policy: RetryPolicy | None = None,
+    on_attempt: Callable[[Any], None] | None = None,
+) -> Msg:
+    """带重试与熔断的智能体调用。
+
+    同一个 prompt 对象重试时会被记忆按 id 去重，不会重复写入；
+    prompt 上的一次性上下文只在本次调用（含重试）期间生效。
+
+    Args:
+        on_attempt: 每次实际发出请求后调用（含校验失败重试、传输错误与被取消的请求），
+            参数为该次回复，没有回复时为 None；用于按次计入预算
+    """
+
+    async with ephemeral_context(prompt):
+        return await _call_with_retry(agent, prompt, structured_model, policy, on_attempt)
+
+
+async def _call_with_retry(
+    agent: Any,
+    prompt: Msg | None,
+    structured_model: Any,
+    policy: RetryPolicy | None,
+    on_attempt: Callable[[Any], None] | None = None,
+) -> Msg:
+    policy = policy or RetryPolicy.from_config()
+    endpoint = endpoint_of(agent)
+    breaker = get_breaker(endpoint)
+
+    attempt = 0
+    while True:
+        wait = breaker.wait_time()
+        if wait > 0:
+            if attempt >= policy.max_retries:
+                metrics.incr("model_call_failures", endpoint=endpoint, kind="circuit_open")
+                raise CircuitOpenError(f"{endpoint} 熔断中")
+            metrics.incr("model_call_retries", endpoint=endpoint, kind="circuit_open")
+            await asyncio.sleep(wait)
+            attempt += 1
+            continue
+
+        reply = None
+        sent = False
+        try:
+            async with _slot(agent, endpoint):
+                start = time.perf_counter()
+                sent = True
+                if structured_model is not None:
+                    reply = await agent(prompt, structured_model=structured_model)
+                    _check_structured(reply, structured_model)
+                else:
+                    reply = await agent(prompt)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            kind = classify_error(exc)
+            if kind in BREAKER_KINDS:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if kind not in RETRYABLE_KINDS or attempt >= policy.max_retries:
+                metrics.incr("model_call_failures", endpoint=endpoint, kind=kind)
+                raise
+            if kind == "validation" and reply is not None:
+                await _forget_reply(agent, reply)
+            metrics.incr("model_call_retries", endpoint=endpoint, kind=kind)
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+            continue
+        finally:
+            # 每次重试都会重新发送完整提示，逐次计费
+            if sent and on_attempt is not None:
+                on_attempt(reply)
+
+        breaker.record_success()
+        metrics.observe("model_call_seconds", time.perf_counter() - start, endpoint=endpoint)
+        return reply
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""板子规则：不同人数下的角色配置、夜间行动合法性与胜负判定。"""
+from __future__ import annotations
+
+from typing import Literal
+
+
+ROLE_NAMES = ("werewolf", "villager", "seer", "witch", "hunter")
+GOD_ROLES = ("seer", "witch", "hunter")
+
+# 人数 -> 角色配置；神职固定为预言家/女巫/猎人，狼人约占三分之一
+ROLE_COMPOSITIONS: dict[int, dict[str, int]] = {
+    9: {"werewolf": 3, "villager": 3, "seer": 1, "witch": 1, "hunter": 1},
+    12: {"werewolf": 4, "villager": 5, "seer": 1, "witch": 1, "hunter": 1},
+    15: {"werewolf": 5, "villager": 7, "seer": 1, "witch": 1, "hunter": 1},
+    18: {"werewolf": 6, "villager": 9, "seer": 1, "witch": 1, "hunter": 1},
+}
+
+Winner = Literal["werewolf", "village"]
+
+
+def parse_composition(raw: str) -> dict[str, int]:
+    """解析形如 ``werewolf:4,villager:5,seer:1,witch:1,hunter:1`` 的配置。"""
+
+    composition: dict[str, int] = {}
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" not in part:
+            raise ValueError(f"角色配置格式错误: {part}（应为 角色:人数）")
+        role, count = part.split(":", 1)
+        role = role.strip().lower()
+        if role not in ROLE_NAMES:
+            raise ValueError(f"未知角色类型: {role}")
+        composition[role] = composition.get(role, 0) + int(count)
+    return composition
+
+
+def get_composition(n_players: int, override: dict[str, int] | None = None) -> dict[str, int]:
+    """返回 n_players 人局的角色配置，override 优先于内置表。"""
+
+    composition = dict(override) if override else ROLE_COMPOSITIONS.get(n_players)
+    if composition is None:
+        supported = ", ".join(str(n) for n in sorted(ROLE_COMPOSITIONS))
+        raise ValueError(f"不支持 {n_players} 人局（内置: {supported}），请通过 ROLE_COMPOSITION 指定角色配置")
+    total = sum(composition.values())
+    if total != n_players:
+        raise ValueError(f"角色配置共 {total} 人，与玩家人数 {n_players} 不一致")
+    if composition.get("werewolf", 0) < 1:
+        raise ValueError("角色配置至少需要 1 名狼人")
+    # 屠边规则下平民或神职一侧为空会在开局即判狼人胜利
+    if composition.get("villager", 0) < 1 or not any(composition.get(r, 0) for r in GOD_ROLES):
+        raise ValueError("角色配置至少需要 1 名村民和 1 名神职")
+    for role in GOD_ROLES:
+        if composition.get(role, 0) > 1:
+            raise ValueError(f"神职 {role} 最多 1 名")
+    return composition
+
+
+def build_role_list(composition: dict[str, int]) -> list[str]:
+    """把角色配置展开为角色列表（按 ROLE_NAMES 顺序，未打乱）。"""
+
+    roles: list[str] = []
+    for role in ROLE_NAMES:
+        roles.extend([role] * composition.get(role, 0))
+    return roles
+
+
+# ==================== 夜间行动合法性 ====================
+# 引擎（逐个玩家）与模拟器（NumPy 逐局向量化）共用以下判定，参数既可以是标量也可以是数组。
+
+
+def _not(flags):
+    # 标量 bool 与 NumPy 布尔数组通用的取反（~True 为 -2）
+    return flags == False  # noqa: E712
+
+
+def witch_can_save(has_heal, has_kill, kill_target, witch):
+    """女巫能否使用解药：仍有解药、今晚有人被狼人击杀，且被击杀的不是女巫自己（不能自救）。"""
+    return has_heal & has_kill & (kill_target != witch)
+
+
+def poison_target_allowed(target, kill_target):
+    """毒药目标是否合法：不能毒今晚被狼人击杀的玩家（无人被击杀时传入不对应任何玩家的值）。"""
+    return target != kill_target
+
+
+def hunter_can_shoot(killed_by_wolves, exiled, poisoned):
+    """猎人能否开枪：被狼人击杀或被放逐出局时可以，被女巫毒杀时不能。"""
+    return (killed_by_wolves | exiled) & _not(poisoned)
+
+
+# 胜利规则变体：edge 屠边（神职或平民一侧被清空）；city 屠城（神职与平民全部出局）
+WIN_RULES = ("edge", "city")
+
+
+def wolves_win(n_werewolves, n_villagers, n_gods, n_alive, rule: str = "edge"):
+    """狼人胜利判定。
+
+    参数既可以是整数，也可以是 NumPy 数组（逐局向量化判定），
+    引擎与模拟器共用这一份规则定义。狼人数不少于存活人数一半时狼人同样胜利。
+    """
+
+    if rule == "edge":
+        side_cleared = (n_gods == 0) | (n_villagers == 0)
+    elif rule == "city":
+        side_cleared = (n_gods + n_villagers) == 0
+    else:
+        raise ValueError(f"未知胜利规则: {rule}")
+    return ((n_werewolves > 0) & side_cleared) | (n_werewolves * 2 >= n_alive)
+
+
+def village_wins(n_werewolves, n_alive):
+    """好人胜利判定：狼人全部出局（同样支持整数或 NumPy 数组）。"""
+    return (n_alive > 0) & (n_werewolves == 0)
+
+
+def check_winner(
+    n_werewolves: int,
+    n_villagers: int,
+    n_gods: int,
+    n_alive: int,
+    rule: str = "edge",
+) -> Winner | None:
+    """按胜利规则判定胜负（默认屠边），狼人胜利优先判定。"""
+
+    if wolves_win(n_werewolves, n_villagers, n_gods, n_alive, rule):
+        return "werewolf"
+    if village_wins(n_werewolves, n_alive):
+        return "village"
+    return None
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""对局场景：从指定回合的局面（而非第 1 回合）开始一局游戏。
+
+场景文件（JSON）固定身份分配、存活玩家、女巫药水、预言家查验结果、历史票型、
+玩家印象与起始回合，用于单独压测或回归某个阶段（PK 循环、猎人连锁、
+残局反思等），不必把之前的回合全部真实跑一遍。
+
+场景总是从起始回合的夜晚开始；此前发生的公开事件以主持人回顾的形式
+告知所有玩家，私有信息（查验结果、剩余药水）只告知对应玩家。
+仓库内的场景位于 SCENARIO_DIR（默认 data/scenarios），由
+``python -m analysis.scenarios`` 从 static/ 下的对局日志导出。
+只固定身份分配的第 1 回合场景（如锦标赛轮换座位）直接开局，不发送回顾。
+"""
+from __future__ import annotations
+
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from config import config
+from core.rules import build_role_list
+
+
+@dataclass
+class Scenario:
+    """一个对局场景。roles 的键顺序即座位顺序。"""
+
+    name: str
+    round: int
+    roles: dict[str, str]
+    alive: list[str]
+    potions: dict[str, bool] = field(
+        default_factory=lambda: {"healing": True, "poison": True})
+    seer_checks: dict[str, str] = field(default_factory=dict)  # 玩家 -> 好人/狼人
+    vote_history: list[dict[str, Any]] = field(default_factory=list)
+    impressions: dict[str, dict[str, str]] = field(default_factory=dict)
+    history: list[str] = field(default_factory=list)  # 此前各回合的公开事件
+    description: str = ""
+    source: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Scenario":
+        try:
+            return cls(
+                name=str(data["name"]),
+                round=int(data["round"]),
+                roles=dict(data["roles"]),
+                alive=list(data["alive"]),
+                potions={"healing": True, "poison": True, **data.get("potions", {})},
+                seer_checks=dict(data.get("seer_checks", {})),
+                vote_history=list(data.get("vote_history", [])),
+                impressions={
+                    name: dict(items)
+                    for name, items in data.get("impressions", {}).items()
+                },
+                history=list(data.get("history", [])),
+                description=data.get("description", ""),
+                source=data.get("source", ""),
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"场景文件格式错误: {exc}") from exc
+
+    @classmethod
+    def deal(
+        cls,
+        name: str,
+        player_names: list[str],
+        composition: dict[str, int],
+        rng: random.Random | None = None,
+    ) -> "Scenario":
+        """提前随机发身份（座位顺序与角色都打乱）得到的第 1 回合场景。"""
+
+        rng = rng or random.Random()
+        seats = list(player_names)
+        roles = build_role_list(composition)
+        rng.shuffle(seats)
+        rng.shuffle(roles)
+        return cls(
+            name=name, round=1, roles=dict(zip(seats, roles)), alive=seats, source="deal")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "source": self.source,
+            "round": self.round,
+            "roles": self.roles,
+            "alive": self.alive,
+            "potions": self.potions,
+            "seer_checks": self.seer_checks,
+            "history": self.history,
+            "vote_history": self.vote_history,
+            "impressions": self.impressions,
+        }
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        return path
+
+    def validate(self, player_names: list[str], composition: dict[str, int]) -> None:
+        """检查场景与本局玩家、角色配置是否一致，不一致时抛出 ValueError。"""
+
+        if self.round < 1:
+            raise ValueError(f"场景 {self.name} 的起始回合必须 >= 1")
+        if set(self.roles) != set(player_names):
+            raise ValueError(
+                f"场景 {self.name} 的玩家 {sorted(self.roles)} 与本局玩家 {sorted(player_names)} 不一致")
+        counts = Counter(self.roles.values())
+        if dict(counts) != {role: n for role, n in composition.items() if n}:
+            raise ValueError(
+                f"场景 {self.name} 的角色配置 {dict(counts)} 与 {composition} 不一致")
+        unknown = [name for name in self.alive if name not in self.roles]
+        if unknown:
+            raise ValueError(f"场景 {self.name} 的存活玩家中有未知玩家: {unknown}")
+
+    @property
+    def fresh(self) -> bool:
+        """是否为第 1 回合、无人出局的开局（只固定身份分配）。"""
+        return (
+            self.round == 1
+            and not self.dead
+            and not self.vote_history
+            and not self.impressions
+            and not self.seer_checks
+            and all(self.potions.values())
+        )
+
+    @property
+    def dead(self) -> list[str]:
+        alive = set(self.alive)
+        return [name for name in self.roles if name not in alive]
+
+    def apply(self, players: Any, vote_history: list[dict[str, Any]]) -> None:
+        """把场景状态写入本局的 Players 与投票历史（身份须已按 roles 分配）。"""
+
+        players.update_players(self.dead)
+        for role_obj in players.all_roles:
+            if role_obj.role_name == "witch":
+                role_obj.has_healing = bool(self.potions.get("healing", True))
+                role_obj.has_poison = bool(self.potions.get("poison", True))
+            elif role_obj.role_name == "seer":
+                role_obj.known_identities.update(self.seer_checks)
+                role_obj.checked_players.extend(self.seer_checks)
+        for name, updates in self.impressions.items():
+            players.apply_impression_updates(name, updates)
+        vote_history.extend(self.vote_history)
+
+    def public_recap(self) -> str:
+        """告知所有玩家的前情回顾。"""
+
+        lines = [f"本局从第{self.round}回合开始，此前的公开信息如下："]
+        lines.extend(f"- {item}" for item in self.history)
+        lines.append(f"当前存活玩家：{', '.join(self.alive)}。")
+        if self.dead:
+            lines.append(f"已出局玩家：{', '.join(self.dead)}。")
+        return "\n".join(lines)
+
+    def private_note(self, role_name: str) -> str:
+        """只告知对应身份玩家的私有信息，没有则返回空字符串。"""
+
+        if role_name == "seer" and self.seer_checks:
+            checks = "；".join(
+                f"{name} 是 {result}" for name, result in self.seer_checks.items())
+            return f"你此前的查验结果：{checks}。"
+        if role_name == "witch":
+            healing = "仍可使用" if self.potions.get("healing", True) else "已用完"
+            poison = "仍可使用" if self.potions.get("poison", True) else "已用完"
+            return f"你的解药{healing}，毒药{poison}。"
+        return ""
+
+    def describe(self) -> str:
+        if self.fresh and self.source == "deal":
+            return "身份已在开局前随机分配"
+        if self.fresh:
+            return f"按场景 {self.name} 固定身份分配开局"
+        return (
+            f"从场景 {self.name} 开始：第{self.round}回合，"
+            f"存活 {len(self.alive)}/{len(self.roles)} 人"
+            + (f"（{self.description}）" if self.description else "")
+        )
+
+
+def resolve_scenario_path(name_or_path: str) -> Path:
+    """场景名解析为 SCENARIO_DIR 下的 <name>.json，否则按文件路径处理。"""
+
+    path = Path(name_or_path)
+    if path.suffix != ".json":
+        candidate = Path(config.scenario_dir) / f"{name_or_path}.json"
+        if candidate.exists():
+            return candidate
+    if not path.is_absolute():
+        path = config.root_dir / path
+    return path
+
+
+def load_scenario(name_or_path: str) -> Scenario:
+    path = resolve_scenario_path(name_or_path)
+    if not path.exists():
+        raise FileNotFoundError(f"场景文件不存在: {path}")
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return Scenario.from_dict(data)
+
+
+def list_scenarios() -> list[str]:
+    """SCENARIO_DIR 下可用的场景名。"""
+
+    directory = Path(config.scenario_dir)
+    if not directory.exists():
+        return []
+    return sorted(path.stem for path in directory.glob("*.json"))
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""进程级模型调用调度：按端点限制并发，按优先级与对局权重分配调用名额。
+
+同一进程内可能同时运行有人观战的对局（API）、后台批量对局（锦标赛）
+与赛后分析，它们往往共用同一个提供商配额。所有模型调用都经由 call_model
+向本调度器申请所在端点的名额：
+
+- 优先级：interactive（观战对局）> batch（批量对局）> analysis（赛后分析）。
+  有高优先级调用排队时，低优先级调用不会拿到名额。
+- 同一优先级内按对局加权公平分配（start-time fair queuing）：每次放行
+  排队中虚拟时间最小的对局，放行后其虚拟时间增加 1/权重，
+  因此权重为 2 的对局拿到的名额约为权重为 1 的两倍，且任何对局都不会被饿死。
+- 每个端点的并发上限由 MODEL_ENDPOINT_CONCURRENCY 控制，0 表示不限
+  （此时仍会记录排队时间，便于对比）。
+
+当前调用的对局与优先级通过 ContextVar 绑定；各对局运行在独立线程的事件循环中，
+因此调度状态加锁，名额通过 call_soon_threadsafe 交还给等待者所在的事件循环。
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from config import config
+from core.metrics import metrics
+
+
+# 由高到低
+PRIORITIES = ("interactive", "batch", "analysis")
+
+PRIORITY_LABELS = {
+    "interactive": "观战对局",
+    "batch": "批量对局",
+    "analysis": "赛后分析",
+}
+
+
+@dataclass
+class CallContext:
+    """一局游戏（或一次分析）的调度身份，并累计其调用的排队时间。"""
+
+    game: str
+    priority: str = "interactive"
+    weight: float = 1.0
+    calls: int = 0
+    queue_seconds: float = 0.0
+    max_queue_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.priority not in PRIORITIES:
+            raise ValueError(f"未知的调度优先级: {self.priority}（可选 {', '.join(PRIORITIES)}）")
+        if self.weight <= 0:
+            raise ValueError(f"调度权重必须为正数，实际为 {self.weight}")
+
+    def record(self, waited: float) -> None:
+        self.calls += 1
+        self.queue_seconds += waited
+        self.max_queue_seconds = max(self.max_queue_seconds, waited)
+
+    def summary(self) -> str:
+        avg = self.queue_seconds / self.calls if self.calls else 0.0
+        return (
+            f"{PRIORITY_LABELS[self.priority]}（权重 {self.weight:g}）：{self.calls} 次调用，"
+            f"排队共 {self.queue_seconds:.1f}s，平均 {avg:.2f}s，最长 {self.max_queue_seconds:.2f}s"
+        )
+
+
+_current: ContextVar[CallContext | None] = ContextVar("call_context", default=None)
+
+
+def bind_call_context(ctx: CallContext) -> Token:
+    return _current.set(ctx)
+
+
+def unbind_call_context(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_call_context() -> CallContext | None:
+    return _current.get()
+
+
+@dataclass
+class _Waiter:
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    game: str
+    granted: bool = False
+
+
+@dataclass
+class _ClassQueue:
+    """一个优先级内的排队：每个对局一个先进先出队列，按虚拟时间挑选对局。"""
+
+    queues: dict[str, deque[_Waiter]] = field(default_factory=dict)
+    vtime: dict[str, float] = field(default_factory=dict)
+    # 虚拟时钟：最近一次放行的虚拟时间，新加入的对局从这里开始计，不能囤积额度
+    clock: float = 0.0
+
+    def push(self, waiter: _Waiter) -> None:
+        queue = self.queues.get(waiter.game)
+        if queue is None:
+            queue = self.queues[waiter.game] = deque()
+            self.vtime[waiter.game] = max(self.vtime.get(waiter.game, 0.0), self.clock)
+        queue.append(waiter)
+
+    def pop(self, weights: dict[str, float]) -> _Waiter | None:
+        if not self.queues:
+            return None
+        game = min(self.queues, key=lambda g: self.vtime[g])
+        queue = self.queues[game]
+        waiter = queue.popleft()
+        if not queue:
+            del self.queues[game]
+        self.clock = self.vtime[game]
+        self.vtime[game] += 1.0 / weights.get(game, 1.0)
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        queue = self.queues.get(waiter.game)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self.queues[waiter.game]
+
+
+class _EndpointState:
+    def __init__(self, endpoint: str, limit: int) -> None:
+        self.endpoint = endpoint
+        self.limit = limit
+        self.in_flight = 0
+        self.classes = {priority: _ClassQueue() for priority in PRIORITIES}
+
+    def has_capacity(self) -> bool:
+        return self.limit <= 0 or self.in_flight < self.limit
+
+    def waiting(self) -> int:
+        return sum(
+            len(queue) for cls in self.classes.values() for queue in cls.queues.values())
+
+
+class ModelCallScheduler:
+    """按端点调度模型调用；进程内共享一个实例（见 ``scheduler``）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointState] = {}
+        self._weights: dict[str, float] = {}
+
+    def _state(self, endpoint: str) -> _EndpointState:
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = _EndpointState(endpoint, config.model_endpoint_concurrency)
+            self._endpoints[endpoint] = state
+        return state
+
+    def _publish(self, state: _EndpointState) -> None:
+        metrics.set_gauge("scheduler_in_flight", state.in_flight, endpoint=state.endpoint)
+        metrics.set_gauge("scheduler_waiting", state.waiting(), endpoint=state.endpoint)
+
+    def _grant_next(self, state: _EndpointState) -> None:
+        """在锁内调用：有空余名额时按优先级与公平顺序放行等待者。"""
+
+        while state.has_capacity():
+            waiter = None
+            for priority in PRIORITIES:
+                waiter = state.classes[priority].pop(self._weights)
+                if waiter is not None:
+                    break
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            waiter.granted = True
+            state.in_flight += 1
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:
+                # 等待者所在的事件循环已关闭，名额收回
+                state.in_flight -= 1
+
+    async def acquire(self, endpoint: str, ctx: CallContext | None) -> float:
+        """申请端点名额，返回排队秒数。"""
+
+        start = time.perf_counter()
+        priority = ctx.priority if ctx is not None else "interactive"
+        game = ctx.game if ctx is not None else "_default"
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            state = self._state(endpoint)
+            if ctx is not None:
+                self._weights[game] = ctx.weight
+            queued = any(cls.queues for cls in state.classes.values())
+            if state.has_capacity() and not queued:
+                state.in_flight += 1
+                self._publish(state)
+                return 0.0
+            waiter = _Waiter(loop, loop.create_future(), game)
+            state.classes[priority].push(waiter)
+            self._publish(state)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    state.in_flight -= 1
+                    self._grant_next(state)
+                else:
+                    state.classes[priority].remove(waiter)
+                self._publish(state)
+            raise
+        return time.perf_counter() - start
+
+    def release(self, endpoint: str) -> None:
+        with self._lock:
+            state = self._state(endpoint)
+            state.in_flight = max(0, state.in_flight - 1)
+            self._grant_next(state)
+            self._publish(state)
+
+    def forget_game(self, game: str) -> None:
+        """对局结束后清理其权重与虚拟时间。"""
+
+        with self._lock:
+            self._weights.pop(game, None)
+            for state in self._endpoints.values():
+                for cls in state.classes.values():
+                    if game not in cls.queues:
+                        cls.vtime.pop(game, None)
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str) -> AsyncIterator[float]:
+        """占用一个端点名额执行一次调用，产出排队秒数并记录指标。"""
+
+        ctx = current_call_context()
+        waited = await self.acquire(endpoint, ctx)
+        priority = ctx.priority if ctx is not None else "interactive"
+        metrics.observe("model_queue_seconds", waited, endpoint=endpoint, priority=priority)
+        if ctx is not None:
+            ctx.record(waited)
+        try:
+            yield waited
+        finally:
+            self.release(endpoint)
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                endpoint: {
+                    "limit": state.limit,
+                    "inFlight": state.in_flight,
+                    "waiting": state.waiting(),
+                }
+                for endpoint, state in self._endpoints.items()
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# 全局调度器实例
+scheduler = ModelCallScheduler()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""白天讨论的推测式预生成（speculative prefetch）。
+
+顺序发言模式下，第 k 位玩家发言的同时，提前用当前上下文为第 k+1 位玩家生成草稿。
+第 k 位的发言落地后，用廉价规则判断草稿是否仍然有效：只有第 k 位的声明涉及
+第 k+1 位本人或其已知信息（对其报查杀/金水、跳其身份等）时，才丢弃草稿、
+回滚记忆并重新生成。作废原因写入统计，用于调整 SPECULATION_CLAIM_MARKERS。
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from agentscope.message import Msg
+
+from config import config
+from core.transcript import TranscriptMemory
+
+
+# 身份名：上一位以第一人称跳了下一位玩家的身份时，草稿必须回应（对跳）
+ROLE_CLAIM_NAMES: dict[str, str] = {
+    "seer": "预言家",
+    "witch": "女巫",
+    "hunter": "猎人",
+}
+
+_FIRST_PERSON = r"(?:我是|我就是|我才是|我跳|我起跳|本)真?"
+
+# 声明标记与目标玩家之间允许的字符数（不跨句）
+_CLAIM_WINDOW = 8
+
+
+def _mentions(markers: tuple[str, ...], name: str) -> re.Pattern[str]:
+    """匹配“标记 … 玩家名”或“玩家名 … 标记”（同一分句内）。"""
+    marker = "|".join(re.escape(m) for m in markers if m)
+    gap = rf"[^。！？!?；;\n]{{0,{_CLAIM_WINDOW}}}?"
+    name = re.escape(name)
+    return re.compile(rf"(?:{marker}){gap}{name}|{name}{gap}(?:{marker})")
+
+
+def draft_still_valid(
+    prior_speech: str,
+    next_name: str,
+    next_role: str | None = None,
+    known_names: tuple[str, ...] = (),
+    markers: tuple[str, ...] = (),
+) -> tuple[bool, str]:
+    """判断上一位玩家发言后，下一位玩家的草稿是否仍可直接使用。
+
+    只在上一位的声明涉及下一位玩家本人或其已知信息时作废：
+    - 对下一位玩家报查杀/金水、归票等（声明标记与其名字在同一分句内）
+    - 以第一人称跳了下一位玩家的真实身份（对跳）
+    - 对下一位玩家已掌握信息的对象做出声明（如预言家查验过的玩家）
+    泛泛提到身份名或点到下一位玩家的名字不作废。
+
+    Args:
+        markers: 声明标记，默认 SPECULATION_CLAIM_MARKERS
+
+    Returns:
+        (is_valid, reason)：reason 为作废原因，有效时为空字符串。
+    """
+
+    text = prior_speech or ""
+    if not text:
+        return True, ""
+    markers = markers or config.speculation_claim_markers
+    if markers and next_name and _mentions(markers, next_name).search(text):
+        return False, "针对下一位"
+    role_cn = ROLE_CLAIM_NAMES.get(next_role or "")
+    if role_cn and re.search(_FIRST_PERSON + re.escape(role_cn), text):
+        return False, f"对跳:{role_cn}"
+    for name in known_names:
+        if markers and name and name != next_name and _mentions(markers, name).search(text):
+            return False, "涉及已知信息"
+    return True, ""
+
+
+@dataclass
+class SpeculationStats:
+    """推测发言的命中率与节省时间统计，用于调优作废规则。"""
+
+    attempts: int = 0
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    saved_seconds: float = 0.0
+    wasted_seconds: float = 0.0
+    miss_reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def hit_rate(self) -> float:
+        """草稿命中率（无尝试时为 0）。"""
+        return self.hits / self.attempts if self.attempts else 0.0
+
+    def merge(self, other: "SpeculationStats") -> None:
+        """将另一份统计累加到当前统计。"""
+        self.attempts += other.attempts
+        self.hits += other.hits
+        self.misses += other.misses
+        self.errors += other.errors
+        self.saved_seconds += other.saved_seconds
+        self.wasted_seconds += other.wasted_seconds
+        self.miss_reasons.update(other.miss_reasons)
+
+    def summary(self) -> str:
+        """返回便于写入日志的单行摘要。"""
+        reasons = ", ".join(
+            f"{reason}×{count}" for reason, count in self.miss_reasons.most_common()
+        )
+        return (
+            f"草稿 {self.attempts} 次, 命中 {self.hits}, 作废 {self.misses}, "
+            f"异常 {self.errors}, 命中率 {self.hit_rate:.0%}, "
+            f"节省 {self.saved_seconds:.1f}s, 浪费 {self.wasted_seconds:.1f}s"
+            + (f" (作废原因: {reasons})" if reasons else "")
+        )
+
+
+@dataclass
+class SpeculativeDraft:
+    """一份正在生成中的发言草稿。"""
+
+    role: Any
+    task: asyncio.Task
+    memory_base: list[Msg]
+    started_at: float
+    observed_ids: set[str] = field(default_factory=set)
+    finished_at: float | None = None
+
+    def observe(self, msg: Msg) -> None:
+        """记录草稿生成期间广播给该玩家的消息，便于之后重排记忆。"""
+        self.observed_ids.add(msg.id)
+
+    async def cancel(self) -> None:
+        """取消草稿并回滚草稿产生的记忆。"""
+        if not self.task.done():
+            self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        await _reconcile_memory(self, keep_draft=False)
+
+
+async def start_draft(
+    role: Any,
+    generate: Callable[[], Awaitable[Msg]],
+) -> SpeculativeDraft:
+    """以当前上下文为 role 启动草稿生成任务。"""
+
+    memory = getattr(role.agent, "memory", None)
+    base = list(await memory.get_memory()) if memory is not None else []
+    draft = SpeculativeDraft(
+        role=role,
+        task=asyncio.ensure_future(generate()),
+        memory_base=base,
+        started_at=time.perf_counter(),
+    )
+
+    def _mark_done(_: asyncio.Future) -> None:
+        draft.finished_at = time.perf_counter()
+
+    draft.task.add_done_callback(_mark_done)
+    return draft
+
+
+async def _reconcile_memory(draft: SpeculativeDraft, keep_draft: bool) -> None:
+    """把草稿期间的记忆整理为“先看到上一位发言，再产生草稿”的顺序。"""
+
+    memory = getattr(draft.role.agent, "memory", None)
+    if memory is None:
+        return
+    current = list(await memory.get_memory())
+    base_ids = {msg.id for msg in draft.memory_base}
+    added = [msg for msg in current if msg.id not in base_ids]
+    observed = [msg for msg in added if msg.id in draft.observed_ids]
+    drafted = [msg for msg in added if msg.id not in draft.observed_ids]
+
+    if isinstance(memory, TranscriptMemory):
+        # 公开发言已在共享记录中，只需调整草稿产生的私有消息
+        drafted_ids = {msg.id for msg in drafted}
+        if keep_draft:
+            memory.defer(drafted_ids)
+        else:
+            await memory.delete(
+                [idx for idx, msg in enumerate(memory.content) if msg.id in drafted_ids],
+            )
+        return
+
+    await memory.clear()
+    await memory.add(
+        [*draft.memory_base, *observed, *(drafted if keep_draft else [])],
+    )
+
+
+async def resolve_draft(
+    draft: SpeculativeDraft,
+    prior_speech: str,
+    stats: SpeculationStats,
+    regenerate: Callable[[], Awaitable[Msg]],
+    await_draft: Callable[[Awaitable[Msg]], Awaitable[Msg]] | None = None,
+) -> Msg:
+    """在轮到草稿玩家发言时决定沿用草稿还是重新生成。
+
+    Args:
+        regenerate: 草稿作废或出错时重新生成发言（自带截止时间）
+        await_draft: 沿用草稿时等待其完成的包装（如阶段截止时间），
+            截止时间从轮到该玩家时开始计算，而非草稿开始生成时
+    """
+
+    turn_start = time.perf_counter()
+    stats.attempts += 1
+
+    role = draft.role
+    valid, reason = draft_still_valid(
+        prior_speech,
+        role.name,
+        next_role=getattr(role, "role_name", None),
+        known_names=tuple(getattr(role, "known_identities", None) or ()),
+    )
+    if valid:
+        try:
+            msg = await (await_draft(draft.task) if await_draft else draft.task)
+        except asyncio.CancelledError:
+            await draft.cancel()
+            raise
+        except Exception:  # noqa: BLE001
+            stats.errors += 1
+            await _reconcile_memory(draft, keep_draft=False)
+            return await regenerate()
+
+        if (msg.metadata or {}).get("timed_out"):
+            # 轮到该玩家后仍未在截止时间内完成，已按超时回落
+            stats.errors += 1
+            await _reconcile_memory(draft, keep_draft=False)
+            return msg
+
+        finished = draft.finished_at or time.perf_counter()
+        stats.hits += 1
+        stats.saved_seconds += max(
+            0.0,
+            min(finished - draft.started_at, turn_start - draft.started_at),
+        )
+        await _reconcile_memory(draft, keep_draft=True)
+        return msg
+
+    stats.misses += 1
+    stats.miss_reasons[reason] += 1
+    stats.wasted_seconds += (draft.finished_at or turn_start) - draft.started_at
+    await draft.cancel()
+    return await regenerate()
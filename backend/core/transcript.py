@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""共享公开记录：公开广播只在每局游戏中存储一次，玩家记忆按偏移引用。
+
+MsgHub.broadcast 会对每位参与者调用 observe，同一条公开发言被写入每名存活玩家的
+记忆（每次写入还要按 id 扫描整段记忆去重），一回合的开销随人数平方增长。
+这里改为：
+
+- PublicTranscript：每局一份只追加的公开记录，每条消息附带可见玩家的位掩码；
+- TranscriptMemory：玩家记忆只保存私有消息（身份告知、预言家结果、狼人夜聊、
+  自己的提示与回复），并记录每条私有消息写入时公开记录的长度（偏移），
+  get_memory 时按偏移把可见的公开消息与私有消息合并为原有的时间顺序；
+- PublicHub：公开频道，广播时写入公开记录一次；未使用 TranscriptMemory 的
+  参与者（如规则型机器人）仍通过 observe 接收。
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence, Union
+
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg
+from agentscope.pipeline import MsgHub
+
+
+class PublicTranscript:
+    """每局一份的只追加公开记录。"""
+
+    def __init__(self) -> None:
+        self.messages: list[Msg] = []
+        self.masks: list[int] = []  # 每条消息的可见玩家位掩码
+        self._bits: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def audience_bit(self, name: str) -> int:
+        """玩家在位掩码中的位（首次出现时分配）。"""
+        bit = self._bits.get(name)
+        if bit is None:
+            bit = 1 << len(self._bits)
+            self._bits[name] = bit
+        return bit
+
+    def append(self, msgs: Union[list[Msg], Msg], audience: int) -> None:
+        for msg in msgs if isinstance(msgs, list) else [msgs]:
+            self.messages.append(msg)
+            self.masks.append(audience)
+
+
+class TranscriptMemory(InMemoryMemory):
+    """引用共享公开记录的玩家记忆。
+
+    content 仍是私有消息列表（与 InMemoryMemory 一致，delete 的下标也针对私有消息），
+    get_memory 返回合并后的完整视图。
+    """
+
+    def __init__(self, transcript: PublicTranscript, owner: str) -> None:
+        super().__init__()
+        self.transcript = transcript
+        self.bit = transcript.audience_bit(owner)
+        self._offsets: list[int] = []  # 与 content 一一对应
+        self._floor = 0  # clear 之后，此前的公开消息不再可见
+
+    @classmethod
+    def replace(cls, agent: Any, transcript: PublicTranscript) -> "TranscriptMemory":
+        """把智能体现有的记忆替换为 TranscriptMemory，已有消息作为私有消息保留。"""
+
+        memory = cls(transcript, agent.name)
+        old = getattr(agent, "memory", None)
+        existing = list(getattr(old, "content", None) or [])
+        memory.content = existing
+        memory._offsets = [len(transcript)] * len(existing)
+        agent.memory = memory
+        return memory
+
+    def messages(self) -> list[Msg]:
+        """按时间顺序合并可见的公开消息与私有消息。
+
+        不为每名玩家缓存可见下标：那样又会引入 O(人数 × 消息数) 的存储。
+        逐条检查位掩码的开销与构造合并列表本身同阶。
+        """
+
+        public = self.transcript.messages
+        masks = self.transcript.masks
+        bit = self.bit
+        merged: list[Msg] = []
+        cursor = self._floor
+        for offset, msg in zip(self._offsets, self.content):
+            while cursor < offset:
+                if masks[cursor] & bit:
+                    merged.append(public[cursor])
+                cursor += 1
+            merged.append(msg)
+        for idx in range(cursor, len(public)):
+            if masks[idx] & bit:
+                merged.append(public[idx])
+        return merged
+
+    async def add(
+        self,
+        memories: Union[list[Msg], Msg, None],
+        allow_duplicates: bool = False,
+    ) -> None:
+        before = len(self.content)
+        await super().add(memories, allow_duplicates)
+        self._offsets.extend([len(self.transcript)] * (len(self.content) - before))
+
+    async def delete(self, index: Union[Iterable, int]) -> None:
+        indices = {index} if isinstance(index, int) else set(index)
+        await super().delete(indices)
+        self._offsets = [
+            offset for idx, offset in enumerate(self._offsets) if idx not in indices
+        ]
+
+    def defer(self, ids: set[str]) -> None:
+        """把指定私有消息移到当前所有公开消息之后（用于推测发言的记忆重排）。"""
+
+        now = len(self.transcript)
+        pairs = [
+            (now if msg.id in ids else offset, msg)
+            for offset, msg in zip(self._offsets, self.content)
+        ]
+        pairs.sort(key=lambda pair: pair[0])  # 稳定排序，保持同一偏移内的先后顺序
+        self._offsets = [offset for offset, _ in pairs]
+        self.content = [msg for _, msg in pairs]
+
+    async def size(self) -> int:
+        return len(self.messages())
+
+    async def get_memory(self) -> list[Msg]:
+        return self.messages()
+
+    async def clear(self) -> None:
+        await super().clear()
+        self._offsets = []
+        self._floor = len(self.transcript)
+
+    def state_dict(self) -> dict:
+        return {"content": [msg.to_dict() for msg in self.messages()]}
+
+    def load_state_dict(self, state_dict: dict, strict: bool = True) -> None:
+        super().load_state_dict(state_dict, strict)
+        self._offsets = [len(self.transcript)] * len(self.content)
+        self._floor = len(self.transcript)
+
+
+class PublicHub(MsgHub):
+    """公开频道：广播写入共享公开记录一次，而不是逐个写入参与者记忆。"""
+
+    def __init__(
+        self,
+        transcript: PublicTranscript | None,
+        participants: Sequence[Any],
+        **kwargs: Any,
+    ) -> None:
+        self.transcript = transcript
+        super().__init__(participants, **kwargs)
+
+    def _uses_transcript(self, agent: Any) -> bool:
+        memory = getattr(agent, "memory", None)
+        return (
+            self.transcript is not None
+            and isinstance(memory, TranscriptMemory)
+            and memory.transcript is self.transcript
+        )
+
+    async def broadcast(self, msg: Union[list[Msg], Msg]) -> None:
+        audience = 0
+        for agent in self.participants:
+            if self._uses_transcript(agent):
+                audience |= agent.memory.bit
+            else:
+                await agent.observe(msg)
+        if audience:
+            self.transcript.append(msg, audience)
@@ -3,19 +3,12 @@
 from collections import Counter, defaultdict
 from typing import Any
 
-try:
-    from ..config import config  # type: ignore
-except Exception:  # noqa: BLE001
-    from config import config
 from prompts import EnglishPrompts, ChinesePrompts
+from core.rules import check_winner
 
 from agentscope.message import Msg
 from agentscope.agent import ReActAgent, AgentBase
 
-# 从配置文件读取游戏参数
-MAX_GAME_ROUND = config.max_game_round  # 最大回合数
-MAX_DISCUSSION_ROUND = config.max_discussion_round  # 白天讨论阶段的最大讨论轮数
-
 # 根据配置选择提示词语言
 Prompts = ChinesePrompts
 
@@ -142,8 +135,16 @@ class EchoAgent(AgentBase):
         """观察消息（占位，无额外逻辑）。"""
 
 
+DEFAULT_IMPRESSION = "不熟悉"
+
+
 class Players:
-    """维护玩家状态的容器。"""
+    """维护玩家状态的容器。
+
+    内部以座位号（加入顺序，从 0 开始）为索引：存活状态为位掩码，
+    各角色的存活列表按掩码缓存，印象表以 (观察者座位, 目标座位) 为键且只保存非默认值。
+    对外仍提供按玩家名称访问的接口。
+    """
 
     def __init__(self) -> None:
         """初始化玩家管理结构。"""
@@ -152,17 +153,17 @@ class Players:
         self.role_to_names = defaultdict(list)  # 角色到玩家名称列表的映射
         self.name_to_agent = {}  # 玩家名称到智能体的映射
         self.name_to_role_obj = {}  # 玩家名称到角色对象的映射 (新增)
-        self.werewolves = []  # 狼人角色对象列表
-        self.villagers = []  # 村民角色对象列表
-        self.seer = []  # 预言家角色对象列表
-        self.hunter = []  # 猎人角色对象列表
-        self.witch = []  # 女巫角色对象列表
-        self.current_alive = []  # 当前存活角色对象列表
         self.all_players = []  # 所有智能体列表
         self.all_roles = []  # 所有角色对象列表 (新增)
-        self.impressions = {}  # 玩家对其他玩家的印象映射: {player: {other: impression}}
         self.knowledge = {}  # 玩家持久化的游戏理解: {player: knowledge_text}
 
+        self.seats = []  # 座位号 -> 角色对象（无角色对象时为智能体）
+        self.seat_of = {}  # 玩家名称 -> 座位号
+        self.role_masks = defaultdict(int)  # 角色 -> 座位位掩码
+        self.alive_mask = 0  # 存活座位位掩码
+        self._impressions = {}  # (观察者座位, 目标座位) -> 印象，缺省为“不熟悉”
+        self._alive_cache = {}  # (角色或 None, alive_mask) -> 存活列表
+
     def add_player(self, player: ReActAgent, role: str, role_obj=None, knowledge: str | None = None) -> None:
         """将一名玩家加入游戏。
 
@@ -172,18 +173,15 @@ class Players:
             role_obj: 角色对象实例（可选）
             knowledge: 该玩家的长期知识文本（可选）
         """
+        if role not in ("werewolf", "villager", "seer", "hunter", "witch"):
+            raise ValueError(f"Unknown role: {role}")
+
+        seat = len(self.seats)
         self.name_to_role[player.name] = role
         self.name_to_agent[player.name] = player
         self.role_to_names[role].append(player.name)
         self.all_players.append(player)
 
-        # 初始化印象: 所有玩家彼此为“不熟悉”
-        for existing in self.impressions:
-            self.impressions[existing][player.name] = "不熟悉"
-        self.impressions[player.name] = {
-            name: "不熟悉" for name in self.name_to_agent.keys() if name != player.name
-        }
-
         # 初始化知识库文本
         self.knowledge[player.name] = knowledge or ""
 
@@ -191,19 +189,73 @@ class Players:
             self.name_to_role_obj[player.name] = role_obj
             self.all_roles.append(role_obj)
 
-        if role == "werewolf":
-            self.werewolves.append(role_obj if role_obj else player)
-        elif role == "villager":
-            self.villagers.append(role_obj if role_obj else player)
-        elif role == "seer":
-            self.seer.append(role_obj if role_obj else player)
-        elif role == "hunter":
-            self.hunter.append(role_obj if role_obj else player)
-        elif role == "witch":
-            self.witch.append(role_obj if role_obj else player)
-        else:
-            raise ValueError(f"Unknown role: {role}")
-        self.current_alive.append(role_obj if role_obj else player)
+        self.seats.append(role_obj if role_obj else player)
+        self.seat_of[player.name] = seat
+        self.role_masks[role] |= 1 << seat
+        self.alive_mask |= 1 << seat
+        self._alive_cache.clear()
+
+        # 机器人玩家通过容器读取存活名单与狼人队友
+        bind_players = getattr(player, "bind_players", None)
+        if callable(bind_players):
+            bind_players(self)
+
+    def _alive_list(self, role: str | None) -> list:
+        """按座位顺序返回存活玩家列表；同一存活状态下复用缓存。"""
+        key = (role, self.alive_mask)
+        cached = self._alive_cache.get(key)
+        if cached is None:
+            mask = self.alive_mask if role is None else self.alive_mask & self.role_masks[role]
+            cached = [seat_obj for seat, seat_obj in enumerate(self.seats) if mask >> seat & 1]
+            self._alive_cache[key] = cached
+        return cached
+
+    @property
+    def current_alive(self) -> list:
+        """当前存活角色对象列表"""
+        return self._alive_list(None)
+
+    @property
+    def werewolves(self) -> list:
+        """存活狼人角色对象列表"""
+        return self._alive_list("werewolf")
+
+    @property
+    def villagers(self) -> list:
+        """存活村民角色对象列表"""
+        return self._alive_list("villager")
+
+    @property
+    def seer(self) -> list:
+        """存活预言家角色对象列表"""
+        return self._alive_list("seer")
+
+    @property
+    def hunter(self) -> list:
+        """存活猎人角色对象列表"""
+        return self._alive_list("hunter")
+
+    @property
+    def witch(self) -> list:
+        """存活女巫角色对象列表"""
+        return self._alive_list("witch")
+
+    def is_alive(self, player_name: str) -> bool:
+        """判断玩家是否存活。"""
+        seat = self.seat_of.get(player_name)
+        return seat is not None and bool(self.alive_mask >> seat & 1)
+
+    @property
+    def impressions(self) -> dict[str, dict[str, str]]:
+        """完整印象映射 {player: {other: impression}}（按需构建的副本）。"""
+        names = [seat_obj.name for seat_obj in self.seats]
+        return {
+            names[i]: {
+                names[j]: self._impressions.get((i, j), DEFAULT_IMPRESSION)
+                for j in range(len(names)) if j != i
+            }
+            for i in range(len(names))
+        }
 
     def get_knowledge(self, player_name: str) -> str:
         """返回指定玩家的长期游戏理解文本。"""
@@ -220,8 +272,7 @@ class Players:
     def get_werewolf_team_status(self) -> list[tuple[str, bool]]:
         """返回所有狼人及其存活状态列表。"""
         wolves = self.role_to_names.get("werewolf", [])
-        alive_names = {role.name for role in self.current_alive}
-        return [(name, name in alive_names) for name in wolves]
+        return [(name, self.is_alive(name)) for name in wolves]
 
     def export_all_knowledge(self) -> dict[str, str]:
         """返回所有玩家知识条目的浅拷贝。"""
@@ -229,24 +280,14 @@ class Players:
 
     def update_players(self, dead_players: list[str]) -> None:
         """根据死亡名单更新存活玩家列表。"""
-        # 标记角色对象为死亡
         for name in dead_players:
-            if name and name in self.name_to_role_obj:
+            seat = self.seat_of.get(name) if name else None
+            if seat is None:
+                continue
+            # 标记角色对象为死亡
+            if name in self.name_to_role_obj:
                 self.name_to_role_obj[name].kill()
-
-        # 更新存活列表
-        self.werewolves = [
-            _ for _ in self.werewolves if _.name not in dead_players
-        ]
-        self.villagers = [
-            _ for _ in self.villagers if _.name not in dead_players
-        ]
-        self.seer = [_ for _ in self.seer if _.name not in dead_players]
-        self.hunter = [_ for _ in self.hunter if _.name not in dead_players]
-        self.witch = [_ for _ in self.witch if _.name not in dead_players]
-        self.current_alive = [
-            _ for _ in self.current_alive if _.name not in dead_players
-        ]
+            self.alive_mask &= ~(1 << seat)
 
     def get_impressions(self, player_name: str, alive_only: bool = True) -> dict[str, str]:
         """获取指定玩家的印象映射。
@@ -255,27 +296,34 @@ class Players:
             player_name: 玩家名称
             alive_only: 是否仅返回当前存活玩家
         """
-        impression_map = self.impressions.get(player_name, {}).copy()
-        if alive_only:
-            alive_names = {
-                _.name for _ in self.current_alive if _.name != player_name}
-            impression_map = {
-                name: imp for name, imp in impression_map.items() if name in alive_names
-            }
-        return impression_map
+        seat = self.seat_of.get(player_name)
+        if seat is None:
+            return {}
+        mask = self.alive_mask if alive_only else (1 << len(self.seats)) - 1
+        mask &= ~(1 << seat)
+        return {
+            seat_obj.name: self._impressions.get((seat, other), DEFAULT_IMPRESSION)
+            for other, seat_obj in enumerate(self.seats)
+            if mask >> other & 1
+        }
 
     def apply_impression_updates(self, player_name: str, updates: dict[str, str]) -> None:
         """为指定玩家应用印象更新。
 
         Args:
             player_name: 更新人
-            updates: {other_player: impression}
+            updates: {other_player: impression}，未知玩家名会被忽略
         """
         if not updates:
             return
-        if player_name not in self.impressions:
+        seat = self.seat_of.get(player_name)
+        if seat is None:
             return
-        self.impressions[player_name].update(updates)
+        for other_name, impression in updates.items():
+            other = self.seat_of.get(other_name)
+            if other is None or other == seat:
+                continue
+            self._impressions[(seat, other)] = impression
 
     def print_roles(self) -> None:
         """打印所有玩家的角色信息。"""
@@ -283,6 +331,17 @@ class Players:
         for name, role in self.name_to_role.items():
             print(f" - {name}: {role}")
 
+    def winner(self) -> str | None:
+        """当前局面的胜方（werewolf / village），未分胜负时为 None。"""
+
+        # 屠边规则：狼人存活且神职或平民一侧被清空即可胜利；好人胜利条件仍为清空所有狼人
+        return check_winner(
+            n_werewolves=len(self.werewolves),
+            n_villagers=len(self.villagers),
+            n_gods=len(self.seer) + len(self.hunter) + len(self.witch),
+            n_alive=len(self.current_alive),
+        )
+
     def check_winning(self) -> str | None:
         """检查胜负条件，满足则返回胜利文案。"""
 
@@ -295,25 +354,15 @@ class Players:
             f'and {names_to_str(self.role_to_names["witch"])} is the witch.'
         )
 
-        # 屠边规则：狼人存活且神职或平民一侧被清空即可胜利；好人胜利条件仍为清空所有狼人
-        villagers_remaining = len(self.villagers)
-        gods_remaining = len(self.seer) + len(self.hunter) + len(self.witch)
-
-        if self.werewolves and (gods_remaining == 0 or villagers_remaining == 0):
-            return Prompts.to_all_wolf_win.format(
-                n_alive=len(self.current_alive),
-                n_werewolves=len(self.werewolves),
-                true_roles=true_roles,
-            )
-
-        if len(self.werewolves) * 2 >= len(self.current_alive):
+        winner = self.winner()
+        if winner == "werewolf":
             return Prompts.to_all_wolf_win.format(
                 n_alive=len(self.current_alive),
                 n_werewolves=len(self.werewolves),
                 true_roles=true_roles,
             )
 
-        if self.current_alive and not self.werewolves:
+        if winner == "village":
             return Prompts.to_all_village_win.format(
                 true_roles=true_roles,
             )
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""启动预热：并行连通所有已配置的模型端点，并记录每个端点的就绪状态与延迟。
+
+首局游戏的第一次调用往往要承担 TLS 握手、Ollama 加载模型等冷启动开销；
+在服务启动时先发一次极小的请求，可以把这部分开销挪出对局。
+
+模型 SDK（经 core.model_factory 引入）在预热开始时才导入，
+/health 读取 warmup_status 不会触发它们的加载。
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any
+
+from config import config
+from core.metrics import metrics
+
+
+_PING = [{"role": "user", "content": "ping"}]
+
+
+class WarmupStatus:
+    """各端点预热结果，供 /health 读取（跨线程访问加锁）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.state = "pending"
+        self.endpoints: dict[str, dict[str, Any]] = {}
+
+    def update(self, label: str, **fields: Any) -> None:
+        with self._lock:
+            self.endpoints.setdefault(label, {}).update(fields)
+
+    def set_state(self, state: str) -> None:
+        with self._lock:
+            self.state = state
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "endpoints": {k: dict(v) for k, v in self.endpoints.items()},
+            }
+
+
+# 全局预热状态
+warmup_status = WarmupStatus()
+
+
+async def _ping(model_cfg: dict[str, str] | None) -> None:
+    """向端点发送一次只生成极少 token 的请求。"""
+
+    from core.model_factory import build_chat_model
+
+    provider = config.model_provider
+    model = build_chat_model(model_cfg, stream=False)
+    if provider == "ollama":
+        # 加载模型并按 keep_alive 常驻，只生成 1 个 token
+        await model(_PING, options={"num_predict": 1})
+    else:
+        await model(_PING, max_tokens=1)
+
+
+async def _warm_one(model_cfg: dict[str, str] | None) -> None:
+    from core.model_factory import endpoint_label
+
+    label = endpoint_label(model_cfg)
+    warmup_status.update(label, ready=False, state="warming")
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(_ping(model_cfg), config.warmup_timeout)
+    except Exception as exc:  # noqa: BLE001
+        elapsed = time.perf_counter() - start
+        warmup_status.update(
+            label,
+            ready=False,
+            state="error",
+            latencyMs=round(elapsed * 1000),
+            error=str(exc) or type(exc).__name__,
+        )
+        metrics.set_gauge("endpoint_ready", False, endpoint=label)
+        print(f"⚠️ 预热失败: {label} ({exc})")
+        return
+
+    elapsed = time.perf_counter() - start
+    warmup_status.update(label, ready=True, state="ready", latencyMs=round(elapsed * 1000), error=None)
+    metrics.set_gauge("endpoint_ready", True, endpoint=label)
+    metrics.observe("warmup_seconds", elapsed, endpoint=label)
+    print(f"✓ 预热完成: {label} ({elapsed:.2f}s)")
+
+
+async def warmup_models() -> dict[str, Any]:
+    """并行预热所有端点，返回预热结果快照。"""
+
+    is_valid, error_msg = config.validate()
+    if not is_valid:
+        warmup_status.set_state("skipped")
+        warmup_status.update("config", ready=False, state="error", error=error_msg)
+        return warmup_status.snapshot()
+
+    warmup_status.set_state("warming")
+    # 首次导入模型 SDK 需要约 1 秒，放到线程里，避免阻塞服务的事件循环
+    model_factory = await asyncio.to_thread(importlib.import_module, "core.model_factory")
+    try:
+        targets = model_factory.distinct_model_configs()
+    except ValueError as exc:
+        warmup_status.set_state("skipped")
+        warmup_status.update("config", ready=False, state="error", error=str(exc))
+        return warmup_status.snapshot()
+
+    await asyncio.gather(*(_warm_one(cfg) for cfg in targets))
+    warmup_status.set_state("done")
+    return warmup_status.snapshot()
@@ -3,17 +3,23 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
 
 from agentscope.agent import ReActAgent
 
-from config import config
+from config import ConfigSnapshot, config, config_scope
+from core.bots import is_bot
 from core.knowledge_base import PlayerKnowledgeStore
 from core.game_engine import werewolves_game
+from core.scenario import Scenario, load_scenario
+from core.warmup import warmup_models
 
 # 复用 CLI 入口中的官方 prompt 与 agent 构造函数，
 # 避免在这里重复维护一大段系统提示词。
-from main import get_official_agents  # noqa: E402
+from main import create_player_agent  # noqa: E402
 
 
 @dataclass
@@ -21,6 +27,19 @@ class GameStartResult:
     game_id: str
 
 
+@dataclass
+class PreparedGame:
+    """已准备好、可以立即开始的一局：玩家、知识库与身份分配都已就绪。"""
+
+    game_id: str
+    agents: list[ReActAgent]
+    player_model_map: dict[str, str]
+    knowledge_store: PlayerKnowledgeStore
+    scenario: Scenario | None
+    config: ConfigSnapshot
+    prepare_seconds: float = 0.0
+
+
 def _model_label(provider: str, cfg: dict[str, str] | None) -> str:
     if provider == "openai" and cfg:
         return f"openai: {cfg.get('model_name', '')}"
@@ -32,54 +51,126 @@ def _model_label(provider: str, cfg: dict[str, str] | None) -> str:
 
 
 def create_players() -> tuple[list[ReActAgent], dict[str, str]]:
-    """创建 9 名玩家并返回 (agents, player_model_map)。"""
+    """创建 PLAYER_COUNT 名玩家并返回 (agents, player_model_map)。"""
 
+    n_players = config.player_count
     model_overrides = (
         config.openai_player_configs if config.model_provider == "openai" else [
-            None] * 9
+            None] * n_players
     )
 
     agents = [
-        get_official_agents(f"Player{idx + 1}", model_overrides[idx]) for idx in range(9)
+        create_player_agent(idx, model_overrides[idx]) for idx in range(n_players)
     ]
 
     player_model_map = {
-        player.name: _model_label(config.model_provider, model_overrides[idx])
+        player.name: (
+            player.strategy.label() if is_bot(player)
+            else _model_label(config.model_provider, model_overrides[idx])
+        )
         for idx, player in enumerate(agents)
     }
 
     return agents, player_model_map
 
 
-def create_knowledge_store(player_model_map: dict[str, str]) -> PlayerKnowledgeStore:
-    """为本局创建并落盘一个空的知识库（经验存档）。"""
+def create_knowledge_store(
+    player_model_map: dict[str, str],
+    game_id: str | None = None,
+) -> PlayerKnowledgeStore:
+    """为本局创建并落盘一个空的知识库（经验存档），给定 game_id 时以其命名。"""
 
     store = PlayerKnowledgeStore(
         checkpoint_dir=config.experience_dir,
         base_filename=config.experience_id,
+        session_suffix=game_id,
     )
     store.set_player_models(player_model_map)
     store.save()
     return store
 
 
-async def run_game_session(*, game_id: str, event_sink=None, stop_event=None) -> tuple[str, str]:
-    """运行完整的一局游戏并返回 (log_path, experience_path)。"""
-
-    is_valid, error_msg = config.validate()
+async def prepare_game_session(
+    *,
+    game_id: str,
+    deal: bool = True,
+    warm: bool = False,
+    overrides: Mapping[str, Any] | None = None,
+) -> PreparedGame:
+    """准备一局游戏：取配置快照，创建玩家与知识库、分配身份，可选预热模型端点。
+
+    Args:
+        deal: 未配置 SCENARIO 时是否提前随机分配身份（否则由引擎开局时分配）
+        warm: 是否预热所有已配置的模型端点
+        overrides: 本局覆盖的配置项（.env 键名 -> 值），只对本局生效
+    """
+
+    try:
+        snapshot = config.snapshot(overrides)
+    except ValueError as exc:
+        raise RuntimeError(f"配置错误: {exc}") from exc
+    is_valid, error_msg = snapshot.validate()
     if not is_valid:
         raise RuntimeError(f"配置错误: {error_msg}")
 
-    agents, player_model_map = create_players()
-    knowledge_store = create_knowledge_store(player_model_map)
-
-    log_path, experience_path = await werewolves_game(
-        agents,
-        knowledge_store=knowledge_store,
-        player_model_map=player_model_map,
+    start = time.perf_counter()
+    with config_scope(snapshot):
+        agents, player_model_map = create_players()
+        knowledge_store = create_knowledge_store(player_model_map, game_id=game_id)
+        try:
+            if config.scenario:
+                scenario = load_scenario(config.scenario)
+            elif deal:
+                scenario = Scenario.deal(
+                    game_id, [agent.name for agent in agents], config.role_composition)
+            else:
+                scenario = None
+            if warm:
+                await warmup_models()
+        except BaseException:
+            # 准备失败或被取消（如连续对局已停止）时删除已落盘的空经验存档
+            Path(knowledge_store.path).unlink(missing_ok=True)
+            raise
+
+    return PreparedGame(
         game_id=game_id,
-        event_sink=event_sink,
-        stop_event=stop_event,
+        agents=agents,
+        player_model_map=player_model_map,
+        knowledge_store=knowledge_store,
+        scenario=scenario,
+        config=snapshot,
+        prepare_seconds=time.perf_counter() - start,
     )
 
-    return log_path, experience_path
+
+async def run_prepared_game(
+    prepared: PreparedGame,
+    *,
+    event_sink=None,
+    stop_event=None,
+) -> tuple[str, str]:
+    """在准备时取得的配置快照下运行已准备好的一局，返回 (log_path, experience_path)。"""
+
+    with config_scope(prepared.config):
+        return await werewolves_game(
+            prepared.agents,
+            knowledge_store=prepared.knowledge_store,
+            player_model_map=prepared.player_model_map,
+            game_id=prepared.game_id,
+            event_sink=event_sink,
+            stop_event=stop_event,
+            scenario=prepared.scenario,
+        )
+
+
+async def run_game_session(
+    *,
+    game_id: str,
+    event_sink=None,
+    stop_event=None,
+    overrides: Mapping[str, Any] | None = None,
+) -> tuple[str, str]:
+    """运行完整的一局游戏并返回 (log_path, experience_path)。"""
+
+    prepared = await prepare_game_session(game_id=game_id, deal=False, overrides=overrides)
+    return await run_prepared_game(prepared, event_sink=event_sink, stop_event=stop_event)
@@ -6,22 +6,28 @@ from pathlib import Path
 
 try:
     from .core.game_engine import werewolves_game 
+    from .core.http_pool import aclose_clients
     from .core.knowledge_base import PlayerKnowledgeStore  
+    from .core.model_factory import build_chat_model, build_formatter
+    from .core.bots import BotStrategy, HeuristicAgent, is_bot
+    from .core.scenario import load_scenario
     from .config import config 
 except Exception:
     from core.game_engine import werewolves_game
+    from core.http_pool import aclose_clients
     from core.knowledge_base import PlayerKnowledgeStore
+    from core.model_factory import build_chat_model, build_formatter
+    from core.bots import BotStrategy, HeuristicAgent, is_bot
+    from core.scenario import load_scenario
     from config import config
 from analysis.pipeline import run_analysis
 
 from agentscope.agent import ReActAgent
-from agentscope.formatter import DashScopeMultiAgentFormatter, OpenAIMultiAgentFormatter, OllamaMultiAgentFormatter
-from agentscope.model import DashScopeChatModel, OpenAIChatModel, OllamaChatModel
 from agentscope.session import JSONSession
 
 prompt = """
 你是一个名为{name}的狼人杀游戏玩家。
-# 狼人杀游戏规则（标准9人局）
+# 狼人杀游戏规则（{n_players}人局）
 
 ## 游戏概述
 狼人杀是一个**阵营对抗的社交推理游戏**。玩家分为狼人阵营和好人阵营，在黑夜与白天的交替中进行博弈。
@@ -29,8 +35,8 @@ prompt = """
 ### 阵营构成
 | 阵营 | 人数 | 角色 | 能力 |
 |------|------|------|------|
-| **狼人阵营** | 3人 | 狼人 | 夜间协商击杀一名玩家 |
-| **好人阵营** | 6人 | 预言家 | 夜间查验一名玩家的阵营（狼人/好人） |
+| **狼人阵营** | {n_werewolves}人 | 狼人 | 夜间协商击杀一名玩家 |
+| **好人阵营** | {n_good}人 | 预言家 | 夜间查验一名玩家的阵营（狼人/好人） |
 |  |  | 女巫 | 拥有解药（救人）和毒药（杀人）各一次 |
 |  |  | 猎人 | 死亡时可开枪带走一名玩家（被女巫毒杀除外） |
 |  |  | 村民 | 无特殊能力，依靠逻辑推理找出狼人 |
@@ -97,10 +103,10 @@ prompt = """
 
 ### 狼人阵营胜利（满足任一）：
 1. **屠神路线**：所有神职（预言家、女巫、猎人）死亡
-2. **屠民路线**：所有平民（3名村民）死亡
+2. **屠民路线**：所有平民（{n_villagers}名村民）死亡
 
 ### 好人阵营胜利：
-- 所有狼人（3人）被放逐或毒杀
+- 所有狼人（{n_werewolves}人）被放逐或毒杀
 
 ## 游戏结束
 - 当任一胜利条件达成时，游戏立即结束
@@ -115,59 +121,49 @@ prompt = """
 """
 
 
+def format_rules_prompt(name: str) -> str:
+    """按当前角色配置填充规则提示词。"""
+
+    composition = config.role_composition
+    n_players = sum(composition.values())
+    n_werewolves = composition.get("werewolf", 0)
+    return prompt.format(
+        name=name,
+        n_players=n_players,
+        n_werewolves=n_werewolves,
+        n_good=n_players - n_werewolves,
+        n_villagers=composition.get("villager", 0),
+    )
+
+
 def get_official_agents(
     name: str,
     model_cfg: dict[str, str] | None = None,
 ) -> ReActAgent:
     """根据配置获取官方狼人杀代理，可指定模型/密钥/基址覆盖。"""
 
-    # 根据配置选择模型
-    if config.model_provider == "dashscope":
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=DashScopeChatModel(
-                api_key=config.dashscope_api_key,
-                model_name=config.dashscope_model_name,
-            ),
-            formatter=DashScopeMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    elif config.model_provider == "openai":
-        cfg = model_cfg or {
-            "api_key": config.openai_api_key,
-            "base_url": config.openai_base_url,
-            "model_name": config.openai_model_name,
-        }
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=OpenAIChatModel(
-                api_key=cfg.get("api_key"),
-                model_name=cfg.get("model_name"),
-                client_args={
-                    "base_url": cfg.get("base_url"),
-                },
-            ),
-            formatter=OpenAIMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    elif config.model_provider == "ollama":
-        agent = ReActAgent(
-            name=name,
-            sys_prompt=prompt.format(name=name),
-            model=OllamaChatModel(
-                model_name=config.ollama_model_name,
-            ),
-            formatter=OllamaMultiAgentFormatter(),
-            print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
-        )
-    else:
-        raise ValueError(f"不支持的模型提供商: {config.model_provider}")
+    # 根据配置选择模型（不支持的提供商会抛出 ValueError）
+    agent = ReActAgent(
+        name=name,
+        sys_prompt=format_rules_prompt(name),
+        model=build_chat_model(model_cfg),
+        formatter=build_formatter(incremental=config.incremental_formatter),
+        print_hint_msg=False,  # 禁用提示信息打印，避免重复输出
+    )
 
     return agent
 
 
+def create_player_agent(idx: int, model_cfg: dict[str, str] | None = None):
+    """创建第 idx 号座位（从 0 开始）的玩家；BOT_SEATS 中的座位由规则型机器人接管。"""
+
+    name = f"Player{idx + 1}"
+    if idx + 1 in config.bot_seats:
+        seed = None if config.bot_seed is None else config.bot_seed + idx
+        return HeuristicAgent(name, BotStrategy.from_config(), seed=seed)
+    return get_official_agents(name, model_cfg)
+
+
 async def main() -> None:
     """The main entry point for the werewolf game."""
 
@@ -190,16 +186,17 @@ async def main() -> None:
         )
         print(f"✓ AgentScope Studio 已启用: {config.studio_url}")
 
-    # 准备 9 名玩家（可在此修改名字/模型）
-    print("\n正在创建 9 个玩家...")
+    # 准备玩家（人数由 PLAYER_COUNT 决定，可在此修改名字/模型）
+    n_players = config.player_count
+    print(f"\n正在创建 {n_players} 个玩家...")
     model_overrides = (
         config.openai_player_configs
         if config.model_provider == "openai"
-        else [None] * 9
+        else [None] * n_players
     )
     players = [
-        get_official_agents(f"Player{idx + 1}", model_overrides[idx])
-        for idx in range(9)
+        create_player_agent(idx, model_overrides[idx])
+        for idx in range(n_players)
     ]
     print("✓ 玩家创建完成\n")
 
@@ -214,7 +211,10 @@ async def main() -> None:
         return provider
 
     player_model_map = {
-        player.name: _model_label(config.model_provider, model_overrides[idx])
+        player.name: (
+            player.strategy.label() if is_bot(player)
+            else _model_label(config.model_provider, model_overrides[idx])
+        )
         for idx, player in enumerate(players)
     }
 
@@ -242,10 +242,14 @@ async def main() -> None:
     print("🎮 游戏开始！")
     print("=" * 50 + "\n")
 
+    scenario = load_scenario(config.scenario) if config.scenario else None
+    if scenario is not None:
+        print(f"✓ {scenario.describe()}")
     log_path, experience_path = await werewolves_game(
         players,
         knowledge_store=knowledge_store,
         player_model_map=player_model_map,
+        scenario=scenario,
     )
 
     # 将最新状态保存到检查点
@@ -270,6 +274,7 @@ async def main() -> None:
         except Exception as e:
             print(f"❌ 分析报告生成失败: {e}")
 
+    await aclose_clients()
     print("\n游戏结束！")
 
 
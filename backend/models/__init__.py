@@ -12,6 +12,7 @@ try:
         WitchResurrectModel,
         get_vote_model,
         get_poison_model,
+        get_witch_model,
         get_seer_model,
         get_hunter_model,
     )
@@ -26,6 +27,7 @@ except Exception:  # noqa: BLE001
         WitchResurrectModel,
         get_vote_model,
         get_poison_model,
+        get_witch_model,
         get_seer_model,
         get_hunter_model,
     )
@@ -46,6 +48,7 @@ __all__ = [
     "WitchResurrectModel",
     "get_vote_model",
     "get_poison_model",
+    "get_witch_model",
     "get_seer_model",
     "get_hunter_model",
 ]
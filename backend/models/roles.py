@@ -6,42 +6,78 @@ from abc import ABC, abstractmethod
 from agentscope.agent import ReActAgent
 from agentscope.message import Msg
 
+from config import config
 from prompts.role_prompts import RolePrompts
+from core.budget import charge_call
+from core.metrics import metrics
+from core.ephemeral import prompt_chars, with_ephemeral_context
+from core.resilience import call_model
+from core.rules import poison_target_allowed, witch_can_save
 try:
     from .schemas import (  # type: ignore
         BaseDecision,
         DiscussionModel,
         get_vote_model,
-        get_poison_model,
-        WitchResurrectModel,
+        get_witch_model,
         get_seer_model,
         get_hunter_model,
+        compact_model,
+        schema_chars,
     )
 except Exception:  # noqa: BLE001
     from models.schemas import (
         BaseDecision,
         DiscussionModel,
         get_vote_model,
-        get_poison_model,
-        WitchResurrectModel,
+        get_witch_model,
         get_seer_model,
         get_hunter_model,
+        compact_model,
+        schema_chars,
     )
 
 
 class BaseRole(ABC):
-    """角色基类"""
+    """角色基类（使用 __slots__，大规模模拟时减少每个角色对象的内存占用）"""
+
+    __slots__ = ("agent", "role_name", "is_alive", "prompt_chars",
+                 "schema_calls", "schema_chars_saved")
 
     def __init__(self, agent: ReActAgent, role_name: str):
         self.agent = agent
         self.role_name = role_name
         self.is_alive = True
+        self.prompt_chars = 0  # 累计发送给模型的提示字符数
+        self.schema_calls = 0  # 精简 schema 模式下的结构化调用次数
+        self.schema_chars_saved = 0  # 精简 schema 累计减少的 schema 字符数
 
     @property
     def name(self) -> str:
         """获取玩家名称"""
         return self.agent.name
 
+    async def ask(self, prompt: Msg, structured_model=None) -> Msg:
+        """调用智能体（带重试与熔断），所有角色动作都经由此处"""
+        chars = 0
+        if getattr(self.agent, "model", None) is not None:
+            if structured_model is not None and config.compact_schema:
+                compact = compact_model(structured_model)
+                saved = schema_chars(structured_model) - schema_chars(compact)
+                self.schema_calls += 1
+                self.schema_chars_saved += saved
+                metrics.incr("schema_chars_saved", saved)
+                structured_model = compact
+            chars = prompt_chars(self.agent, prompt)
+            # 提示规模按逻辑调用统计一次（每轮 round_prompt_chars 用它观察增长趋势）
+            self.prompt_chars += chars
+
+        def _charge(reply: Msg | None) -> None:
+            # 预算按实际发出的请求计费：重试与被取消的推测草稿同样消耗了提示 token
+            charge_call(chars, reply)
+
+        return await call_model(
+            self.agent, prompt, structured_model, on_attempt=_charge if chars else None)
+
     @abstractmethod
     async def night_action(self, game_state: dict) -> dict:
         """夜晚行动 - 每个角色需要实现自己的夜晚行为"""
@@ -50,9 +86,8 @@ class BaseRole(ABC):
     async def day_discussion(self, prompt: Msg, context: str | None = None) -> Msg:
         """白天讨论 - 所有角色共用"""
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+            prompt = with_ephemeral_context(prompt, context)
+        return await self.ask(
             prompt,
             structured_model=BaseDecision,
         )
@@ -65,9 +100,8 @@ class BaseRole(ABC):
     ) -> Msg:
         """投票 - 所有角色共用"""
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+            prompt = with_ephemeral_context(prompt, context)
+        return await self.ask(
             prompt,
             structured_model=get_vote_model(alive_players),
         )
@@ -89,11 +123,14 @@ class BaseRole(ABC):
             "witch": RolePrompts.witch_instruction,
             "hunter": RolePrompts.hunter_instruction,
         }
-        return prompts.get(self.role_name, "")
+        instruction = prompts.get(self.role_name, "")
+        if instruction and config.compact_schema:
+            instruction += RolePrompts.schema_guide
+        return instruction
 
     async def leave_last_words(self, prompt: Msg) -> Msg:
         """发表遗言"""
-        return await self.agent(
+        return await self.ask(
             prompt,
             structured_model=BaseDecision,
         )
@@ -102,6 +139,8 @@ class BaseRole(ABC):
 class Werewolf(BaseRole):
     """狼人角色"""
 
+    __slots__ = ()
+
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "werewolf")
 
@@ -112,9 +151,8 @@ class Werewolf(BaseRole):
     async def discuss_with_team(self, prompt: Msg, context: str | None = None) -> Msg:
         """狼人团队讨论"""
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+            prompt = with_ephemeral_context(prompt, context)
+        return await self.ask(
             prompt,
             structured_model=DiscussionModel,
         )
@@ -127,9 +165,8 @@ class Werewolf(BaseRole):
     ) -> Msg:
         """狼人团队投票选择击杀目标"""
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-        return await self.agent(
+            prompt = with_ephemeral_context(prompt, context)
+        return await self.ask(
             prompt,
             structured_model=get_vote_model(
                 alive_players, allow_abstain=False),
@@ -139,6 +176,8 @@ class Werewolf(BaseRole):
 class Villager(BaseRole):
     """村民角色"""
 
+    __slots__ = ()
+
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "villager")
 
@@ -150,6 +189,8 @@ class Villager(BaseRole):
 class Seer(BaseRole):
     """预言家角色"""
 
+    __slots__ = ("checked_players", "known_identities")
+
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "seer")
         self.checked_players = []  # 记录已查验的玩家
@@ -168,10 +209,9 @@ class Seer(BaseRole):
         )
 
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
+            prompt = with_ephemeral_context(prompt, context)
 
-        msg_seer = await self.agent(
+        msg_seer = await self.ask(
             prompt,
             structured_model=get_seer_model(alive_players),
         )
@@ -213,6 +253,8 @@ class Seer(BaseRole):
 class Witch(BaseRole):
     """女巫角色"""
 
+    __slots__ = ("has_healing", "has_poison")
+
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "witch")
         self.has_healing = True  # 是否还有解药
@@ -227,61 +269,58 @@ class Witch(BaseRole):
 
         result = {}
 
-        # 女巫毒药不能对已被狼人击杀的目标再次使用
+        # 用药规则与模拟器共用（core.rules）：不能自救，不能毒已被狼人击杀的目标
         poison_candidates = [
-            player for player in alive_players if player.name != killed_player
+            player for player in alive_players
+            if poison_target_allowed(player.name, killed_player)
         ]
 
-        # 解药环节
-        if self.has_healing and killed_player and killed_player != self.name:
-            prompt = await moderator(
-                f"[{self.name} ONLY] {self.name}，你是女巫。"
-                f"今晚 {killed_player} 被狼人杀死了。你要使用解药救他/她吗？"
-            )
-
-            if context:
-                prompt = Msg(
-                    prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-
-            msg_resurrect = await self.agent(
-                prompt,
-                structured_model=WitchResurrectModel,
-            )
-
-            result["resurrect_speech"] = msg_resurrect.metadata.get("speech")
-            result["resurrect_behavior"] = msg_resurrect.metadata.get(
-                "behavior")
-            result["resurrect_thought"] = msg_resurrect.metadata.get("thought")
-
-            if msg_resurrect.metadata.get("resurrect"):
-                self.has_healing = False
-                result["resurrect"] = killed_player
+        can_resurrect = bool(witch_can_save(
+            self.has_healing, bool(killed_player), killed_player, self.name))
+        can_poison = bool(self.has_poison and poison_candidates)
+        if not can_resurrect and not can_poison:
+            return result
 
-        # 毒药环节（如果本回合没有使用解药且存在可毒杀目标）
-        if self.has_poison and not result.get("resurrect") and poison_candidates:
-            prompt = await moderator(
-                f"[{self.name} ONLY] {self.name}，你要使用毒药吗？"
+        # 解药与毒药合并为一次调用，两段提示共享同一份上下文
+        lines = [f"[{self.name} ONLY] {self.name}，你是女巫。"]
+        if can_resurrect:
+            lines.append(f"今晚 {killed_player} 被狼人杀死了。你要使用解药救他/她吗？")
+        if can_poison:
+            lines.append(
+                "你要使用毒药吗？"
                 f"当前可毒杀的存活玩家（不含被狼人击杀者）：{', '.join([p.name for p in poison_candidates])}"
             )
+        if can_resurrect and can_poison:
+            lines.append("注意：同一晚不能同时使用解药和毒药。")
+        prompt = await moderator("\n".join(lines))
 
-            if context:
-                prompt = Msg(
-                    prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
-
-            msg_poison = await self.agent(
-                prompt,
-                structured_model=get_poison_model(poison_candidates),
-            )
-
-            result["poison_speech"] = msg_poison.metadata.get("speech")
-            result["poison_behavior"] = msg_poison.metadata.get("behavior")
-            result["poison_thought"] = msg_poison.metadata.get("thought")
+        if context:
+            prompt = with_ephemeral_context(prompt, context)
 
-            if msg_poison.metadata.get("poison"):
-                poisoned_name = msg_poison.metadata.get("name")
-                if poisoned_name:
-                    self.has_poison = False
-                    result["poison"] = poisoned_name
+        msg = await self.ask(
+            prompt,
+            structured_model=get_witch_model(
+                poison_candidates, can_resurrect, can_poison),
+        )
+        metadata = msg.metadata or {}
+
+        # 两个环节共用同一份决策说明，分别写入以保持日志格式不变
+        for phase, offered in (("resurrect", can_resurrect), ("poison", can_poison)):
+            if offered:
+                result[f"{phase}_speech"] = metadata.get("speech")
+                result[f"{phase}_behavior"] = metadata.get("behavior")
+                result[f"{phase}_thought"] = metadata.get("thought")
+
+        if can_resurrect and metadata.get("resurrect"):
+            self.has_healing = False
+            result["resurrect"] = killed_player
+
+        # 同一晚已使用解药时忽略毒药决定
+        if can_poison and not result.get("resurrect") and metadata.get("poison"):
+            poisoned_name = metadata.get("name")
+            if poisoned_name:
+                self.has_poison = False
+                result["poison"] = poisoned_name
 
         return result
 
@@ -289,6 +328,8 @@ class Witch(BaseRole):
 class Hunter(BaseRole):
     """猎人角色"""
 
+    __slots__ = ("has_shot",)
+
     def __init__(self, agent: ReActAgent):
         super().__init__(agent, "hunter")
         self.has_shot = True  # 是否还有开枪机会
@@ -308,10 +349,9 @@ class Hunter(BaseRole):
         )
 
         if context:
-            prompt = Msg(
-                prompt.name, f"{prompt.content}\n\n{context}", role=prompt.role)
+            prompt = with_ephemeral_context(prompt, context)
 
-        msg_hunter = await self.agent(
+        msg_hunter = await self.ask(
             prompt,
             structured_model=get_hunter_model(alive_players),
         )
@@ -351,4 +391,9 @@ class RoleFactory:
         if not role_class:
             raise ValueError(f"未知角色类型: {role_name}")
 
-        return role_class(agent)
+        role_obj = role_class(agent)
+        # 机器人玩家需要读取自己的角色状态（如预言家查验结果）
+        bind_role = getattr(agent, "bind_role", None)
+        if callable(bind_role):
+            bind_role(role_obj)
+        return role_obj
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 """狼人杀游戏使用的结构化输出模型。"""
-from typing import Literal
+import json
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from agentscope.agent import AgentBase
 
 
@@ -115,6 +116,31 @@ def get_poison_model(agents: list[AgentBase]) -> type[BaseModel]:
     return WitchPoisonModel
 
 
+def get_witch_model(
+    agents: list[AgentBase],
+    can_resurrect: bool = True,
+    can_poison: bool = True,
+) -> type[BaseModel]:
+    """生成女巫一次性决策模型（解药与毒药在同一次调用中决定）。
+
+    Args:
+        agents: 可被毒杀的玩家列表
+        can_resurrect: 本晚是否可以使用解药
+        can_poison: 本晚是否可以使用毒药
+    """
+
+    poison_model = get_poison_model(agents)
+    if not can_resurrect:
+        return poison_model
+    if not can_poison:
+        return WitchResurrectModel
+
+    class WitchActionModel(WitchResurrectModel, poison_model):  # type: ignore[misc, valid-type]
+        """女巫夜晚行动的输出模型。同一晚不能同时使用解药和毒药。"""
+
+    return WitchActionModel
+
+
 def get_seer_model(agents: list[AgentBase]) -> type[BaseModel]:
     """根据玩家名字生成预言家模型。"""
 
@@ -143,3 +169,46 @@ def get_hunter_model(agents: list[AgentBase]) -> type[BaseModel]:
         )
 
     return HunterModel
+
+
+# 精简 schema 模式（COMPACT_SCHEMA）：长字段说明改为在角色指令中写一次（RolePrompts.schema_guide），
+# 每次调用的 schema 只保留不超过此长度的短说明（如“是否想要使用毒药”）
+COMPACT_DESCRIPTION_CHARS = 12
+
+
+def _compact_json_schema(schema: dict[str, Any]) -> None:
+    schema.pop("description", None)
+    for prop in schema.get("properties", {}).values():
+        if len(prop.get("description", "")) > COMPACT_DESCRIPTION_CHARS:
+            prop.pop("description")
+
+
+def compact_model(model: type[BaseModel]) -> type[BaseModel]:
+    """返回字段与校验完全相同、但 JSON schema 只带短说明的子类。"""
+
+    return type(
+        model.__name__,
+        (model,),
+        {
+            "__module__": model.__module__,
+            "__doc__": None,
+            "model_config": ConfigDict(json_schema_extra=_compact_json_schema),
+        },
+    )
+
+
+def schema_chars(model: type[BaseModel]) -> int:
+    """结构化输出随每次调用发送的 schema 字符数。
+
+    按 ReActAgent 合并进 generate_response 工具的部分计算：属性与必填项，不含 title。
+    """
+
+    schema = model.model_json_schema()
+    properties = {
+        name: {key: value for key, value in prop.items() if key != "title"}
+        for name, prop in schema.get("properties", {}).items()
+    }
+    return len(json.dumps(
+        {"properties": properties, "required": schema.get("required", [])},
+        ensure_ascii=False,
+    ))
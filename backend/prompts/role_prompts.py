@@ -4,6 +4,14 @@
 
 class RolePrompts:
 
+   # 精简 schema 模式（COMPACT_SCHEMA）下追加到角色指令末尾，代替每次调用 schema 中的长字段说明
+   # 该说明随记忆进入之后的每次调用，保持紧凑（不缩进）才能净节省
+   schema_guide = (
+      "\n【输出字段】thought：私密思考，他人不可见；behavior：无主语的表现描写，会被他人观察，可伪装，"
+      "不写自己的名字；speech：公开发言；impression_updates：玩家名->对其动机、性格、策略、弱点的印象；"
+      "knowledge：可复用的长期经验；vote/name：弃权或不行动时留空。"
+   )
+
    werewolf_instruction = """
       【狼人核心策略】
 
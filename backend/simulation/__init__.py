@@ -0,0 +1,5 @@
+"""规则平衡性的向量化蒙特卡洛模拟（基于 NumPy，不调用大模型）。"""
+
+from .simulator import POLICIES, SimulationPolicy, SimulationResult, run_simulation
+
+__all__ = ["POLICIES", "SimulationPolicy", "SimulationResult", "run_simulation"]
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""CLI 入口：python -m simulation --games 1000000 --players 9 12 --rules edge city"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+def _ensure_backend_on_syspath() -> None:
+    # 当以脚本文件方式执行（run_path）时，sys.path 可能不包含 backend/。
+    backend_dir = Path(__file__).resolve().parent.parent
+    backend_str = str(backend_dir)
+    if backend_str not in sys.path:
+        sys.path.insert(0, backend_str)
+
+
+_ensure_backend_on_syspath()
+
+from core.rules import WIN_RULES, get_composition, parse_composition  # noqa: E402
+from simulation.simulator import POLICIES, run_simulation  # noqa: E402
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Monte Carlo simulation of WolfMind rule balance")
+    p.add_argument("--games", type=int, default=100_000,
+                   help="Games per (composition, rule, policy)")
+    p.add_argument("--players", type=int, nargs="+", default=[9],
+                   help="Board sizes using the built-in compositions")
+    p.add_argument("--composition", action="append", default=[],
+                   help="Custom composition, e.g. werewolf:4,villager:5,seer:1,witch:1,hunter:1")
+    p.add_argument("--rules", nargs="+", default=["edge"], choices=WIN_RULES)
+    p.add_argument("--policy", nargs="+", default=["random"], choices=sorted(POLICIES))
+    p.add_argument("--max-rounds", type=int, default=30)
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--json", default=None, help="Write full results to this JSON file")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    compositions = [get_composition(n) for n in args.players]
+    for raw in args.composition:
+        override = parse_composition(raw)
+        compositions.append(get_composition(sum(override.values()), override))
+
+    results = []
+    header = f"{'人数':>4} {'规则':>5} {'策略':>10} {'狼胜率':>8} {'好人胜率':>8} {'平局':>7} {'均回合':>6} {'P50':>4} {'P90':>4} {'耗时':>7}"
+    print(header)
+    print("-" * len(header))
+    for composition in compositions:
+        for rule in args.rules:
+            for policy in args.policy:
+                start = time.perf_counter()
+                res = run_simulation(
+                    composition,
+                    args.games,
+                    rule=rule,
+                    policy=policy,
+                    max_rounds=args.max_rounds,
+                    seed=args.seed,
+                )
+                elapsed = time.perf_counter() - start
+                data = res.to_dict()
+                data["seconds"] = elapsed
+                results.append(data)
+                print(
+                    f"{res.n_players:>4} {rule:>5} {policy:>10} "
+                    f"{res.wolf_win_rate:>8.2%} {res.village_win_rate:>8.2%} "
+                    f"{data['drawRate']:>7.2%} {res.mean_length:>6.2f} "
+                    f"{data['p50Rounds']:>4} {data['p90Rounds']:>4} {elapsed:>6.1f}s"
+                )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
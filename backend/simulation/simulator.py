@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""向量化的狼人杀昼夜循环模拟器。
+
+以 (局数, 座位) 的数组同时推进大量对局：夜晚狼人击杀、预言家查验、女巫用药、
+猎人开枪，白天放逐投票。胜负判定直接调用 core.rules 中与引擎共用的规则，
+保证模拟结论与真实对局不会因规则实现不同而偏离。
+
+流程上的简化：
+- 白天发言不建模，投票由策略直接给出；平票时在最高票中随机淘汰一人
+  （对应引擎中多轮 PK 仍平票时按顺位淘汰）。
+- 遗言不影响局势，不建模。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from core.rules import (
+    ROLE_NAMES,
+    build_role_list,
+    hunter_can_shoot,
+    poison_target_allowed,
+    village_wins,
+    witch_can_save,
+    wolves_win,
+)
+
+
+WOLF, VILLAGER, SEER, WITCH, HUNTER = (ROLE_NAMES.index(name) for name in (
+    "werewolf", "villager", "seer", "witch", "hunter"))
+
+# 胜者编码
+NO_WINNER, WOLF_WIN, VILLAGE_WIN = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class SimulationPolicy:
+    """模拟中各角色的行为策略。
+
+    Attributes:
+        name: 策略名
+        witch_save: 女巫有解药且有人被刀时使用解药的概率
+        witch_poison: 女巫当晚未救人时使用毒药的概率
+        hunter_shoot: 猎人可开枪时开枪的概率
+        informed: 是否使用信息（预言家查到狼后跳身份，好人跟票查杀，
+            狼人优先刀跳出来的预言家，女巫/猎人优先处理查杀）
+        follow_seer: informed 模式下好人跟随预言家查杀投票的概率
+    """
+
+    name: str
+    witch_save: float = 0.5
+    witch_poison: float = 0.3
+    hunter_shoot: float = 1.0
+    informed: bool = False
+    follow_seer: float = 0.0
+
+
+POLICIES: dict[str, SimulationPolicy] = {
+    "random": SimulationPolicy("random"),
+    "heuristic": SimulationPolicy(
+        "heuristic",
+        witch_save=0.9,
+        witch_poison=0.3,
+        informed=True,
+        follow_seer=0.8,
+    ),
+}
+
+
+@dataclass
+class SimulationResult:
+    """一组（角色配置, 胜利规则, 策略）下的模拟结果。"""
+
+    composition: dict[str, int]
+    rule: str
+    policy: str
+    max_rounds: int
+    games: int = 0
+    wolf_wins: int = 0
+    village_wins: int = 0
+    draws: int = 0
+    length_counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    @property
+    def n_players(self) -> int:
+        return sum(self.composition.values())
+
+    @property
+    def wolf_win_rate(self) -> float:
+        return self.wolf_wins / self.games if self.games else 0.0
+
+    @property
+    def village_win_rate(self) -> float:
+        return self.village_wins / self.games if self.games else 0.0
+
+    def merge(self, winner: np.ndarray, length: np.ndarray) -> None:
+        """累加一个批次的结果。"""
+        self.games += int(winner.size)
+        self.wolf_wins += int((winner == WOLF_WIN).sum())
+        self.village_wins += int((winner == VILLAGE_WIN).sum())
+        self.draws += int((winner == NO_WINNER).sum())
+        counts = np.bincount(length, minlength=self.max_rounds + 1)
+        if self.length_counts.size < counts.size:
+            self.length_counts = np.pad(
+                self.length_counts, (0, counts.size - self.length_counts.size))
+        self.length_counts[: counts.size] += counts
+
+    def length_quantile(self, q: float) -> int:
+        """对局回合数的分位数。"""
+        if not self.games:
+            return 0
+        cumulative = np.cumsum(self.length_counts)
+        return int(np.searchsorted(cumulative, q * self.games))
+
+    @property
+    def mean_length(self) -> float:
+        if not self.games:
+            return 0.0
+        rounds = np.arange(self.length_counts.size)
+        return float((rounds * self.length_counts).sum() / self.games)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "players": self.n_players,
+            "composition": self.composition,
+            "rule": self.rule,
+            "policy": self.policy,
+            "games": self.games,
+            "wolfWinRate": self.wolf_win_rate,
+            "villageWinRate": self.village_win_rate,
+            "drawRate": self.draws / self.games if self.games else 0.0,
+            "meanRounds": self.mean_length,
+            "p50Rounds": self.length_quantile(0.5),
+            "p90Rounds": self.length_quantile(0.9),
+            "roundsHistogram": {
+                str(r): int(c) for r, c in enumerate(self.length_counts) if c
+            },
+        }
+
+
+def _pick(rng: np.random.Generator, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """每局在 mask 为 True 的座位中均匀随机选一个，返回 (座位, 是否有候选)。"""
+    scores = rng.random(mask.shape, dtype=np.float32)
+    scores[~mask] = -1.0
+    return scores.argmax(axis=-1), mask.any(axis=-1)
+
+
+def _prefer(rng: np.random.Generator, preferred: np.ndarray, fallback: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """有优先候选的局从优先候选中选，其余局从 fallback 中选。"""
+    use_preferred = preferred.any(axis=-1)
+    mask = np.where(use_preferred[:, None], preferred, fallback)
+    return _pick(rng, mask)
+
+
+class _Batch:
+    """一批并行推进的对局状态。"""
+
+    def __init__(
+        self,
+        rng: np.random.Generator,
+        roles: np.ndarray,
+        rule: str,
+        policy: SimulationPolicy,
+    ) -> None:
+        self.rng = rng
+        self.roles = roles
+        self.rule = rule
+        self.policy = policy
+        n_games, n_seats = roles.shape
+        self.rows = np.arange(n_games)
+        self.is_wolf = roles == WOLF
+        self.is_villager = roles == VILLAGER
+        self.is_god = ~self.is_wolf & ~self.is_villager
+        self.alive = np.ones((n_games, n_seats), dtype=bool)
+        self.active = np.ones(n_games, dtype=bool)
+        self.winner = np.full(n_games, NO_WINNER, dtype=np.int8)
+        self.length = np.zeros(n_games, dtype=np.int64)
+        self.has_heal = np.ones(n_games, dtype=bool)
+        self.has_poison = np.ones(n_games, dtype=bool)
+        self.checked = np.zeros((n_games, n_seats), dtype=bool)
+        self.known_wolf = np.zeros((n_games, n_seats), dtype=bool)
+        self.seer_claimed = np.zeros(n_games, dtype=bool)
+        self.seat_of = {
+            role: (roles == role).argmax(axis=1) for role in (SEER, WITCH, HUNTER)
+        }
+        self.has_role = {
+            role: (roles == role).any(axis=1) for role in (SEER, WITCH, HUNTER)
+        }
+
+    def _role_alive(self, role: int) -> np.ndarray:
+        return self.has_role[role] & self.alive[self.rows, self.seat_of[role]] & self.active
+
+    def _public_wolves(self) -> np.ndarray:
+        """预言家公开报出、仍存活的狼人。"""
+        return self.known_wolf & self.alive & self.seer_claimed[:, None]
+
+    def _kill(self, games: np.ndarray, seats: np.ndarray) -> None:
+        self.alive[self.rows[games], seats[games]] = False
+
+    def _hunter_shoot(self, triggered: np.ndarray) -> None:
+        """被狼刀或被放逐的猎人开枪。"""
+        shoot = triggered & (self.rng.random(triggered.size) < self.policy.hunter_shoot)
+        if not shoot.any():
+            return
+        fallback = self.alive.copy()
+        fallback[self.rows, self.seat_of[HUNTER]] = False
+        preferred = self._public_wolves() if self.policy.informed else np.zeros_like(fallback)
+        target, has_target = _prefer(self.rng, preferred, fallback)
+        self._kill(shoot & has_target, target)
+
+    def _settle(self, round_num: int) -> None:
+        """用共享规则判定胜负，结束已分胜负的对局。"""
+        alive = self.alive
+        n_wolves = (alive & self.is_wolf).sum(axis=1)
+        n_villagers = (alive & self.is_villager).sum(axis=1)
+        n_gods = (alive & self.is_god).sum(axis=1)
+        n_alive = alive.sum(axis=1)
+        wolf = wolves_win(n_wolves, n_villagers, n_gods, n_alive, self.rule)
+        village = village_wins(n_wolves, n_alive)
+        finished = self.active & (wolf | village)
+        self.winner[finished & wolf] = WOLF_WIN
+        self.winner[finished & ~wolf & village] = VILLAGE_WIN
+        self.length[finished] = round_num
+        self.active &= ~finished
+
+    def night(self) -> None:
+        policy, rng, rows = self.policy, self.rng, self.rows
+
+        # 狼人击杀：informed 时优先刀已跳身份的预言家
+        fallback = self.alive & ~self.is_wolf
+        preferred = np.zeros_like(fallback)
+        if policy.informed:
+            seer_seat = self.seat_of[SEER]
+            preferred[rows, seer_seat] = self.seer_claimed & self.alive[rows, seer_seat]
+        kill, has_kill = _prefer(rng, preferred, fallback)
+        has_kill &= self.active
+
+        # 预言家查验一名未查验过的存活玩家
+        seer_alive = self._role_alive(SEER)
+        check_mask = self.alive & ~self.checked
+        check_mask[rows, self.seat_of[SEER]] = False
+        target, has_target = _pick(rng, check_mask)
+        has_target &= seer_alive
+        self.checked[rows[has_target], target[has_target]] = True
+        found = has_target & self.is_wolf[rows, target]
+        self.known_wolf[rows[found], target[found]] = True
+
+        # 女巫：同一晚不能同时使用两种药；用药合法性与引擎共用 core.rules
+        witch_alive = self._role_alive(WITCH)
+        save = (
+            witch_alive
+            & witch_can_save(self.has_heal, has_kill, kill, self.seat_of[WITCH])
+            & (rng.random(rows.size) < policy.witch_save)
+        )
+        self.has_heal &= ~save
+        kill_target = np.where(has_kill, kill, -1)
+        poison_fallback = self.alive & poison_target_allowed(
+            np.arange(self.alive.shape[1])[None, :], kill_target[:, None])
+        # 策略：女巫不毒自己（规则上允许，但对好人无益）
+        poison_fallback[rows, self.seat_of[WITCH]] = False
+        poison_preferred = self._public_wolves() & poison_fallback if policy.informed else np.zeros_like(poison_fallback)
+        poison_target, has_poison_target = _prefer(rng, poison_preferred, poison_fallback)
+        use_poison = (
+            witch_alive & self.has_poison & ~save & has_poison_target
+            & ((rng.random(rows.size) < policy.witch_poison) | poison_preferred.any(axis=1))
+        )
+        self.has_poison &= ~use_poison
+
+        died_by_wolves = has_kill & ~save
+        self._kill(died_by_wolves, kill)
+        self._kill(use_poison, poison_target)
+
+        # 被狼刀的猎人可以开枪，被毒杀的不能
+        is_hunter = self.has_role[HUNTER]
+        self._hunter_shoot(is_hunter & hunter_can_shoot(
+            died_by_wolves & (self.roles[rows, kill] == HUNTER),
+            False,
+            use_poison & (self.roles[rows, poison_target] == HUNTER),
+        ))
+
+    def day(self) -> None:
+        policy, rng, rows = self.policy, self.rng, self.rows
+        n_games, n_seats = self.alive.shape
+
+        # 预言家查到狼人后起跳公布
+        if policy.informed:
+            self.seer_claimed |= self._role_alive(SEER) & (self.known_wolf & self.alive).any(axis=1)
+
+        # 每名存活玩家投给一名其他存活玩家
+        ballot = np.broadcast_to(self.alive[:, None, :], (n_games, n_seats, n_seats)).copy()
+        ballot[:, np.arange(n_seats), np.arange(n_seats)] = False
+        if policy.informed:
+            # 狼人不投队友
+            ballot &= ~(self.is_wolf[:, :, None] & self.is_wolf[:, None, :])
+        votes, has_vote = _pick(rng, ballot)
+
+        if policy.informed:
+            public_target, has_public = _pick(rng, self._public_wolves())
+            follow = (
+                has_public[:, None]
+                & ~self.is_wolf
+                & (rng.random((n_games, n_seats)) < policy.follow_seer)
+            )
+            votes = np.where(follow, public_target[:, None], votes)
+
+        valid = has_vote & self.alive & self.active[:, None]
+        flat = (rows[:, None] * n_seats + votes)[valid]
+        counts = np.bincount(flat, minlength=n_games * n_seats).reshape(n_games, n_seats)
+        top = counts.max(axis=1)
+        out, has_out = _pick(rng, (counts == top[:, None]) & (top[:, None] > 0))
+        has_out &= self.active
+        self._kill(has_out, out)
+
+        self._hunter_shoot(self.has_role[HUNTER] & hunter_can_shoot(
+            False, has_out & (self.roles[rows, out] == HUNTER), False))
+
+    def run(self, max_rounds: int) -> None:
+        for round_num in range(1, max_rounds + 1):
+            if not self.active.any():
+                break
+            self.night()
+            self._settle(round_num)
+            self.day()
+            self._settle(round_num)
+        self.length[self.active] = max_rounds
+
+
+def _deal_roles(rng: np.random.Generator, n_games: int, composition: dict[str, int]) -> np.ndarray:
+    """为每局随机分配座位角色。"""
+    base = np.array([ROLE_NAMES.index(role) for role in build_role_list(composition)], dtype=np.int8)
+    order = rng.random((n_games, base.size)).argsort(axis=1)
+    return base[order]
+
+
+def run_simulation(
+    composition: dict[str, int],
+    n_games: int,
+    rule: str = "edge",
+    policy: str | SimulationPolicy = "random",
+    max_rounds: int = 30,
+    seed: int | None = None,
+    batch_size: int | None = None,
+) -> SimulationResult:
+    """模拟 n_games 局并汇总胜率与对局长度分布。
+
+    Args:
+        composition: 角色配置，如 core.rules.ROLE_COMPOSITIONS[9]
+        n_games: 模拟局数
+        rule: 胜利规则变体，见 core.rules.WIN_RULES
+        policy: 策略名（见 POLICIES）或 SimulationPolicy 实例
+        max_rounds: 最大回合数，超出记为平局
+        seed: 随机种子
+        batch_size: 每批并行的局数；缺省按座位数自动选择以控制内存
+    """
+
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    n_seats = sum(composition.values())
+    # 投票阶段的 (局, 投票人, 目标) 数组是内存大头
+    batch_size = batch_size or max(1_000, 4_000_000 // (n_seats * n_seats))
+    rng = np.random.default_rng(seed)
+
+    result = SimulationResult(
+        composition=dict(composition),
+        rule=rule,
+        policy=policy.name,
+        max_rounds=max_rounds,
+    )
+    remaining = n_games
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batch = _Batch(rng, _deal_roles(rng, size, composition), rule, policy)
+        batch.run(max_rounds)
+        result.merge(batch.winner, batch.length)
+        remaining -= size
+    return result
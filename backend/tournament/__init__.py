@@ -0,0 +1,13 @@
+"""模型对比锦标赛：轮换座位与阵营，序贯检验（SPRT）显著后提前停止。"""
+
+from .sprt import SPRT, TwoSidedSPRT
+from .runner import Contender, TournamentResult, parse_contender, run_tournament
+
+__all__ = [
+    "SPRT",
+    "TwoSidedSPRT",
+    "Contender",
+    "TournamentResult",
+    "parse_contender",
+    "run_tournament",
+]
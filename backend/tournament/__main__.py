@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""CLI 入口：python -m tournament --a P1 --b P2 --delta 0.15 --max-pairs 100"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+
+def _ensure_backend_on_syspath() -> None:
+    # 当以脚本文件方式执行（run_path）时，sys.path 可能不包含 backend/。
+    backend_dir = Path(__file__).resolve().parent.parent
+    backend_str = str(backend_dir)
+    if backend_str not in sys.path:
+        sys.path.insert(0, backend_str)
+
+
+_ensure_backend_on_syspath()
+
+from config import config  # noqa: E402
+from tournament.runner import (  # noqa: E402
+    WINNER_LABELS,
+    parse_contender,
+    run_tournament,
+    write_result,
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Compare two contenders with seat/side rotation and early stopping (SPRT)")
+    p.add_argument("--a", required=True,
+                   help="Contender A: P<n> (OPENAI_*_P<n>), a model name, or bot[:vote]")
+    p.add_argument("--b", required=True, help="Contender B, same format as --a")
+    p.add_argument("--max-pairs", type=int, default=100,
+                   help="Upper bound on game pairs (each pair = 2 games with sides swapped)")
+    p.add_argument("--delta", type=float, default=0.15,
+                   help="Smallest difference worth detecting: P(A wins a decisive pair) = 0.5 ± delta")
+    p.add_argument("--alpha", type=float, default=0.05)
+    p.add_argument("--beta", type=float, default=0.05)
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--json", default=None, help="Write results to this JSON file (updated after every game)")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    is_valid, error_msg = config.validate()
+    if not is_valid:
+        print(f"❌ 配置错误: {error_msg}")
+        sys.exit(1)
+
+    a, b = parse_contender(args.a), parse_contender(args.b)
+    print(f"A = {a.label}    B = {b.label}")
+
+    def _on_game(result, record) -> None:
+        wolves = result.a if record["a_side"] == "werewolf" else result.b
+        print(
+            f"[第{record['game']}局 对{record['pair']}] 狼人方 {wolves}，"
+            f"胜方 {WINNER_LABELS.get(record['winner'], record['winner'])}  |  "
+            f"A 得分 {result.score('a'):.1%}  B 得分 {result.score('b'):.1%}"
+        )
+        if args.json:
+            write_result(result, args.json)
+
+    result = asyncio.run(
+        run_tournament(
+            a,
+            b,
+            max_pairs=args.max_pairs,
+            delta=args.delta,
+            alpha=args.alpha,
+            beta=args.beta,
+            seed=args.seed,
+            on_game=_on_game,
+        )
+    )
+    print("\n" + result.summary())
+    if result.decision == "continue":
+        print(f"已达到 {args.max_pairs} 个对局对上限，检验未得出结论")
+    if args.json:
+        write_result(result, args.json)
+        print(f"结果已写入 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""锦标赛：两名参赛者轮换座位与阵营对局，SPRT 显著或排除差异后提前停止。
+
+每个对局对先随机发一次身份（座位与角色每对都重新轮换），再用同一身份分配打两局：
+第一局 A 控制全部狼人座位、B 控制全部好人座位，第二局互换。阵营本身的胜率差异
+因此在对局对内抵消，剩下的差异只来自参赛者。
+"""
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from config import config, with_config_scope
+from core.bots import BotStrategy, HeuristicAgent
+from core.game_engine import werewolves_game
+from core.rules import build_role_list
+from core.scenario import Scenario
+from game_service import create_knowledge_store
+from main import get_official_agents
+from tournament.sprt import CONTINUE, DECISION_LABELS, TwoSidedSPRT
+
+WINNER_LABELS = {"werewolf": "狼人", "village": "好人", None: "未分胜负"}
+
+
+@dataclass(frozen=True)
+class Contender:
+    """参赛者：OpenAI 兼容模型配置，或规则型机器人（用于基线与冒烟测试）。"""
+
+    label: str
+    model_cfg: dict[str, str] | None = None
+    bot_vote: str | None = None
+
+    def create_agent(self, name: str, seed: int | None = None) -> Any:
+        if self.bot_vote is not None:
+            strategy = replace(BotStrategy.from_config(), vote=self.bot_vote)
+            return HeuristicAgent(name, strategy, seed=seed)
+        return get_official_agents(name, self.model_cfg)
+
+
+def parse_contender(spec: str) -> Contender:
+    """解析参赛者描述。
+
+    - ``P3``：使用 OPENAI_*_P3 的玩家级配置（缺省字段回落到全局 OPENAI_*）
+    - ``bot`` / ``bot:random``：规则型机器人，可指定投票策略
+    - 其他：全局 OPENAI_API_KEY/OPENAI_BASE_URL 下的模型名
+    """
+
+    spec = spec.strip()
+    if spec == "bot" or spec.startswith("bot:"):
+        vote = spec.partition(":")[2] or config.bot_vote_strategy
+        return Contender(f"bot({vote})", bot_vote=vote)
+
+    if config.model_provider != "openai":
+        raise ValueError("模型参赛者需要 MODEL_PROVIDER=openai（或使用 bot 参赛者）")
+    if spec[:1] in ("P", "p") and spec[1:].isdigit():
+        idx = int(spec[1:])
+        if not 1 <= idx <= config.player_count:
+            raise ValueError(f"{spec} 超出玩家范围 P1..P{config.player_count}")
+        cfg = {
+            "api_key": config.openai_player_api_keys[idx - 1] or config.openai_api_key or "",
+            "base_url": config.openai_player_base_urls[idx - 1] or config.openai_base_url,
+            "model_name": config.openai_player_models[idx - 1] or config.openai_model_name,
+        }
+        return Contender(f"P{idx}({cfg['model_name']})", model_cfg=cfg)
+    cfg = {
+        "api_key": config.openai_api_key or "",
+        "base_url": config.openai_base_url,
+        "model_name": spec,
+    }
+    return Contender(spec, model_cfg=cfg)
+
+
+@dataclass
+class TournamentResult:
+    a: str
+    b: str
+    delta: float
+    alpha: float
+    beta: float
+    games: list[dict[str, Any]] = field(default_factory=list)
+    a_pair_wins: int = 0
+    b_pair_wins: int = 0
+    tied_pairs: int = 0
+    decision: str = CONTINUE
+    llr: tuple[float, float] = (0.0, 0.0)
+
+    @property
+    def pairs(self) -> int:
+        return self.a_pair_wins + self.b_pair_wins + self.tied_pairs
+
+    def score(self, who: str) -> float:
+        """参赛者的单局平均得分（胜 1、平 0.5、负 0）。"""
+        key = "score_a" if who == "a" else "score_b"
+        return sum(g[key] for g in self.games) / len(self.games) if self.games else 0.0
+
+    def side_win_rate(self, who: str, side: str) -> float:
+        """参赛者在某一阵营时的胜率。"""
+        games = [g for g in self.games if g[f"{who}_side"] == side]
+        return sum(1 for g in games if g["winner"] == side) / len(games) if games else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.games)} 局 / {self.pairs} 对：{self.a} 得分 {self.score('a'):.1%}，"
+            f"{self.b} 得分 {self.score('b'):.1%}；决定性对局对 A {self.a_pair_wins} : "
+            f"B {self.b_pair_wins}（平 {self.tied_pairs}），"
+            f"LLR {self.llr[0]:+.2f}/{self.llr[1]:+.2f}，结论: {DECISION_LABELS[self.decision]}"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "a": self.a,
+            "b": self.b,
+            "delta": self.delta,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "pairs": self.pairs,
+            "aPairWins": self.a_pair_wins,
+            "bPairWins": self.b_pair_wins,
+            "tiedPairs": self.tied_pairs,
+            "scoreA": self.score("a"),
+            "scoreB": self.score("b"),
+            "aWinRateAsWerewolf": self.side_win_rate("a", "werewolf"),
+            "aWinRateAsVillage": self.side_win_rate("a", "village"),
+            "bWinRateAsWerewolf": self.side_win_rate("b", "werewolf"),
+            "bWinRateAsVillage": self.side_win_rate("b", "village"),
+            "llr": list(self.llr),
+            "decision": self.decision,
+            "games": self.games,
+        }
+
+
+async def _play(
+    game_id: str,
+    roles: dict[str, str],
+    wolves: Contender,
+    village: Contender,
+    seed: int,
+) -> dict[str, Any]:
+    agents = []
+    player_model_map = {}
+    for idx, (name, role) in enumerate(roles.items()):
+        contender = wolves if role == "werewolf" else village
+        agents.append(contender.create_agent(name, seed=seed + idx))
+        player_model_map[name] = contender.label
+
+    outcome: dict[str, Any] = {}
+
+    def _sink(event: dict[str, Any]) -> None:
+        if "winner" in event:
+            outcome["winner"] = event["winner"]
+            outcome["status"] = event.get("status")
+
+    log_path, _ = await werewolves_game(
+        agents,
+        knowledge_store=create_knowledge_store(player_model_map, game_id=game_id),
+        player_model_map=player_model_map,
+        game_id=game_id,
+        event_sink=_sink,
+        scenario=Scenario(name=game_id, round=1, roles=roles, alive=list(roles)),
+        priority="batch",
+    )
+    return {"winner": outcome.get("winner"), "status": outcome.get("status"), "log": log_path}
+
+
+# 整场锦标赛共用一份配置快照，中途修改 .env 不影响对比
+@with_config_scope
+async def run_tournament(
+    a: Contender,
+    b: Contender,
+    *,
+    max_pairs: int = 100,
+    delta: float = 0.15,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    seed: int | None = None,
+    tournament_id: str | None = None,
+    on_game: Callable[[TournamentResult, dict[str, Any]], None] | None = None,
+) -> TournamentResult:
+    """运行锦标赛直到 SPRT 给出结论或达到 max_pairs 个对局对。
+
+    Args:
+        on_game: 每局结束后的回调（参数为当前统计与该局记录），用于打印进度或落盘
+    """
+
+    test = TwoSidedSPRT(delta, alpha, beta)
+    rng = random.Random(seed)
+    tid = tournament_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    result = TournamentResult(a.label, b.label, delta, alpha, beta)
+    composition = config.role_composition
+    names = [f"Player{i}" for i in range(1, sum(composition.values()) + 1)]
+
+    for pair in range(1, max_pairs + 1):
+        deal = build_role_list(composition)
+        rng.shuffle(deal)
+        roles = dict(zip(names, deal))
+        game_seed = rng.randrange(1 << 30)
+
+        pair_score = 0.0
+        for leg, (wolves, village) in enumerate(((a, b), (b, a))):
+            played = await _play(f"{tid}_p{pair:03d}{'ab'[leg]}", roles, wolves, village, game_seed)
+            a_side = "werewolf" if wolves is a else "village"
+            winner = played["winner"]
+            score_a = 0.5 if winner is None else float(winner == a_side)
+            pair_score += score_a
+            record = {
+                "pair": pair,
+                "game": len(result.games) + 1,
+                "a_side": a_side,
+                "b_side": "village" if a_side == "werewolf" else "werewolf",
+                "winner": winner,
+                "status": played["status"],
+                "score_a": score_a,
+                "score_b": 1 - score_a,
+                "log": played["log"],
+            }
+            result.games.append(record)
+            if on_game is not None:
+                on_game(result, record)
+
+        if pair_score > 1:
+            result.a_pair_wins += 1
+        elif pair_score < 1:
+            result.b_pair_wins += 1
+        else:
+            result.tied_pairs += 1
+        result.llr = test.llrs(result.a_pair_wins, result.b_pair_wins)
+        result.decision = test.decide(result.a_pair_wins, result.b_pair_wins)
+        if result.decision != CONTINUE:
+            break
+
+    return result
+
+
+def write_result(result: TournamentResult, path: str | Path) -> None:
+    Path(path).write_text(
+        json.dumps(result.to_dict(), ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
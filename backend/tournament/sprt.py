@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""序贯概率比检验（SPRT）：每对局结束后更新，差异显著或被排除时提前停止。
+
+锦标赛以“对局对”为单位：同一身份分配下两名参赛者互换阵营各打一局。
+对局对中一方两局都赢（或一胜一平）为决定性结果，平分的对局对不含信息；
+决定性对局对中参赛者 A 获胜的概率记为 p，A、B 实力相同时 p = 0.5。
+
+双侧检验由两个单侧 Wald SPRT 组成（Sobel-Wald）：
+- 上侧：H0 p = 0.5 对 H1 p = 0.5 + delta
+- 下侧：H0 p = 0.5 对 H1 p = 0.5 - delta
+任一侧接受 H1 即判定差异显著；两侧都接受 H0 即排除不小于 delta 的差异。
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+# 检验结论
+CONTINUE, A_BETTER, B_BETTER, NO_DIFFERENCE = (
+    "continue", "a_better", "b_better", "no_difference")
+
+DECISION_LABELS = {
+    CONTINUE: "继续",
+    A_BETTER: "A 显著更强",
+    B_BETTER: "B 显著更强",
+    NO_DIFFERENCE: "排除显著差异",
+}
+
+
+@dataclass(frozen=True)
+class SPRT:
+    """单侧 Bernoulli SPRT。
+
+    Args:
+        p0: 原假设下的成功概率
+        p1: 备择假设下的成功概率
+        alpha: 第一类错误率（误判为 H1）
+        beta: 第二类错误率（误判为 H0）
+    """
+
+    p0: float
+    p1: float
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    def __post_init__(self) -> None:
+        if not (0 < self.p0 < 1 and 0 < self.p1 < 1) or self.p0 == self.p1:
+            raise ValueError(f"SPRT 需要 0 < p0 != p1 < 1，实际为 p0={self.p0}, p1={self.p1}")
+        if not (0 < self.alpha < 1 and 0 < self.beta < 1):
+            raise ValueError("alpha 与 beta 必须在 (0, 1) 内")
+
+    @property
+    def lower(self) -> float:
+        """LLR 低于此值时接受 H0。"""
+        return math.log(self.beta / (1 - self.alpha))
+
+    @property
+    def upper(self) -> float:
+        """LLR 高于此值时接受 H1。"""
+        return math.log((1 - self.beta) / self.alpha)
+
+    def llr(self, successes: int, failures: int) -> float:
+        return (
+            successes * math.log(self.p1 / self.p0)
+            + failures * math.log((1 - self.p1) / (1 - self.p0))
+        )
+
+
+class TwoSidedSPRT:
+    """双侧检验：两个单侧 SPRT，各分配一半的第一类错误率。"""
+
+    def __init__(self, delta: float = 0.15, alpha: float = 0.05, beta: float = 0.05) -> None:
+        if not 0 < delta < 0.5:
+            raise ValueError(f"delta 必须在 (0, 0.5) 内，实际为 {delta}")
+        self.delta = delta
+        self.upper_test = SPRT(0.5, 0.5 + delta, alpha / 2, beta)
+        self.lower_test = SPRT(0.5, 0.5 - delta, alpha / 2, beta)
+
+    def llrs(self, a_wins: int, b_wins: int) -> tuple[float, float]:
+        """(上侧 LLR, 下侧 LLR)，a_wins/b_wins 为决定性对局对的胜负数。"""
+        return (
+            self.upper_test.llr(a_wins, b_wins),
+            self.lower_test.llr(a_wins, b_wins),
+        )
+
+    def decide(self, a_wins: int, b_wins: int) -> str:
+        up, down = self.llrs(a_wins, b_wins)
+        if up >= self.upper_test.upper:
+            return A_BETTER
+        if down >= self.lower_test.upper:
+            return B_BETTER
+        if up <= self.upper_test.lower and down <= self.lower_test.lower:
+            return NO_DIFFERENCE
+        return CONTINUE
+
+    def bounds(self) -> tuple[float, float]:
+        return self.upper_test.lower, self.upper_test.upper
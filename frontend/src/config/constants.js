@@ -43,6 +43,22 @@ export const AGENT_SEATS = [
   { x: 0.91, y: 0.10 }, // 9号 - 与5号对齐
 ];
 
+// Seat layout for a board of `count` players. Up to 9 players use AGENT_SEATS;
+// larger boards (12/15/18, see PLAYER_COUNT) seat two columns per side, numbered
+// left side first, top to bottom (outer column, then inner column on each row).
+export const seatLayout = (count) => {
+  if (!count || count <= AGENT_SEATS.length) return AGENT_SEATS;
+  const leftCount = Math.ceil(count / 2);
+  const rows = Math.ceil(leftCount / 2);
+  const rowY = (row) => (rows > 1 ? 0.82 - (row * 0.72) / (rows - 1) : 0.46);
+  const side = (n, outerX, innerX) =>
+    Array.from({ length: n }, (_, i) => ({
+      x: i % 2 === 0 ? outerX : innerX,
+      y: rowY(Math.floor(i / 2)),
+    }));
+  return [...side(leftCount, 0.09, 0.2), ...side(count - leftCount, 0.91, 0.8)];
+};
+
 // Players (kept as AGENTS to minimize code changes across existing components)
 export const DEFAULT_AGENTS = [
   {